@@ -0,0 +1,320 @@
+from typing import Dict, Any, List, Tuple
+from collections import OrderedDict, defaultdict
+from functools import cached_property
+from bisect import bisect_left
+import threading
+import hashlib
+import logging
+import json
+import os
+
+# Dataset parts that do not affect the compiled indexes
+NON_STRUCTURAL_KEYS = {"metadata", "algorithmSettings"}
+
+# Rough in-memory size of a compiled instance relative to its canonical JSON size
+SIZE_FACTOR = 8
+
+
+def compute_dataset_hash(university_data: Dict[str, Any]) -> Tuple[str, int]:
+    """Content hash of a dataset (ignoring metadata and settings) plus its canonical JSON size"""
+    canonical = json.dumps(
+        {key: value for key, value in university_data.items() if key not in NON_STRUCTURAL_KEYS},
+        sort_keys=True, separators=(",", ":"), default=str
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest(), len(canonical)
+
+
+class CompiledInstance:
+    """
+    Indexes derived once from a university dataset: interned IDs, subject/teacher and
+    room-type maps, candidate room domains and the activity list, plus the inverted
+    indexes used by the validators (built on first use).
+    Shared (read-only) by the validators and every GA run on the same dataset.
+    """
+
+    def __init__(self, university_data: Dict[str, Any], dataset_hash: str = "", estimated_bytes: int = 0):
+        self.dataset_hash = dataset_hash
+        self.estimated_bytes = estimated_bytes
+        self.basic_info = university_data.get("basicInfo", {})
+        self.teachers = university_data.get("teachers", [])
+        self.subjects = university_data.get("subjects", [])
+        self.rooms = university_data.get("rooms", [])
+        self.students = university_data.get("students", [])
+        self.time_slots = university_data.get("timeSlots", [])
+        self.working_days = self.basic_info.get("workingDays", [])
+
+        # Lookup dictionaries
+        self.teachers_dict = {t["id"]: t for t in self.teachers if "id" in t}
+        self.subjects_dict = {s["id"]: s for s in self.subjects if "id" in s}
+        self.rooms_dict = {r["id"]: r for r in self.rooms if "id" in r}
+        self.time_slots_dict = {ts["id"]: ts for ts in self.time_slots if "id" in ts}
+
+        # Interned IDs: positional indices for compact encodings and slot arithmetic
+        self.time_slot_indices = {ts["id"]: idx for idx, ts in enumerate(self.time_slots) if "id" in ts}
+        self.teacher_index = {t["id"]: idx for idx, t in enumerate(self.teachers) if "id" in t}
+        self.room_index = {r["id"]: idx for idx, r in enumerate(self.rooms) if "id" in r}
+        self.day_index = {day: idx for idx, day in enumerate(self.working_days)}
+
+        self.subject_teacher_map = self.build_subject_teacher_mapping()
+        self.room_type_map = self.build_room_type_mapping()
+
+        self._suitable_rooms_cache: Dict[Tuple[str, int], List[Any]] = {}
+        self._activities = None
+        self._lock = threading.Lock()
+
+    @property
+    def activities(self) -> List[Dict[str, Any]]:
+        """Activity templates (built on first use, so validation of broken data never needs them)"""
+        if self._activities is None:
+            with self._lock:
+                if self._activities is None:
+                    self._activities = self.generate_activities()
+        return self._activities
+
+    def generate_activities(self) -> List[Dict[str, Any]]:
+        """Generate all required activities from student enrollments with better structure"""
+        activities = []
+        activity_id = 1
+
+        for student_group in self.students:
+            batch_name = f"{student_group['batch']} Section {student_group.get('section', 'A')}"
+
+            for subject_id in student_group.get("subjects", []):
+                subject = self.subjects_dict.get(subject_id)
+                if not subject:
+                    logging.warning(f"Subject {subject_id} not found for student group {batch_name}")
+                    continue
+
+                hours_per_week = subject.get("hoursPerWeek", 3)
+                duration = subject.get("duration", 60)
+                subject_type = subject.get("type", "Theory")
+
+                # Calculate sessions needed
+                if subject_type == "Lab" and duration > 60:
+                    sessions_needed = 1  # One long lab session
+                else:
+                    sessions_needed = hours_per_week  # Regular theory sessions
+
+                # Create activities for each session
+                for session in range(sessions_needed):
+                    activity = {
+                        "activityId": activity_id,
+                        "subjectId": subject_id,
+                        "subjectName": subject["name"],
+                        "subjectCode": subject.get("code", ""),
+                        "subjectType": subject_type,
+                        "duration": duration,
+                        "studentGroupId": student_group["id"],
+                        "studentGroupName": batch_name,
+                        "studentCount": student_group["totalStudents"],
+                        "department": subject.get("department", ""),
+                        "requiredRoomType": subject.get("requiredRoomType", "Classroom"),
+                        "equipmentRequired": subject.get("equipmentRequired", []),
+                        "sessionNumber": session + 1,
+                        "totalSessions": sessions_needed,
+                        # These will be assigned by GA
+                        "teacherId": None,
+                        "roomId": None,
+                        "day": None,
+                        "timeSlotId": None,
+                        "period": None
+                    }
+                    activities.append(activity)
+                    activity_id += 1
+
+        return activities
+
+    def build_subject_teacher_mapping(self) -> Dict[str, List[Any]]:
+        """Build a mapping of subject names to qualified teacher IDs"""
+        mapping = defaultdict(list)
+
+        # Create a mapping from subject codes to subject names
+        code_to_name = {}
+        name_to_code = {}
+        for subject in self.subjects:
+            name = subject.get("name", "")
+            code = subject.get("code", "")
+            if name and code:
+                code_to_name[code] = name
+                name_to_code[name] = code
+
+        for teacher in self.teachers:
+            if "id" not in teacher:
+                continue
+            for subject_ref in teacher.get("subjectsCanTeach", []):
+                # Add mapping for the reference itself
+                mapping[subject_ref].append(teacher["id"])
+
+                # If it's a code, also add mapping for the name
+                if subject_ref in code_to_name:
+                    subject_name = code_to_name[subject_ref]
+                    mapping[subject_name].append(teacher["id"])
+
+                # If it's a name, also add mapping for the code
+                if subject_ref in name_to_code:
+                    subject_code = name_to_code[subject_ref]
+                    mapping[subject_code].append(teacher["id"])
+
+        return dict(mapping)
+
+    def build_room_type_mapping(self) -> Dict[str, List[Any]]:
+        """Build a mapping of room types to room IDs"""
+        mapping = defaultdict(list)
+        for room in self.rooms:
+            if "id" not in room:
+                continue
+            room_type = room.get("type", "Classroom")
+            mapping[room_type].append(room["id"])
+
+            # Add cross-compatibility
+            if room_type == "Auditorium":
+                mapping["Classroom"].append(room["id"])  # Auditorium can be used as classroom
+            elif room_type == "Classroom":
+                mapping["Theory"].append(room["id"])  # Classroom good for theory
+
+        return dict(mapping)
+
+    def get_suitable_rooms(self, room_type: str, student_count: int) -> List[Any]:
+        """
+        Candidate room domain for a room type and group size (memoized; do not mutate the result).
+        Labs need a Laboratory; everything else may use classrooms, auditoriums or seminar rooms.
+        """
+        key = (room_type, student_count)
+        cached = self._suitable_rooms_cache.get(key)
+        if cached is not None:
+            return cached
+
+        # Get rooms of correct type
+        if room_type == "Laboratory":
+            candidate_rooms = self.room_type_map.get("Laboratory", [])
+        else:
+            # For non-lab requirements, allow classroom, auditorium, seminar room
+            candidate_rooms = []
+            for rt in ["Classroom", "Auditorium", "Seminar Room"]:
+                candidate_rooms.extend(self.room_type_map.get(rt, []))
+
+        # Filter by capacity
+        suitable_rooms = [
+            room_id for room_id in candidate_rooms
+            if self.rooms_dict[room_id].get("capacity", 0) >= student_count
+        ]
+
+        if not suitable_rooms:
+            logging.warning(f"No suitable rooms found for type: {room_type}, capacity: {student_count}")
+
+        self._suitable_rooms_cache[key] = suitable_rooms
+        return suitable_rooms
+
+
+    # Validation indexes
+
+    @cached_property
+    def teachers_by_subject_ref(self) -> Dict[Any, List[Dict[str, Any]]]:
+        """Exact subjectsCanTeach entry (name or code) -> teachers listing it, each teacher once"""
+        index = defaultdict(list)
+        for teacher in self.teachers:
+            for subject_ref in set(teacher.get("subjectsCanTeach", [])):
+                index[subject_ref].append(teacher)
+        return dict(index)
+
+    @cached_property
+    def enrolled_group_counts(self) -> Dict[Any, int]:
+        """Subject id -> number of student groups enrolled in it"""
+        counts = defaultdict(int)
+        for student_group in self.students:
+            for subject_id in set(student_group.get("subjects", [])):
+                counts[subject_id] += 1
+        return dict(counts)
+
+    @cached_property
+    def sorted_room_capacities(self) -> List[Any]:
+        return sorted(room.get("capacity", 0) for room in self.rooms)
+
+    @cached_property
+    def lab_subjects(self) -> List[Dict[str, Any]]:
+        return [s for s in self.subjects if s.get("type") == "Lab"]
+
+    @cached_property
+    def lab_rooms(self) -> List[Dict[str, Any]]:
+        return [r for r in self.rooms if r.get("type") == "Laboratory"]
+
+    def count_teachers_for(self, *subject_refs: Any) -> int:
+        """Number of distinct teachers listing any of the given subject names/codes"""
+        if len(subject_refs) == 1:
+            return len(self.teachers_by_subject_ref.get(subject_refs[0], []))
+        teacher_ids = set()
+        for subject_ref in set(subject_refs):
+            teacher_ids.update(id(t) for t in self.teachers_by_subject_ref.get(subject_ref, []))
+        return len(teacher_ids)
+
+    def count_rooms_with_capacity(self, student_count: Any) -> int:
+        """Number of rooms (of any type) whose capacity is at least student_count"""
+        capacities = self.sorted_room_capacities
+        return len(capacities) - bisect_left(capacities, student_count)
+
+    def total_required_hours(self) -> int:
+        """Weekly teaching hours implied by enrollments (hoursPerWeek x enrolled groups)"""
+        counts = self.enrolled_group_counts
+        return sum(subject.get("hoursPerWeek", 3) * counts.get(subject["id"], 0) for subject in self.subjects)
+
+
+class CompiledInstanceCache:
+    """LRU of compiled instances bounded by entry count and estimated memory"""
+
+    def __init__(self, max_entries: int = 8, max_bytes: int = 64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries: "OrderedDict[str, CompiledInstance]" = OrderedDict()
+        self.total_bytes = 0
+        self.lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def get(self, university_data: Dict[str, Any]) -> CompiledInstance:
+        dataset_hash, canonical_size = compute_dataset_hash(university_data)
+        with self.lock:
+            instance = self.entries.get(dataset_hash)
+            if instance is not None:
+                self.entries.move_to_end(dataset_hash)
+                self.stats["hits"] += 1
+                return instance
+
+        instance = CompiledInstance(university_data, dataset_hash, canonical_size * SIZE_FACTOR)
+        with self.lock:
+            self.stats["misses"] += 1
+            if instance.estimated_bytes > self.max_bytes:
+                # Too large to keep around; use it for this request only
+                return instance
+            if dataset_hash not in self.entries:
+                self.entries[dataset_hash] = instance
+                self.total_bytes += instance.estimated_bytes
+            while len(self.entries) > self.max_entries or self.total_bytes > self.max_bytes:
+                _, evicted = self.entries.popitem(last=False)
+                self.total_bytes -= evicted.estimated_bytes
+                self.stats["evictions"] += 1
+            return self.entries.get(dataset_hash, instance)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.total_bytes = 0
+
+    def status(self) -> Dict[str, Any]:
+        with self.lock:
+            return {
+                **self.stats,
+                "entries": len(self.entries),
+                "maxEntries": self.max_entries,
+                "estimatedBytes": self.total_bytes,
+                "maxBytes": self.max_bytes
+            }
+
+
+compiled_instance_cache = CompiledInstanceCache(
+    max_entries=int(os.environ.get("TIMETABLE_INSTANCE_CACHE_SIZE", "8")),
+    max_bytes=int(float(os.environ.get("TIMETABLE_INSTANCE_CACHE_MB", "64")) * 1024 * 1024)
+)
+
+
+def get_compiled_instance(university_data: Dict[str, Any]) -> CompiledInstance:
+    """Compiled instance for a dataset, built once per distinct dataset hash"""
+    return compiled_instance_cache.get(university_data)
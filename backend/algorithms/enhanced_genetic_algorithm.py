@@ -1,35 +1,93 @@
-from typing import Dict, Any, List, Tuple, Optional, Set
+from typing import Dict, Any, List, Tuple, Optional, Set, Callable
 import time
 import random
 import copy
+import heapq
 from datetime import datetime
 from collections import defaultdict
 import logging
 
+from algorithms.solve_control import (
+    CancellationToken,
+    SolveCancelled,
+    CheckpointError,
+    GENES_PER_ACTIVITY,
+    save_checkpoint,
+    load_checkpoint,
+    serialize_random_state,
+    deserialize_random_state,
+    valid_seed
+)
+from algorithms.compiled_instance import CompiledInstance, get_compiled_instance
+from utils.constraint_checker import fitness_from_penalty
+from utils.profiling import NULL_PROFILER
+
+# Search engines (algorithmSettings.engine)
+ENGINE_GENERATIONAL = "generational"
+ENGINE_STEADY_STATE = "steadyState"
+ENGINES = (ENGINE_GENERATIONAL, ENGINE_STEADY_STATE)
+
+# Member a steady-state child replaces (algorithmSettings.replacement)
+REPLACE_WORST = "worst"
+REPLACE_SIMILAR = "similar"
+REPLACEMENTS = (REPLACE_WORST, REPLACE_SIMILAR)
+
+def build_penalty_weights(constraints: Dict[str, Any]) -> Dict[str, int]:
+    """Fitness penalty per violation, from the dataset's constraint settings or defaults"""
+    hard_penalties = constraints.get("hard", {}).get("penaltyWeights", {})
+    soft_penalties = constraints.get("soft", {}).get("penaltyWeights", {})
+    
+    return {
+        # Hard constraint penalties (very high)
+        "teacher_conflict": hard_penalties.get("teacherConflict", 50000),
+        "student_conflict": hard_penalties.get("studentConflict", 50000),
+        "room_conflict": hard_penalties.get("roomConflict", 50000),
+        "capacity_violation": hard_penalties.get("capacityViolation", 25000),
+        "qualification_violation": hard_penalties.get("qualificationViolation", 30000),
+        "room_type_violation": hard_penalties.get("roomTypeViolation", 35000),
+        
+        # Soft constraint penalties (lower)
+        "workload_violation": soft_penalties.get("workloadViolation", 100),
+        "consecutive_violation": soft_penalties.get("consecutiveViolation", 50),
+        "gap_penalty": soft_penalties.get("gapPenalty", 30),
+        "lunch_violation": soft_penalties.get("lunchViolation", 40),
+        "preference_violation": soft_penalties.get("preferenceViolation", 20),
+        "research_day_violation": soft_penalties.get("researchDayViolation", 80)
+    }
+
 class EnhancedTimetableGA:
     """Enhanced Genetic Algorithm for University Timetable Generation"""
     
-    def __init__(self, university_data: Dict[str, Any]):
+    def __init__(self, university_data: Dict[str, Any], compiled: Optional[CompiledInstance] = None):
         self.university_data = university_data
-        self.teachers = university_data.get("teachers", [])
-        self.subjects = university_data.get("subjects", [])
-        self.rooms = university_data.get("rooms", [])
-        self.students = university_data.get("students", [])
-        self.time_slots = university_data.get("timeSlots", [])
-        self.working_days = university_data.get("basicInfo", {}).get("workingDays", [])
         self.constraints = university_data.get("constraints", {})
         
-        # Create lookup dictionaries for faster access
-        self.teachers_dict = {t["id"]: t for t in self.teachers}
-        self.subjects_dict = {s["id"]: s for s in self.subjects}
-        self.rooms_dict = {r["id"]: r for r in self.rooms}
-        self.time_slots_dict = {ts["id"]: ts for ts in self.time_slots}
-        
-        # Create time slot ID to index mapping for arithmetic operations
-        self.time_slot_indices = {ts["id"]: idx for idx, ts in enumerate(self.time_slots)}
-        
-        # Generate activities from the data
-        self.activities = self.generate_activities()
+        # Dataset indexes are shared across runs on the same data
+        self.compiled = compiled or get_compiled_instance(university_data)
+        self.teachers = self.compiled.teachers
+        self.subjects = self.compiled.subjects
+        self.rooms = self.compiled.rooms
+        self.students = self.compiled.students
+        self.time_slots = self.compiled.time_slots
+        self.working_days = self.compiled.working_days
+        
+        # Lookup dictionaries for faster access
+        self.teachers_dict = self.compiled.teachers_dict
+        self.subjects_dict = self.compiled.subjects_dict
+        self.rooms_dict = self.compiled.rooms_dict
+        self.time_slots_dict = self.compiled.time_slots_dict
+        
+        # Time slot ID to index mapping for arithmetic operations
+        self.time_slot_indices = self.compiled.time_slot_indices
+        
+        # Positional indices used for compact gene encoding (checkpoints)
+        self.teacher_index = self.compiled.teacher_index
+        self.room_index = self.compiled.room_index
+        self.day_index = self.compiled.day_index
+        
+        # Activity templates (read-only; chromosomes hold copies)
+        self.activities = self.compiled.activities
+        self.activities_by_id = {a["activityId"]: a for a in self.activities}
         
         # Enhanced GA Parameters from config or defaults
         algorithm_settings = university_data.get("algorithmSettings", {})
@@ -41,134 +99,39 @@ class EnhancedTimetableGA:
         self.tournament_size = algorithm_settings.get("tournamentSize", 4)
         self.convergence_threshold = algorithm_settings.get("convergenceThreshold", 0.95)
         self.max_stagnation_generations = algorithm_settings.get("maxStagnationGenerations", 20)
+        self.engine = algorithm_settings.get("engine", ENGINE_GENERATIONAL)
+        self.replacement = algorithm_settings.get("replacement", REPLACE_WORST)
+        
+        # Per-generation convergence trace (returned in stats["trace"])
+        self.record_trace = algorithm_settings.get("trace", False)
+        
+        # Random stream of this solve, never shared with concurrent solves; a seed makes it
+        # reproducible (same seed and data, same timetable), otherwise it is seeded from OS entropy
+        self.seed = None
+        self.rng = random.Random()
+        self.set_seed(algorithm_settings.get("seed"))
         
         # Penalty weights from constraints
-        hard_penalties = self.constraints.get("hard", {}).get("penaltyWeights", {})
-        soft_penalties = self.constraints.get("soft", {}).get("penaltyWeights", {})
-        
-        self.penalty_weights = {
-            # Hard constraint penalties (very high)
-            "teacher_conflict": hard_penalties.get("teacherConflict", 50000),
-            "student_conflict": hard_penalties.get("studentConflict", 50000),
-            "room_conflict": hard_penalties.get("roomConflict", 50000),
-            "capacity_violation": hard_penalties.get("capacityViolation", 25000),
-            "qualification_violation": hard_penalties.get("qualificationViolation", 30000),
-            "room_type_violation": hard_penalties.get("roomTypeViolation", 35000),
-            
-            # Soft constraint penalties (lower)
-            "workload_violation": soft_penalties.get("workloadViolation", 100),
-            "consecutive_violation": soft_penalties.get("consecutiveViolation", 50),
-            "gap_penalty": soft_penalties.get("gapPenalty", 30),
-            "lunch_violation": soft_penalties.get("lunchViolation", 40),
-            "preference_violation": soft_penalties.get("preferenceViolation", 20),
-            "research_day_violation": soft_penalties.get("researchDayViolation", 80)
-        }
+        self.penalty_weights = build_penalty_weights(self.constraints)
         
-        # Pre-compute qualified teacher mappings for efficiency
-        self.subject_teacher_map = self.build_subject_teacher_mapping()
-        self.room_type_map = self.build_room_type_mapping()
+        # Pre-computed qualified teacher and room type mappings
+        self.subject_teacher_map = self.compiled.subject_teacher_map
+        self.room_type_map = self.compiled.room_type_map
         
-        logging.info(f"Enhanced GA initialized with {len(self.activities)} activities")
+        # Phase timing for algorithmStats.profile; replaced with a PhaseProfiler when requested
+        self.profiler = NULL_PROFILER
         
-    def generate_activities(self) -> List[Dict[str, Any]]:
-        """Generate all required activities from student enrollments with better structure"""
-        activities = []
-        activity_id = 1
+        # Fitness evaluations performed so far (throughput metrics)
+        self.fitness_evaluations = 0
         
-        for student_group in self.students:
-            batch_name = f"{student_group['batch']} Section {student_group.get('section', 'A')}"
-            
-            for subject_id in student_group.get("subjects", []):
-                subject = self.subjects_dict.get(subject_id)
-                if not subject:
-                    logging.warning(f"Subject {subject_id} not found for student group {batch_name}")
-                    continue
-                
-                hours_per_week = subject.get("hoursPerWeek", 3)
-                duration = subject.get("duration", 60)
-                subject_type = subject.get("type", "Theory")
-                
-                # Calculate sessions needed
-                if subject_type == "Lab" and duration > 60:
-                    sessions_needed = 1  # One long lab session
-                else:
-                    sessions_needed = hours_per_week  # Regular theory sessions
-                
-                # Create activities for each session
-                for session in range(sessions_needed):
-                    activity = {
-                        "activityId": activity_id,
-                        "subjectId": subject_id,
-                        "subjectName": subject["name"],
-                        "subjectCode": subject.get("code", ""),
-                        "subjectType": subject_type,
-                        "duration": duration,
-                        "studentGroupId": student_group["id"],
-                        "studentGroupName": batch_name,
-                        "studentCount": student_group["totalStudents"],
-                        "department": subject.get("department", ""),
-                        "requiredRoomType": subject.get("requiredRoomType", "Classroom"),
-                        "equipmentRequired": subject.get("equipmentRequired", []),
-                        "sessionNumber": session + 1,
-                        "totalSessions": sessions_needed,
-                        # These will be assigned by GA
-                        "teacherId": None,
-                        "roomId": None,
-                        "day": None,
-                        "timeSlotId": None,
-                        "period": None
-                    }
-                    activities.append(activity)
-                    activity_id += 1
-        
-        return activities
-    
-    def build_subject_teacher_mapping(self) -> Dict[str, List[int]]:
-        """Build a mapping of subject names to qualified teacher IDs"""
-        mapping = defaultdict(list)
-        
-        # Create a mapping from subject codes to subject names
-        code_to_name = {}
-        name_to_code = {}
-        for subject in self.subjects:
-            name = subject.get("name", "")
-            code = subject.get("code", "")
-            if name and code:
-                code_to_name[code] = name
-                name_to_code[name] = code
-        
-        for teacher in self.teachers:
-            for subject_ref in teacher.get("subjectsCanTeach", []):
-                # Add mapping for the reference itself
-                mapping[subject_ref].append(teacher["id"])
-                
-                # If it's a code, also add mapping for the name
-                if subject_ref in code_to_name:
-                    subject_name = code_to_name[subject_ref]
-                    mapping[subject_name].append(teacher["id"])
-                
-                # If it's a name, also add mapping for the code
-                if subject_ref in name_to_code:
-                    subject_code = name_to_code[subject_ref]
-                    mapping[subject_code].append(teacher["id"])
+        logging.info(f"Enhanced GA initialized with {len(self.activities)} activities")
         
-        return dict(mapping)
-    
-    def build_room_type_mapping(self) -> Dict[str, List[int]]:
-        """Build a mapping of room types to room IDs"""
-        mapping = defaultdict(list)
-        for room in self.rooms:
-            room_type = room.get("type", "Classroom")
-            mapping[room_type].append(room["id"])
-            
-            # Add cross-compatibility
-            if room_type == "Auditorium":
-                mapping["Classroom"].append(room["id"])  # Auditorium can be used as classroom
-            elif room_type == "Classroom":
-                mapping["Theory"].append(room["id"])  # Classroom good for theory
+    def set_seed(self, seed: Optional[int]):
+        if not valid_seed(seed):
+            raise ValueError(f"Invalid seed {seed!r}: expected a non-negative integer")
+        self.seed = seed
+        self.rng = random.Random(seed)
         
-        return dict(mapping)
-    
     def get_qualified_teachers(self, subject_name: str) -> List[int]:
         """Get teachers qualified to teach a specific subject - STRICT VERSION"""
         qualified_ids = self.subject_teacher_map.get(subject_name, [])
@@ -180,26 +143,7 @@ class EnhancedTimetableGA:
     
     def get_suitable_rooms(self, room_type: str, student_count: int) -> List[int]:
         """Get rooms suitable for a specific type and capacity - STRICT VERSION"""
-        # Get rooms of correct type
-        if room_type == "Laboratory":
-            candidate_rooms = self.room_type_map.get("Laboratory", [])
-        else:
-            # For non-lab requirements, allow classroom, auditorium, seminar room
-            candidate_rooms = []
-            for rt in ["Classroom", "Auditorium", "Seminar Room"]:
-                candidate_rooms.extend(self.room_type_map.get(rt, []))
-        
-        # Filter by capacity
-        suitable_rooms = []
-        for room_id in candidate_rooms:
-            room = self.rooms_dict.get(room_id)
-            if room and room.get("capacity", 0) >= student_count:
-                suitable_rooms.append(room_id)
-        
-        if not suitable_rooms:
-            logging.warning(f"No suitable rooms found for type: {room_type}, capacity: {student_count}")
-        
-        return suitable_rooms
+        return self.compiled.get_suitable_rooms(room_type, student_count)
     
     def validate_assignment(self, activity: Dict[str, Any]) -> Tuple[bool, List[str]]:
         """Validate if an assignment is feasible"""
@@ -269,10 +213,10 @@ class EnhancedTimetableGA:
                     break
                 
                 # Try to find available slot
-                teacher_id = random.choice(qualified_teachers)
-                room_id = random.choice(suitable_rooms)
-                day = random.choice(self.working_days)
-                time_slot = random.choice(self.time_slots)["id"]
+                teacher_id = self.rng.choice(qualified_teachers)
+                room_id = self.rng.choice(suitable_rooms)
+                day = self.rng.choice(self.working_days)
+                time_slot = self.rng.choice(self.time_slots)["id"]
                 
                 # Check for conflicts
                 teacher_key = (teacher_id, day, time_slot)
@@ -317,22 +261,22 @@ class EnhancedTimetableGA:
                 assigned_activity = copy.deepcopy(activity)
                 
                 # Assign teacher
-                teacher_id = random.choice(qualified_teachers) if qualified_teachers else self.teachers[0]["id"]
+                teacher_id = self.rng.choice(qualified_teachers) if qualified_teachers else self.teachers[0]["id"]
                 teacher = self.teachers_dict[teacher_id]
                 
                 # Assign room  
-                room_id = random.choice(suitable_rooms) if suitable_rooms else self.rooms[0]["id"]
+                room_id = self.rng.choice(suitable_rooms) if suitable_rooms else self.rooms[0]["id"]
                 room = self.rooms_dict[room_id]
                 
                 # Assign time slot
-                time_slot = random.choice(self.time_slots)["id"]
+                time_slot = self.rng.choice(self.time_slots)["id"]
                 
                 assigned_activity.update({
                     "teacherId": teacher_id,
                     "teacherName": teacher["name"],
                     "roomId": room_id,
                     "roomName": room["name"],
-                    "day": random.choice(self.working_days),
+                    "day": self.rng.choice(self.working_days),
                     "timeSlotId": time_slot,
                     "period": time_slot
                 })
@@ -342,12 +286,12 @@ class EnhancedTimetableGA:
     
     def tournament_selection(self, population: List[List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
         """Enhanced tournament selection"""
-        tournament = random.sample(population, min(self.tournament_size, len(population)))
+        tournament = self.rng.sample(population, min(self.tournament_size, len(population)))
         return max(tournament, key=self.calculate_enhanced_fitness)
     
     def smart_crossover(self, parent1: List[Dict[str, Any]], parent2: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """Smart crossover that preserves good assignments"""
-        if random.random() > self.crossover_rate:
+        if self.rng.random() > self.crossover_rate:
             return parent1.copy()
         
         # Calculate fitness for each activity in both parents
@@ -368,7 +312,7 @@ class EnhancedTimetableGA:
                     child.append(copy.deepcopy(act2))
                 else:
                     # Both valid or both invalid, choose randomly
-                    child.append(copy.deepcopy(random.choice([act1, act2])))
+                    child.append(copy.deepcopy(self.rng.choice([act1, act2])))
             else:
                 child.append(copy.deepcopy(parent1[i]))
         
@@ -379,13 +323,13 @@ class EnhancedTimetableGA:
         mutated = copy.deepcopy(chromosome)
         
         for activity in mutated:
-            if random.random() < self.mutation_rate:
-                mutation_type = random.choice(['teacher', 'room', 'time', 'day'])
+            if self.rng.random() < self.mutation_rate:
+                mutation_type = self.rng.choice(['teacher', 'room', 'time', 'day'])
                 
                 if mutation_type == 'teacher':
                     qualified_teachers = self.get_qualified_teachers(activity["subjectName"])
                     if qualified_teachers:
-                        new_teacher_id = random.choice(qualified_teachers)
+                        new_teacher_id = self.rng.choice(qualified_teachers)
                         new_teacher = self.teachers_dict[new_teacher_id]
                         activity["teacherId"] = new_teacher_id
                         activity["teacherName"] = new_teacher["name"]
@@ -396,13 +340,13 @@ class EnhancedTimetableGA:
                         activity["studentCount"]
                     )
                     if suitable_rooms:
-                        new_room_id = random.choice(suitable_rooms)
+                        new_room_id = self.rng.choice(suitable_rooms)
                         new_room = self.rooms_dict[new_room_id]
                         activity["roomId"] = new_room_id
                         activity["roomName"] = new_room["name"]
                 
                 elif mutation_type == 'time':
-                    new_slot = random.choice(self.time_slots)
+                    new_slot = self.rng.choice(self.time_slots)
                     activity["timeSlotId"] = new_slot["id"]
                     activity["period"] = new_slot["id"]
                 
@@ -413,36 +357,85 @@ class EnhancedTimetableGA:
                         research_days = teacher.get("researchDays", [])
                         available_days = [d for d in self.working_days if d not in research_days]
                         if available_days:
-                            activity["day"] = random.choice(available_days)
+                            activity["day"] = self.rng.choice(available_days)
                         else:
-                            activity["day"] = random.choice(self.working_days)
+                            activity["day"] = self.rng.choice(self.working_days)
                     else:
-                        activity["day"] = random.choice(self.working_days)
+                        activity["day"] = self.rng.choice(self.working_days)
         
         return mutated
     
-    def solve(self) -> Tuple[List[Dict[str, Any]], float, Dict[str, Any]]:
-        """Enhanced GA algorithm with better convergence"""
-        start_time = time.time()
+    def solve(self, progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None,
+              cancel_token: Optional[CancellationToken] = None,
+              checkpoint_path: Optional[str] = None,
+              checkpoint_interval: int = 10,
+              resume_from: Optional[str] = None) -> Tuple[List[Dict[str, Any]], float, Dict[str, Any]]:
+        """Enhanced GA algorithm with better convergence
+
+        progress_callback, if given, is called once per generation with the generation's
+        best/mean fitness, hard violation count of the best chromosome and population diversity.
+        cancel_token is checked before every generation; when triggered, the current state is
+        checkpointed (if checkpoint_path is set) and SolveCancelled is raised.
+        With checkpoint_path, state is also saved every checkpoint_interval generations;
+        resume_from continues a run from such a checkpoint file.
+        """
+        if self.engine == ENGINE_STEADY_STATE:
+            return self.solve_steady_state(progress_callback, cancel_token, checkpoint_path,
+                                           checkpoint_interval, resume_from)
         
-        # Initialize population with smart chromosomes
-        population = []
-        for _ in range(self.population_size):
-            population.append(self.create_smart_chromosome())
+        start_time = time.time()
+        profiler = self.profiler
+        trace = [] if self.record_trace else None
         
         best_fitness = 0
         best_solution = None
         generation_count = 0
         stagnation_counter = 0
         fitness_history = []
+        start_generation = 0
+        
+        if resume_from:
+            state = self.load_solve_checkpoint(resume_from)
+            population = state["population"]
+            best_fitness = state["bestFitness"]
+            best_solution = state["bestSolution"]
+            stagnation_counter = state["stagnationCounter"]
+            fitness_history = state["fitnessHistory"]
+            start_generation = generation_count = state["generation"]
+            origins = ["checkpoint"] * len(population)
+            logging.info(f"Resuming GA from checkpoint at generation {start_generation}")
+        else:
+            # Initialize population with smart chromosomes
+            with profiler.phase("population"):
+                population = []
+                for _ in range(self.population_size):
+                    population.append(self.create_smart_chromosome())
+            origins = ["initial"] * len(population)
+        
+        def save_state(generation: int):
+            with profiler.phase("checkpoint"):
+                self.save_solve_checkpoint(checkpoint_path, population, generation, stagnation_counter,
+                                           best_fitness, best_solution, fitness_history)
         
         logging.info(f"Starting GA with population size: {self.population_size}")
         
-        for generation in range(self.generations):
+        for generation in range(start_generation, self.generations):
+            if cancel_token and cancel_token.is_cancelled:
+                if checkpoint_path:
+                    save_state(generation)
+                logging.info(f"GA cancelled before generation {generation + 1}")
+                raise SolveCancelled(cancel_token.reason or "cancelled")
+            
+            if checkpoint_path and generation > start_generation and generation % checkpoint_interval == 0:
+                save_state(generation)
+            
             generation_count = generation + 1
             
             # Calculate fitness for all chromosomes
-            fitness_scores = [self.calculate_enhanced_fitness(chrom) for chrom in population]
+            fitness_started = time.perf_counter()
+            with profiler.phase("fitness"):
+                fitness_scores = [self.calculate_enhanced_fitness(chrom) for chrom in population]
+            fitness_seconds = time.perf_counter() - fitness_started
             
             # Track best solution
             current_best_idx = fitness_scores.index(max(fitness_scores))
@@ -450,14 +443,38 @@ class EnhancedTimetableGA:
             
             fitness_history.append(current_best_fitness)
             
-            if current_best_fitness > best_fitness:
+            improved = current_best_fitness > best_fitness
+            if improved:
                 best_fitness = current_best_fitness
-                best_solution = copy.deepcopy(population[current_best_idx])
+                with profiler.phase("elitism"):
+                    best_solution = copy.deepcopy(population[current_best_idx])
                 stagnation_counter = 0
                 logging.info(f"Generation {generation_count}: New best fitness = {best_fitness}")
             else:
                 stagnation_counter += 1
             
+            if trace is not None:
+                with profiler.phase("trace"):
+                    trace.append(self.build_trace_record(
+                        generation_count, population, fitness_scores, current_best_idx,
+                        origins[current_best_idx] if improved else None,
+                        fitness_seconds, time.time() - start_time
+                    ))
+            
+            if progress_callback:
+                with profiler.phase("progress"):
+                    progress_callback({
+                        "generation": generation_count,
+                        "totalGenerations": self.generations,
+                        "bestFitness": best_fitness,
+                        "generationBestFitness": current_best_fitness,
+                        "meanFitness": round(sum(fitness_scores) / len(fitness_scores), 2),
+                        "hardViolations": self.count_hard_violations(population[current_best_idx]),
+                        "diversity": self.calculate_population_diversity(population),
+                        "stagnationGenerations": stagnation_counter,
+                        "elapsedTime": round(time.time() - start_time, 3)
+                    })
+            
             # Early stopping conditions
             if best_fitness >= 99000:  # Near-perfect solution
                 logging.info(f"Near-perfect solution found at generation {generation_count}")
@@ -473,21 +490,253 @@ class EnhancedTimetableGA:
             # Elitism: keep best solutions
             elite_indices = sorted(range(len(fitness_scores)), 
                                  key=lambda i: fitness_scores[i], reverse=True)[:self.elite_size]
-            for idx in elite_indices:
-                new_population.append(copy.deepcopy(population[idx]))
+            with profiler.phase("elitism"):
+                for idx in elite_indices:
+                    new_population.append(copy.deepcopy(population[idx]))
+            new_origins = ["elite"] * len(new_population)
             
             # Generate offspring
             while len(new_population) < self.population_size:
-                parent1 = self.tournament_selection(population)
-                parent2 = self.tournament_selection(population)
-                child = self.smart_crossover(parent1, parent2)
-                child = self.smart_mutate(child)
-                new_population.append(child)
+                with profiler.phase("selection"):
+                    parent1 = self.tournament_selection(population)
+                    parent2 = self.tournament_selection(population)
+                with profiler.phase("crossover"):
+                    child = self.smart_crossover(parent1, parent2)
+                with profiler.phase("mutation"):
+                    mutated = self.smart_mutate(child)
+                if trace is not None:
+                    new_origins.append("mutation" if mutated != child else
+                                       "crossover" if child != parent1 else "selection")
+                new_population.append(mutated)
             
             population = new_population
+            origins = new_origins
         
         execution_time = time.time() - start_time
+        stats = self.build_solve_stats(generation_count, best_fitness, stagnation_counter,
+                                       fitness_history, execution_time, trace)
+        
+        logging.info(f"GA completed in {execution_time:.2f} seconds with fitness {best_fitness}")
+        
+        return best_solution, best_fitness, stats
+    
+    def solve_steady_state(self, progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None,
+                           cancel_token: Optional[CancellationToken] = None,
+                           checkpoint_path: Optional[str] = None,
+                           checkpoint_interval: int = 10,
+                           resume_from: Optional[str] = None) -> Tuple[List[Dict[str, Any]], float, Dict[str, Any]]:
+        """Steady-state GA (engine "steadyState"), same contract as solve()
+
+        Each step breeds one child from two tournament winners and writes it over one member in
+        place when the child's penalty is no higher: the worst member (taken from a heap), or with
+        replacement "similar" the member of a tournament-sized sample that shares most assignments
+        with the child. Members are ranked by their unclipped penalty, since fitness is 0 for every
+        chromosome with a few hard conflicts. Every chromosome is evaluated once and its penalty
+        kept alongside it, so tournaments cost no evaluations and nothing is copied per generation.
+        A generation is population_size - elite_size steps, so generations, progress, checkpoints
+        and stagnation mean the same as in solve().
+        """
+        start_time = time.time()
+        profiler = self.profiler
+        trace = [] if self.record_trace else None
         
+        best_penalty = None
+        best_member = None
+        generation_count = 0
+        stagnation_counter = 0
+        fitness_history = []
+        start_generation = 0
+        engine_state = None
+        
+        if resume_from:
+            state = self.load_solve_checkpoint(resume_from)
+            population = state["population"]
+            best_member = state["bestSolution"]
+            stagnation_counter = state["stagnationCounter"]
+            fitness_history = state["fitnessHistory"]
+            start_generation = generation_count = state["generation"]
+            engine_state = state["engineState"]
+            origins = ["checkpoint"] * len(population)
+            logging.info(f"Resuming steady-state GA from checkpoint at generation {start_generation}")
+        else:
+            with profiler.phase("population"):
+                population = [self.create_smart_chromosome() for _ in range(self.population_size)]
+            origins = ["initial"] * len(population)
+        
+        with profiler.phase("fitness"):
+            penalties = [self.calculate_penalty(chrom) for chrom in population]
+        fitness_scores = [fitness_from_penalty(penalty) for penalty in penalties]
+        
+        # Max-heap on penalty of (-penalty, age, index). Ties go to the oldest member, so a freshly
+        # replaced slot is not the next one overwritten; entries of replaced members are skipped
+        # when they surface (their age no longer matches).
+        if engine_state:
+            ages = engine_state["memberAges"]
+            next_age = engine_state["nextAge"]
+            best_penalty = engine_state["bestPenalty"]
+        else:
+            ages = list(range(len(population)))
+            next_age = len(population)
+        heap = [(-penalties[i], ages[i], i) for i in range(len(population))]
+        heapq.heapify(heap)
+        
+        # Members are only ever replaced, never modified, so the best is kept by reference
+        improved = False
+        improvement = None
+        initial_best_idx = penalties.index(min(penalties))
+        if best_penalty is None or penalties[initial_best_idx] < best_penalty:
+            best_penalty = penalties[initial_best_idx]
+            best_member = population[initial_best_idx]
+            improved = True
+            improvement = origins[initial_best_idx]
+        
+        steps_per_generation = max(1, len(population) - self.elite_size)
+        replacements = 0
+        replaced_members = set()
+        
+        def save_state(generation: int):
+            with profiler.phase("checkpoint"):
+                self.save_solve_checkpoint(checkpoint_path, population, generation, stagnation_counter,
+                                           fitness_from_penalty(best_penalty), best_member, fitness_history,
+                                           engine_state={"memberAges": ages, "nextAge": next_age,
+                                                         "bestPenalty": best_penalty})
+        
+        logging.info(f"Starting steady-state GA with population size: {len(population)}")
+        
+        for generation in range(start_generation, self.generations):
+            if cancel_token and cancel_token.is_cancelled:
+                if checkpoint_path:
+                    save_state(generation)
+                logging.info(f"GA cancelled before generation {generation + 1}")
+                raise SolveCancelled(cancel_token.reason or "cancelled")
+            
+            if checkpoint_path and generation > start_generation and generation % checkpoint_interval == 0:
+                save_state(generation)
+            
+            generation_count = generation + 1
+            fitness_seconds = 0.0
+            
+            for _ in range(steps_per_generation):
+                with profiler.phase("selection"):
+                    parent1 = population[self.tournament_index(penalties)]
+                    parent2 = population[self.tournament_index(penalties)]
+                with profiler.phase("crossover"):
+                    child = self.smart_crossover(parent1, parent2)
+                with profiler.phase("mutation"):
+                    mutated = self.smart_mutate(child)
+                
+                fitness_started = time.perf_counter()
+                with profiler.phase("fitness"):
+                    child_penalty = self.calculate_penalty(mutated)
+                fitness_seconds += time.perf_counter() - fitness_started
+                
+                with profiler.phase("replacement"):
+                    if self.replacement == REPLACE_SIMILAR:
+                        sample = self.rng.sample(range(len(population)), min(self.tournament_size, len(population)))
+                        index = max(sample, key=lambda i: self.assignment_similarity(population[i], mutated))
+                    else:
+                        while heap[0][1] != ages[heap[0][2]]:
+                            heapq.heappop(heap)
+                        index = heap[0][2]
+                    if child_penalty > penalties[index]:
+                        continue
+                    
+                    population[index] = mutated
+                    penalties[index] = child_penalty
+                    fitness_scores[index] = fitness_from_penalty(child_penalty)
+                    ages[index] = next_age
+                    next_age += 1
+                    heapq.heappush(heap, (-child_penalty, ages[index], index))
+                    if len(heap) > 2 * len(population):
+                        heap = [(-penalties[i], ages[i], i) for i in range(len(population))]
+                        heapq.heapify(heap)
+                    replacements += 1
+                    replaced_members.add(index)
+                
+                origin = None
+                if trace is not None:
+                    origin = ("mutation" if mutated != child else
+                              "crossover" if child != parent1 else "selection")
+                    origins[index] = origin
+                if child_penalty < best_penalty:
+                    best_penalty = child_penalty
+                    best_member = mutated
+                    improved = True
+                    improvement = origin
+            
+            best_fitness = fitness_from_penalty(best_penalty)
+            current_best_idx = penalties.index(min(penalties))
+            current_best_fitness = fitness_scores[current_best_idx]
+            fitness_history.append(current_best_fitness)
+            
+            if improved:
+                stagnation_counter = 0
+                logging.info(f"Generation {generation_count}: New best penalty = {best_penalty}")
+            else:
+                stagnation_counter += 1
+            
+            if trace is not None:
+                with profiler.phase("trace"):
+                    trace.append(self.build_trace_record(
+                        generation_count, population, fitness_scores, current_best_idx,
+                        improvement if improved else None,
+                        fitness_seconds, time.time() - start_time, evaluations=steps_per_generation
+                    ))
+            improved = False
+            
+            if progress_callback:
+                with profiler.phase("progress"):
+                    progress_callback({
+                        "generation": generation_count,
+                        "totalGenerations": self.generations,
+                        "bestFitness": best_fitness,
+                        "generationBestFitness": current_best_fitness,
+                        "meanFitness": round(sum(fitness_scores) / len(fitness_scores), 2),
+                        "hardViolations": self.count_hard_violations(population[current_best_idx]),
+                        "diversity": self.calculate_population_diversity(population),
+                        "stagnationGenerations": stagnation_counter,
+                        "elapsedTime": round(time.time() - start_time, 3)
+                    })
+            
+            if best_fitness >= 99000:
+                logging.info(f"Near-perfect solution found at generation {generation_count}")
+                break
+            
+            if stagnation_counter >= self.max_stagnation_generations:
+                logging.info(f"Stagnation detected at generation {generation_count}")
+                break
+        
+        # Same contract as solve(): no solution unless some chromosome scored above 0
+        best_fitness = fitness_from_penalty(best_penalty)
+        best_solution = best_member if best_fitness > 0 else None
+        
+        execution_time = time.time() - start_time
+        stats = self.build_solve_stats(generation_count, best_fitness, stagnation_counter,
+                                       fitness_history, execution_time, trace)
+        stats["replacements"] = replacements
+        stats["replacedMembers"] = len(replaced_members)
+        stats["bestPenalty"] = best_penalty
+        
+        logging.info(f"Steady-state GA completed in {execution_time:.2f} seconds with fitness {best_fitness}")
+        
+        return best_solution, best_fitness, stats
+    
+    def tournament_index(self, penalties: List[float]) -> int:
+        """Tournament selection over stored penalties (steady-state engine); returns the winner's index"""
+        contestants = self.rng.sample(range(len(penalties)), min(self.tournament_size, len(penalties)))
+        return min(contestants, key=penalties.__getitem__)
+    
+    def assignment_similarity(self, chromosome1: List[Dict[str, Any]], chromosome2: List[Dict[str, Any]]) -> int:
+        """Number of activity positions with the same teacher, room, day and time slot in both"""
+        return sum(
+            1 for a, b in zip(chromosome1, chromosome2)
+            if a["teacherId"] == b["teacherId"] and a["roomId"] == b["roomId"]
+            and a["day"] == b["day"] and a["timeSlotId"] == b["timeSlotId"]
+        )
+    
+    def build_solve_stats(self, generation_count: int, best_fitness: float, stagnation_counter: int,
+                          fitness_history: List[float], execution_time: float,
+                          trace: Optional[List[Dict[str, Any]]]) -> Dict[str, Any]:
         stats = {
             "generationsRun": generation_count,
             "finalFitness": best_fitness,
@@ -496,15 +745,153 @@ class EnhancedTimetableGA:
             "executionTime": execution_time,
             "stagnationGenerations": stagnation_counter,
             "fitnessHistory": fitness_history[-10:],  # Last 10 generations
-            "convergenceAchieved": best_fitness >= 95000
+            "convergenceAchieved": best_fitness >= 95000,
+            "seed": self.seed,
+            "engine": self.engine
         }
-        
-        logging.info(f"GA completed in {execution_time:.2f} seconds with fitness {best_fitness}")
-        
-        return best_solution, best_fitness, stats
+        if trace is not None:
+            stats["trace"] = trace
+        return stats
+    
+    def encode_chromosome(self, chromosome: List[Dict[str, Any]]) -> List[int]:
+        """Compact gene vector: activity id followed by teacher/room/day/slot indices per position"""
+        genes = []
+        for activity in chromosome:
+            genes.append(activity["activityId"])
+            genes.append(self.teacher_index.get(activity["teacherId"], -1))
+            genes.append(self.room_index.get(activity["roomId"], -1))
+            genes.append(self.day_index.get(activity["day"], -1))
+            genes.append(self.time_slot_indices.get(activity["timeSlotId"], -1))
+        return genes
+    
+    def decode_chromosome(self, genes: List[int]) -> List[Dict[str, Any]]:
+        """Rebuild a chromosome from encode_chromosome() output"""
+        chromosome = []
+        for offset in range(0, len(genes), GENES_PER_ACTIVITY):
+            activity_id, teacher_idx, room_idx, day_idx, slot_idx = genes[offset:offset + GENES_PER_ACTIVITY]
+            template = self.activities_by_id.get(activity_id)
+            if template is None:
+                raise CheckpointError(f"Checkpoint references unknown activity {activity_id}")
+            
+            activity = copy.deepcopy(template)
+            if teacher_idx >= 0:
+                teacher = self.teachers[teacher_idx]
+                activity["teacherId"] = teacher["id"]
+                activity["teacherName"] = teacher["name"]
+            if room_idx >= 0:
+                room = self.rooms[room_idx]
+                activity["roomId"] = room["id"]
+                activity["roomName"] = room["name"]
+            if day_idx >= 0:
+                activity["day"] = self.working_days[day_idx]
+            if slot_idx >= 0:
+                slot_id = self.time_slots[slot_idx]["id"]
+                activity["timeSlotId"] = slot_id
+                activity["period"] = slot_id
+            chromosome.append(activity)
+        return chromosome
+    
+    def save_solve_checkpoint(self, path: str, population: List[List[Dict[str, Any]]], generation: int,
+                              stagnation_counter: int, best_fitness: float,
+                              best_solution: Optional[List[Dict[str, Any]]], fitness_history: List[float],
+                              engine_state: Optional[Dict[str, Any]] = None):
+        """Write the GA state at the start of a generation to a checkpoint file (engine_state: engine-specific extras)"""
+        genes = [self.encode_chromosome(chrom) for chrom in population]
+        if best_solution is not None:
+            genes.append(self.encode_chromosome(best_solution))
+        
+        header = {
+            "generation": generation,
+            "stagnationCounter": stagnation_counter,
+            "bestFitness": best_fitness,
+            "hasBestSolution": best_solution is not None,
+            "fitnessHistory": fitness_history,
+            "populationSize": len(population),
+            "totalActivities": len(self.activities),
+            "randomState": serialize_random_state(self.rng.getstate()),
+            "engineState": engine_state,
+            "savedAt": datetime.now().isoformat()
+        }
+        save_checkpoint(path, header, genes)
+        logging.info(f"GA checkpoint written at generation {generation} to {path}")
+    
+    def load_solve_checkpoint(self, path: str) -> Dict[str, Any]:
+        """Read a checkpoint and restore the RNG; returns decoded population and counters"""
+        state = load_checkpoint(path)
+        if state["totalActivities"] != len(self.activities):
+            raise CheckpointError("Checkpoint was created for a different dataset")
+        
+        genes = state["genes"]
+        population = [self.decode_chromosome(vector) for vector in genes[:state["populationSize"]]]
+        best_solution = self.decode_chromosome(genes[-1]) if state["hasBestSolution"] else None
+        self.rng.setstate(deserialize_random_state(state["randomState"]))
+        
+        return {
+            "population": population,
+            "bestSolution": best_solution,
+            "bestFitness": state["bestFitness"],
+            "generation": state["generation"],
+            "stagnationCounter": state["stagnationCounter"],
+            "fitnessHistory": state["fitnessHistory"],
+            "engineState": state.get("engineState")
+        }
+    
+    def calculate_population_diversity(self, population: List[List[Dict[str, Any]]]) -> float:
+        """Average share of distinct assignments per activity position (0 = converged, 1 = all different)"""
+        if not population or not population[0]:
+            return 0.0
+        
+        distinct_total = 0
+        for position in range(len(population[0])):
+            distinct_total += len({
+                (chrom[position]["teacherId"], chrom[position]["roomId"], chrom[position]["day"], chrom[position]["timeSlotId"])
+                for chrom in population if position < len(chrom)
+            })
+        
+        return round(distinct_total / (len(population[0]) * len(population)), 4)
+    
+    def build_trace_record(self, generation: int, population: List[List[Dict[str, Any]]],
+                           fitness_scores: List[float], best_idx: int, improvement: Optional[str],
+                           fitness_seconds: float, elapsed: float,
+                           evaluations: Optional[int] = None) -> Dict[str, Any]:
+        """
+        One generation of the convergence trace. improvement names the operator that produced
+        a new overall best ("initial", "checkpoint", "elite", "crossover", "mutation" or "selection"
+        for an unchanged copy of a parent), or is None when the best did not improve.
+        evaluations is the number of fitness evaluations timed by fitness_seconds (default: the population).
+        """
+        from utils.constraint_checker import ConstraintChecker
+        checker = ConstraintChecker(self)
+        best = population[best_idx]
+        return {
+            "generation": generation,
+            "best": fitness_scores[best_idx],
+            "mean": round(sum(fitness_scores) / len(fitness_scores), 2),
+            "worst": min(fitness_scores),
+            "hardViolations": checker.count_hard_violations(best),
+            "softPenalty": checker.calculate_soft_penalty(best),
+            "diversity": self.calculate_population_diversity(population),
+            "evaluationsPerSecond": round((evaluations or len(population)) / fitness_seconds, 1) if fitness_seconds > 0 else None,
+            "improvement": improvement,
+            "elapsed": round(elapsed, 3)
+        }
+    
+    def count_hard_violations(self, chromosome):
+        """Count hard constraint violations using the constraint checker module"""
+        from utils.constraint_checker import ConstraintChecker
+        checker = ConstraintChecker(self)
+        return checker.count_hard_violations(chromosome)
+    
+    def calculate_penalty(self, chromosome):
+        """Unclipped penalty (lower is better) using the constraint checker module"""
+        from utils.constraint_checker import ConstraintChecker
+        self.fitness_evaluations += 1
+        checker = ConstraintChecker(self, self.profiler)
+        return checker.calculate_penalty(chromosome)
     
     def calculate_enhanced_fitness(self, chromosome):
         """Calculate fitness using the constraint checker module"""
         from utils.constraint_checker import ConstraintChecker
-        checker = ConstraintChecker(self)
+        self.fitness_evaluations += 1
+        checker = ConstraintChecker(self, self.profiler)
         return checker.calculate_enhanced_fitness(chromosome)
\ No newline at end of file
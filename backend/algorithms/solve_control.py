@@ -0,0 +1,135 @@
+from typing import Dict, Any, List
+from array import array
+import hashlib
+import random
+import threading
+import struct
+import json
+import zlib
+import os
+
+# Checkpoint file layout:
+#   MAGIC | format version (uint8) | header length (uint32) | JSON header | zlib(int32 gene array)
+CHECKPOINT_MAGIC = b"TTGACKPT"
+CHECKPOINT_VERSION = 1
+GENES_PER_ACTIVITY = 5  # activity id, then teacher, room, day and time slot indices
+
+
+class SolveCancelled(Exception):
+    """Raised by solve() when its cancellation token was triggered"""
+
+
+class CheckpointError(Exception):
+    """Raised when a checkpoint file is missing, corrupt or does not match the dataset"""
+
+
+class CancellationToken:
+    """Thread-safe flag checked by the GA once per generation"""
+
+    def __init__(self):
+        self._event = threading.Event()
+        self.reason = None
+
+    def cancel(self, reason: str = "cancelled"):
+        self.reason = reason
+        self._event.set()
+
+    @property
+    def is_cancelled(self) -> bool:
+        return self._event.is_set()
+
+
+def save_checkpoint(path: str, header: Dict[str, Any], genes: List[List[int]]):
+    """
+    Atomically write a checkpoint: JSON header plus one gene vector per chromosome.
+    All gene vectors must have the same length; header gets the vector length added.
+    """
+    vector_length = len(genes[0]) if genes else 0
+    flat = array("i")
+    for vector in genes:
+        if len(vector) != vector_length:
+            raise CheckpointError("All chromosomes in a checkpoint must have the same length")
+        flat.extend(vector)
+
+    header = {**header, "vectorLength": vector_length, "vectorCount": len(genes)}
+    header_bytes = json.dumps(header, separators=(",", ":")).encode("utf-8")
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "wb") as f:
+        f.write(CHECKPOINT_MAGIC)
+        f.write(struct.pack("<BI", CHECKPOINT_VERSION, len(header_bytes)))
+        f.write(header_bytes)
+        f.write(zlib.compress(flat.tobytes(), 6))
+    os.replace(temp_path, path)
+
+
+def load_checkpoint(path: str) -> Dict[str, Any]:
+    """Read a checkpoint written by save_checkpoint; returns the header with a "genes" list added"""
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except OSError as e:
+        raise CheckpointError(f"Cannot read checkpoint {path}: {e}")
+
+    prefix_size = len(CHECKPOINT_MAGIC) + struct.calcsize("<BI")
+    if len(data) < prefix_size or not data.startswith(CHECKPOINT_MAGIC):
+        raise CheckpointError(f"{path} is not a timetable checkpoint")
+
+    version, header_length = struct.unpack_from("<BI", data, len(CHECKPOINT_MAGIC))
+    if version != CHECKPOINT_VERSION:
+        raise CheckpointError(f"Unsupported checkpoint version {version}")
+
+    try:
+        header = json.loads(data[prefix_size:prefix_size + header_length].decode("utf-8"))
+        flat = array("i")
+        flat.frombytes(zlib.decompress(data[prefix_size + header_length:]))
+    except (ValueError, zlib.error) as e:
+        raise CheckpointError(f"Corrupt checkpoint {path}: {e}")
+
+    vector_length = header["vectorLength"]
+    if len(flat) != vector_length * header["vectorCount"]:
+        raise CheckpointError(f"Corrupt checkpoint {path}: gene data size mismatch")
+
+    header["genes"] = [
+        flat[i * vector_length:(i + 1) * vector_length].tolist()
+        for i in range(header["vectorCount"])
+    ]
+    return header
+
+
+def serialize_random_state(state: tuple) -> List[Any]:
+    """Make a random.getstate() tuple JSON-serializable"""
+    version, internal_state, gauss_next = state
+    return [version, list(internal_state), gauss_next]
+
+
+def deserialize_random_state(state: List[Any]) -> tuple:
+    version, internal_state, gauss_next = state
+    return (version, tuple(internal_state), gauss_next)
+
+
+def valid_seed(seed: Any) -> bool:
+    """algorithmSettings.seed is absent or a non-negative integer"""
+    return seed is None or (isinstance(seed, int) and not isinstance(seed, bool) and seed >= 0)
+
+
+def valid_checkpoint_interval(interval: Any) -> bool:
+    """algorithmSettings.checkpointInterval is absent or a positive integer"""
+    return interval is None or (isinstance(interval, int) and not isinstance(interval, bool) and interval > 0)
+
+
+def derive_seed(seed: int, *path: Any) -> int:
+    """
+    Seed of an independent stream derived from a run seed, e.g. derive_seed(seed, "worker", 3).
+    The same seed and path always give the same stream, whichever process or thread asks for it.
+    """
+    digest = hashlib.sha256(":".join(str(part) for part in (seed, *path)).encode()).digest()
+    return int.from_bytes(digest[:8], "big")
+
+
+def derived_random(seed: int, *path: Any) -> random.Random:
+    return random.Random(derive_seed(seed, *path))
@@ -0,0 +1,10 @@
+"""
+Offline benchmark suite for the solver, constraint checker, formatter and API.
+
+    python -m benchmarks.run                          # all sizes, results to benchmark_results.json
+    python -m benchmarks.run --sizes small,medium --baseline benchmarks/baseline.json --threshold 0.2
+    python -m benchmarks.run --save-baseline benchmarks/baseline.json
+
+Run from the backend directory. Instances come from utils.synthetic_data with fixed seeds,
+so every run on every machine measures the same corpus.
+"""
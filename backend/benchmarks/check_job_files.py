@@ -0,0 +1,56 @@
+from typing import List, Optional
+import argparse
+import json
+import logging
+import os
+import sys
+import tempfile
+
+import utils.job_manager as job_manager_module
+from utils.job_manager import JobManager, JOB_FAILED
+from benchmarks.corpus import load_request
+
+
+def crashing_generation(request_data, **kwargs):
+    raise RuntimeError("solver crashed")
+
+
+def check_crashed_job(checkpoint_dir: str) -> dict:
+    """A job whose solve raises is failed, leaves no files behind and is not resumed at the next startup"""
+    generate = job_manager_module.generate_timetable_cached
+    job_manager_module.generate_timetable_cached = crashing_generation
+    try:
+        manager = JobManager(max_workers=1, checkpoint_dir=checkpoint_dir)
+        job = manager.submit(load_request("small"))
+        job.future.result()
+        manager.shutdown()
+    finally:
+        job_manager_module.generate_timetable_cached = generate
+
+    restarted = JobManager(max_workers=1, checkpoint_dir=checkpoint_dir)
+    resumed = restarted.resume_interrupted_jobs()
+    restarted.shutdown()
+    return {
+        "status": job.status,
+        "error": job.error,
+        "filesLeft": sorted(name for name in os.listdir(checkpoint_dir) if name.startswith(job.id)),
+        "resumed": resumed
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Check that crashed background jobs are not resumed after a restart")
+    parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.CRITICAL, format="%(message)s")
+    with tempfile.TemporaryDirectory() as checkpoint_dir:
+        result = check_crashed_job(checkpoint_dir)
+    print(json.dumps(result, indent=2))
+    if result["status"] != JOB_FAILED or result["filesLeft"] or result["resumed"]:
+        print("Crashed job left resumable files behind", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,52 @@
+from typing import Dict, Any, List, Optional
+import argparse
+import json
+import logging
+import sys
+
+from algorithms.enhanced_genetic_algorithm import EnhancedTimetableGA, ENGINE_STEADY_STATE, REPLACEMENTS
+from utils.synthetic_data import generate_university_data
+
+# Every chromosome of this instance has enough hard conflicts to score fitness 0, so the
+# steady-state engine can only make progress if it ranks members by their raw penalty
+FLAT_FITNESS_INSTANCE = {"departments": 1, "years": 2, "sections": 1, "tightness": 0.5, "seed": 3}
+FLAT_FITNESS_SETTINGS = {"populationSize": 20, "generations": 15, "maxStagnationGenerations": 100}
+
+
+def run_flat_fitness(replacement: str, seed: int) -> Dict[str, Any]:
+    university_data = generate_university_data(**FLAT_FITNESS_INSTANCE)
+    university_data["algorithmSettings"] = {
+        **FLAT_FITNESS_SETTINGS, "engine": ENGINE_STEADY_STATE, "replacement": replacement, "seed": seed
+    }
+    ga = EnhancedTimetableGA(university_data)
+    _, best_fitness, stats = ga.solve()
+    return {
+        "replacement": replacement,
+        "finalFitness": best_fitness,
+        "bestPenalty": stats["bestPenalty"],
+        "replacements": stats["replacements"],
+        "replacedMembers": stats["replacedMembers"],
+        "populationSize": ga.population_size
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Check that the steady-state engine spreads replacements over the population when fitness is flat"
+    )
+    parser.add_argument("--seed", type=int, default=5, help="algorithmSettings.seed of the runs (default: 5)")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.ERROR, format="%(message)s")
+    runs = [run_flat_fitness(replacement, args.seed) for replacement in REPLACEMENTS]
+    failures = [run for run in runs if run["replacements"] > 1 and run["replacedMembers"] <= 1]
+    print(json.dumps({"runs": runs, "failures": failures}, indent=2))
+    if failures:
+        print(f"Steady-state replacement stuck on one member: {', '.join(run['replacement'] for run in failures)}",
+              file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,42 @@
+from typing import Dict, Any
+
+from utils.synthetic_data import generate_university_data
+
+# Fixed benchmark instances: generator arguments plus the GA settings used to solve them.
+# Changing an entry invalidates every stored baseline for that size.
+CORPUS: Dict[str, Dict[str, Any]] = {
+    "small": {
+        "data": {"departments": 1, "years": 2, "sections": 1, "courses_per_year": 3, "labs_per_year": 1,
+                 "tightness": 0.4, "seed": 11},
+        "algorithmSettings": {"populationSize": 20, "generations": 40}
+    },
+    "medium": {
+        "data": {"departments": 2, "years": 4, "sections": 1, "tightness": 0.5, "seed": 12},
+        "algorithmSettings": {"populationSize": 20, "generations": 20}
+    },
+    "large": {
+        "data": {"departments": 6, "years": 4, "sections": 2, "tightness": 0.7, "seed": 13},
+        "algorithmSettings": {"populationSize": 10, "generations": 5}
+    }
+}
+
+SIZES = tuple(CORPUS)
+
+
+def load_instance(size: str) -> Dict[str, Any]:
+    """universityData of a corpus instance (with its algorithmSettings attached)"""
+    entry = CORPUS[size]
+    university_data = generate_university_data(**entry["data"])
+    university_data["algorithmSettings"] = dict(entry["algorithmSettings"])
+    return university_data
+
+
+def load_request(size: str) -> Dict[str, Any]:
+    """/generate-timetable request body for a corpus instance (uncached, not persisted)"""
+    entry = CORPUS[size]
+    return {
+        "universityData": generate_university_data(**entry["data"]),
+        "algorithmSettings": dict(entry["algorithmSettings"]),
+        "useCache": False,
+        "persist": False
+    }
@@ -0,0 +1,85 @@
+from typing import Dict, Any, List, Optional
+from datetime import datetime
+import argparse
+import json
+import logging
+import platform
+import sys
+import time
+
+from algorithms.enhanced_genetic_algorithm import EnhancedTimetableGA, ENGINES
+from utils.synthetic_data import generate_university_data
+from utils.cost_model import instance_features, cost_terms, fit_coefficients, CostModel
+
+# Instances spanning the sizes the service sees (about 20 to 900 activities)
+FIT_INSTANCES = (
+    {"departments": 1, "years": 2, "sections": 1, "courses_per_year": 3, "labs_per_year": 1, "tightness": 0.4, "seed": 21},
+    {"departments": 1, "years": 4, "sections": 1, "tightness": 0.5, "seed": 22},
+    {"departments": 2, "years": 4, "sections": 1, "tightness": 0.5, "seed": 23},
+    {"departments": 3, "years": 4, "sections": 2, "tightness": 0.6, "seed": 24},
+    {"departments": 6, "years": 4, "sections": 2, "tightness": 0.7, "seed": 25}
+)
+FIT_POPULATIONS = (10, 20, 40)
+FIT_GENERATIONS = (2, 5)
+
+
+def measure_run(university_data: Dict[str, Any], population_size: int, generations: int, seed: int,
+                engine: str = ENGINES[0]) -> Dict[str, Any]:
+    """
+    One solve with early stopping on stagnation disabled. A run that still stops early (near-perfect
+    fitness) skips its last reproduction step, so it is flagged and left out of the fit.
+    Both engines are measured: the generational one alone cannot tell evaluation cost from
+    reproduction cost, since it always does a fixed number of evaluations per child.
+    """
+    ga = EnhancedTimetableGA(university_data)
+    ga.set_seed(seed)
+    ga.engine = engine
+    ga.population_size = population_size
+    ga.generations = generations
+    ga.max_stagnation_generations = generations + 1
+    start = time.perf_counter()
+    _, _, stats = ga.solve()
+    seconds = time.perf_counter() - start
+    return {"features": instance_features(ga), "seconds": seconds, "stoppedEarly": stats["generationsRun"] < generations}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Fit the solve-time cost model (utils.cost_model) on synthetic instances")
+    parser.add_argument("--output", default="cost_model.json", help="Coefficients file (default: cost_model.json)")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the GA's random stream (default: 0)")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.ERROR, format="%(message)s")
+    runs = []
+    for instance in FIT_INSTANCES:
+        university_data = generate_university_data(**instance)
+        for engine in ENGINES:
+            for population_size in FIT_POPULATIONS:
+                for generations in FIT_GENERATIONS:
+                    run = measure_run(university_data, population_size, generations, args.seed, engine)
+                    print(f"{run['features']['activities']:>5} activities  {engine:<12}  pop {population_size:>3}  "
+                          f"gens {generations:>2}  {run['seconds']:8.3f} s"
+                          f"{'  (stopped early, skipped)' if run['stoppedEarly'] else ''}", file=sys.stderr)
+                    if not run["stoppedEarly"]:
+                        runs.append(run)
+
+    coefficients = fit_coefficients([(cost_terms(run["features"]), run["seconds"]) for run in runs])
+    model = CostModel(coefficients)
+    errors = [abs(model.predict_seconds(run["features"]) - run["seconds"]) / run["seconds"] for run in runs]
+    result = {
+        "createdAt": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "processor": platform.processor() or platform.machine(),
+        "coefficients": coefficients,
+        "samples": len(runs),
+        "meanRelativeError": round(sum(errors) / len(errors), 4),
+        "maxRelativeError": round(max(errors), 4)
+    }
+    with open(args.output, "w") as f:
+        json.dump(result, f, indent=2)
+    print(json.dumps(result, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,277 @@
+from typing import Dict, Any, List, Optional, Callable
+from datetime import datetime
+import argparse
+import gzip
+import json
+import logging
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+
+from algorithms.enhanced_genetic_algorithm import EnhancedTimetableGA
+from algorithms.compiled_instance import compiled_instance_cache
+from utils.constraint_checker import ConstraintChecker
+from utils.conflict_analyzer import check_enhanced_conflicts
+from utils.timetable_formatter import format_enhanced_timetable
+from utils.compression import FastJSONResponse
+from utils.synthetic_data import describe_instance
+from benchmarks.corpus import SIZES, load_instance, load_request
+
+BENCHMARKS = (
+    "ga_init", "create_smart_chromosome", "fitness", "crossover", "mutate", "solve",
+    "check_enhanced_conflicts", "format_enhanced_timetable", "response_encoding", "api_generate"
+)
+
+# Benchmarks whose value is a quality score rather than a duration (higher is better)
+QUALITY_METRICS = ("finalFitness",)
+
+DEFAULT_THRESHOLD = 0.25
+MIN_SAMPLE_SECONDS = 0.05
+
+
+def measure(fn: Callable[[], Any], repeat: int, seed: int = 0, rng: Optional[random.Random] = None) -> Dict[str, Any]:
+    """
+    Per-call time of fn: calls are batched so one sample takes at least MIN_SAMPLE_SECONDS,
+    and the median and minimum of `repeat` samples are reported. rng (the GA's random stream)
+    is reseeded before every sample so the GA operators see the same random stream each time.
+    """
+    if rng is not None:
+        rng.seed(seed)
+    start = time.perf_counter()
+    fn()
+    single = time.perf_counter() - start
+    number = max(1, int(MIN_SAMPLE_SECONDS / max(single, 1e-9)))
+
+    samples = []
+    for _ in range(repeat):
+        if rng is not None:
+            rng.seed(seed)
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        samples.append((time.perf_counter() - start) / number)
+    return {
+        "seconds": statistics.median(samples),
+        "minSeconds": min(samples),
+        "repeat": repeat,
+        "callsPerSample": number
+    }
+
+
+def with_seed(university_data: Dict[str, Any], seed: int) -> Dict[str, Any]:
+    """universityData whose algorithmSettings fix the solve's random stream"""
+    return {**university_data, "algorithmSettings": {**university_data.get("algorithmSettings", {}), "seed": seed}}
+
+
+def bench_solve(university_data: Dict[str, Any], seed: int) -> Dict[str, Any]:
+    """One full solve: wall time, time until the best chromosome has no hard violations, final quality"""
+    ga = EnhancedTimetableGA(with_seed(university_data, seed))
+    zero_hard_at: List[Optional[float]] = [None]
+
+    def on_generation(progress: Dict[str, Any]):
+        if zero_hard_at[0] is None and progress["hardViolations"] == 0:
+            zero_hard_at[0] = progress["elapsedTime"]
+
+    start = time.perf_counter()
+    best_solution, best_fitness, stats = ga.solve(progress_callback=on_generation)
+    elapsed = time.perf_counter() - start
+    return {
+        "seconds": elapsed,
+        "timeToZeroHard": zero_hard_at[0],
+        "finalFitness": best_fitness,
+        "hardViolations": ga.count_hard_violations(best_solution) if best_solution else None,
+        "generationsRun": stats["generationsRun"],
+        "secondsPerGeneration": elapsed / max(stats["generationsRun"], 1)
+    }, best_solution
+
+
+def run_size(size: str, repeat: int, only: Optional[List[str]], seed: int) -> Dict[str, Any]:
+    selected = [name for name in BENCHMARKS if not only or name in only]
+    university_data = load_instance(size)
+    results: Dict[str, Any] = {}
+
+    def log(name: str):
+        value = results[name]
+        logging.getLogger("benchmarks").warning(f"{size:>6} {name:<26} {value['seconds'] * 1000:10.3f} ms")
+
+    if "ga_init" in selected:
+        def init_cold():
+            compiled_instance_cache.clear()
+            EnhancedTimetableGA(university_data)
+        results["ga_init"] = measure(init_cold, repeat, seed)
+        log("ga_init")
+
+    ga = EnhancedTimetableGA(with_seed(university_data, seed))
+    parent1, parent2 = ga.create_smart_chromosome(), ga.create_smart_chromosome()
+    checker = ConstraintChecker(ga)
+
+    if "create_smart_chromosome" in selected:
+        results["create_smart_chromosome"] = measure(ga.create_smart_chromosome, repeat, seed, ga.rng)
+        log("create_smart_chromosome")
+    if "fitness" in selected:
+        results["fitness"] = measure(lambda: checker.calculate_enhanced_fitness(parent1), repeat, seed)
+        log("fitness")
+    if "crossover" in selected:
+        results["crossover"] = measure(lambda: ga.smart_crossover(parent1, parent2), repeat, seed, ga.rng)
+        log("crossover")
+    if "mutate" in selected:
+        results["mutate"] = measure(lambda: ga.smart_mutate(parent1), repeat, seed, ga.rng)
+        log("mutate")
+
+    solution = parent1
+    if "solve" in selected:
+        results["solve"], best_solution = bench_solve(university_data, seed)
+        solution = best_solution or parent1
+        log("solve")
+
+    if "check_enhanced_conflicts" in selected:
+        results["check_enhanced_conflicts"] = measure(lambda: check_enhanced_conflicts(solution, ga), repeat, seed)
+        log("check_enhanced_conflicts")
+    if "format_enhanced_timetable" in selected:
+        results["format_enhanced_timetable"] = measure(
+            lambda: format_enhanced_timetable(solution, university_data), repeat, seed
+        )
+        log("format_enhanced_timetable")
+
+    if "response_encoding" in selected:
+        payload = {"timetable": format_enhanced_timetable(solution, university_data),
+                   "conflicts": check_enhanced_conflicts(solution, ga)}
+        response = FastJSONResponse(payload)
+        results["response_encoding"] = {
+            **measure(lambda: response.render(payload), repeat, seed),
+            "stdlibJsonSeconds": measure(lambda: json.dumps(payload).encode("utf-8"), repeat, seed)["seconds"],
+            "bytes": len(response.body),
+            "gzipBytes": len(gzip.compress(response.body, compresslevel=6))
+        }
+        log("response_encoding")
+
+    if "api_generate" in selected:
+        results["api_generate"] = bench_api(size, repeat, seed)
+        log("api_generate")
+
+    return {"instance": describe_instance(university_data), "benchmarks": results}
+
+
+def bench_api(size: str, repeat: int, seed: int) -> Dict[str, Any]:
+    """End-to-end POST /api/generate-timetable through the ASGI test client (uncached, not persisted)"""
+    from fastapi.testclient import TestClient
+    from main import app
+
+    client = TestClient(app)
+    request = load_request(size)
+    request["algorithmSettings"]["seed"] = seed
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        response = client.post("/api/generate-timetable", json=request)
+        samples.append(time.perf_counter() - start)
+        if response.status_code != 200:
+            raise RuntimeError(f"generate-timetable returned {response.status_code} for {size}: {response.text[:200]}")
+    body = response.json()
+    return {
+        "seconds": statistics.median(samples),
+        "minSeconds": min(samples),
+        "repeat": repeat,
+        # A failed solve (no usable solution found) is still a valid timing of the full pipeline
+        "success": body.get("success", False),
+        "errorType": body.get("details", {}).get("errorType"),
+        "responseBytes": len(response.content)
+    }
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[Dict[str, Any]]:
+    """
+    Benchmarks that got slower than baseline * (1 + threshold), or whose solve quality
+    dropped by more than the same fraction. Benchmarks missing from either side are skipped.
+    """
+    regressions = []
+    for size, current in results["results"].items():
+        previous = baseline.get("results", {}).get(size)
+        if not previous:
+            continue
+        for name, value in current["benchmarks"].items():
+            old = previous["benchmarks"].get(name)
+            if not old:
+                continue
+            if old.get("seconds") and value["seconds"] > old["seconds"] * (1 + threshold):
+                regressions.append({
+                    "size": size, "benchmark": name, "metric": "seconds",
+                    "baseline": old["seconds"], "current": value["seconds"],
+                    "ratio": round(value["seconds"] / old["seconds"], 3)
+                })
+            for metric in QUALITY_METRICS:
+                if old.get(metric) and value.get(metric, 0) < old[metric] * (1 - threshold):
+                    regressions.append({
+                        "size": size, "benchmark": name, "metric": metric,
+                        "baseline": old[metric], "current": value.get(metric),
+                        "ratio": round(value.get(metric, 0) / old[metric], 3)
+                    })
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Run the timetable benchmark suite")
+    parser.add_argument("--sizes", default=",".join(SIZES), help=f"Comma-separated corpus sizes (default: {','.join(SIZES)})")
+    parser.add_argument("--only", help=f"Comma-separated benchmarks to run (default: all of {','.join(BENCHMARKS)})")
+    parser.add_argument("--repeat", type=int, default=5, help="Samples per benchmark (default: 5)")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the GA's random stream (default: 0)")
+    parser.add_argument("--output", default="benchmark_results.json", help="Results file (default: benchmark_results.json)")
+    parser.add_argument("--baseline", help="Baseline results file to compare against")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help=f"Allowed slowdown before a benchmark counts as a regression (default: {DEFAULT_THRESHOLD})")
+    parser.add_argument("--save-baseline", help="Also write the results to this baseline file")
+    parser.add_argument("--verbose", action="store_true", help="Keep the solver's own log output")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING, format="%(message)s")
+    if not args.verbose:
+        # The GA logs a warning per unplaceable activity; keep only the benchmark progress lines
+        logging.getLogger().setLevel(logging.ERROR)
+        logging.getLogger("benchmarks").setLevel(logging.WARNING)
+    os.environ.setdefault("TIMETABLE_STORE_DB", "")
+
+    sizes = [size.strip() for size in args.sizes.split(",") if size.strip()]
+    unknown = [size for size in sizes if size not in SIZES]
+    if unknown:
+        parser.error(f"Unknown sizes: {', '.join(unknown)}")
+    only = [name.strip() for name in args.only.split(",")] if args.only else None
+    if only and any(name not in BENCHMARKS for name in only):
+        parser.error(f"Unknown benchmarks: {', '.join(name for name in only if name not in BENCHMARKS)}")
+
+    results = {
+        "createdAt": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "repeat": args.repeat,
+        "seed": args.seed,
+        "results": {size: run_size(size, args.repeat, only, args.seed) for size in sizes}
+    }
+
+    exit_code = 0
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        results["comparison"] = {
+            "baseline": args.baseline,
+            "baselineCreatedAt": baseline.get("createdAt"),
+            "threshold": args.threshold,
+            "regressions": regressions
+        }
+        for regression in regressions:
+            print(f"REGRESSION {regression['size']} {regression['benchmark']} {regression['metric']}: "
+                  f"{regression['baseline']} -> {regression['current']} (x{regression['ratio']})", file=sys.stderr)
+        exit_code = 1 if regressions else 0
+
+    for path in filter(None, (args.output, args.save_baseline)):
+        with open(path, "w") as f:
+            json.dump(results, f, indent=2)
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
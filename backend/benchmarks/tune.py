@@ -0,0 +1,233 @@
+from typing import Dict, Any, List, Optional, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from functools import lru_cache
+import argparse
+import json
+import logging
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+
+from algorithms.enhanced_genetic_algorithm import EnhancedTimetableGA
+from algorithms.solve_control import derive_seed
+from utils.constraint_checker import ConstraintChecker, fitness_from_penalty
+from utils.cost_model import instance_features
+from utils.generation_service import apply_algorithm_settings
+from utils.presets import PRESETS, TUNED_SETTING_KEYS
+from utils.synthetic_data import generate_university_data
+
+# Tuning instances per size class. Seeds differ from benchmarks/corpus.py so the benchmark
+# baselines are not measured on the instances the presets were tuned on.
+TUNING_CLASSES: Dict[str, Dict[str, Any]] = {
+    "small": {
+        "maxActivities": 100,
+        "instances": (
+            {"departments": 1, "years": 2, "sections": 1, "courses_per_year": 3, "labs_per_year": 1,
+             "tightness": 0.4, "seed": 41},
+            {"departments": 1, "years": 4, "sections": 1, "tightness": 0.5, "seed": 42}
+        )
+    },
+    "medium": {
+        "maxActivities": 400,
+        "instances": (
+            {"departments": 2, "years": 4, "sections": 1, "tightness": 0.5, "seed": 43},
+            {"departments": 3, "years": 4, "sections": 2, "tightness": 0.6, "seed": 44}
+        )
+    },
+    "large": {
+        "maxActivities": None,
+        "instances": (
+            {"departments": 6, "years": 4, "sections": 2, "tightness": 0.7, "seed": 45},
+        )
+    }
+}
+
+POPULATION_SIZES = (10, 20, 30, 40, 60, 80, 100)
+
+# Settings the GA uses when a request leaves them out (EnhancedTimetableGA.__init__)
+GA_DEFAULTS = {"tournamentSize": 4, "maxStagnationGenerations": 20}
+
+
+def sample_settings(rng: random.Random) -> Dict[str, Any]:
+    """One random point of the search space"""
+    population_size = rng.choice(POPULATION_SIZES)
+    return {
+        "populationSize": population_size,
+        "mutationRate": round(rng.uniform(0.02, 0.3), 3),
+        "crossoverRate": round(rng.uniform(0.5, 0.95), 3),
+        "eliteSize": rng.randint(1, max(1, population_size // 5)),
+        "tournamentSize": rng.randint(2, 7),
+        "maxStagnationGenerations": rng.randint(5, 50)
+    }
+
+
+def candidate_settings(count: int, seed: int) -> List[Dict[str, Any]]:
+    """The current static presets (so the report shows where they rank) followed by random samples"""
+    candidates = [{**GA_DEFAULTS, **{key: preset[key] for key in TUNED_SETTING_KEYS if key in preset}}
+                  for preset in PRESETS.values()]
+    rng = random.Random(seed)
+    while len(candidates) < count:
+        candidates.append(sample_settings(rng))
+    return candidates[:count]
+
+
+@lru_cache(maxsize=None)
+def _instance(key: str) -> Dict[str, Any]:
+    """Generated instance per worker process (generator arguments as a JSON key)"""
+    return generate_university_data(**json.loads(key))
+
+
+def run_trial(task: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Solve one instance with one candidate within an evaluation budget and report the lowest
+    penalty the search reached. Fitness is clipped at 0, which makes every candidate look alike on
+    instances with many hard conflicts, so the raw penalty is tracked instead.
+    """
+    logging.disable(logging.WARNING)
+    ga = EnhancedTimetableGA(_instance(task["instance"]))
+    apply_algorithm_settings(ga, {**task["settings"], "seed": task["seed"]})
+    ga.generations = max(1, task["evaluations"] // instance_features(ga)["evaluationsPerGeneration"])
+
+    checker = ConstraintChecker(ga)
+    best = {"penalty": None}
+
+    def penalty(chromosome):
+        ga.fitness_evaluations += 1
+        value = checker.calculate_penalty(chromosome)
+        if best["penalty"] is None or value < best["penalty"]:
+            best["penalty"] = value
+        return value
+
+    # The generational engine scores by fitness, the steady-state engine by penalty
+    ga.calculate_penalty = penalty
+    ga.calculate_enhanced_fitness = lambda chromosome: fitness_from_penalty(penalty(chromosome))
+    start = time.perf_counter()
+    _, _, stats = ga.solve()
+    return {
+        "penalty": best["penalty"],
+        "seconds": time.perf_counter() - start,
+        "generations": ga.generations,
+        "generationsRun": stats["generationsRun"],
+        "evaluations": ga.fitness_evaluations
+    }
+
+
+def successive_halving(executor, candidates: List[Dict[str, Any]], instances: Tuple[Dict[str, Any], ...],
+                       seeds: List[int], min_evaluations: int, eta: int) -> Dict[str, Any]:
+    """
+    Race the candidates on every (instance, seed) pair: each rung ranks the survivors by mean rank
+    of their best penalty, keeps the top 1/eta and multiplies the evaluation budget by eta, until
+    eta or fewer candidates are left.
+    """
+    survivors = list(range(len(candidates)))
+    evaluations = min_evaluations
+    rungs = []
+    while True:
+        # Every candidate sees the same stream per (instance, seed): differences come from the settings
+        keys = [json.dumps(instance, sort_keys=True) for instance in instances]
+        pairs = [(key, derive_seed(seed, key)) for key in keys for seed in seeds]
+        tasks = [{"settings": candidates[index], "instance": key, "seed": seed, "evaluations": evaluations}
+                 for index in survivors for key, seed in pairs]
+        results = list(executor.map(run_trial, tasks))
+        by_candidate = {index: results[i * len(pairs):(i + 1) * len(pairs)] for i, index in enumerate(survivors)}
+
+        ranks = {index: [] for index in survivors}
+        for p in range(len(pairs)):
+            ordered = sorted(survivors, key=lambda index: by_candidate[index][p]["penalty"])
+            for rank, index in enumerate(ordered, start=1):
+                ranks[index].append(rank)
+
+        leaderboard = sorted(({
+            "candidate": index,
+            "meanRank": round(statistics.mean(ranks[index]), 3),
+            "meanPenalty": round(statistics.mean(r["penalty"] for r in by_candidate[index]), 1),
+            "meanSeconds": round(statistics.mean(r["seconds"] for r in by_candidate[index]), 3),
+            "generations": round(statistics.median(r["generations"] for r in by_candidate[index]))
+        } for index in survivors), key=lambda entry: (entry["meanRank"], entry["meanPenalty"]))
+        rungs.append({"evaluations": evaluations, "candidates": len(survivors), "leaderboard": leaderboard})
+        print(f"  rung {len(rungs)}: {len(survivors):>3} candidates x {len(pairs)} runs at {evaluations} evaluations, "
+              f"best mean penalty {leaderboard[0]['meanPenalty']}", file=sys.stderr)
+
+        if len(survivors) <= eta:
+            return {"winner": leaderboard[0], "rungs": rungs}
+        survivors = [entry["candidate"] for entry in leaderboard[:len(survivors) // eta]]
+        evaluations *= eta
+
+
+def tuned_preset(size: str, settings: Dict[str, Any], winner: Dict[str, Any]) -> Dict[str, Any]:
+    """Preset table entry for a size class: the winning settings at the generations of the final rung"""
+    max_activities = TUNING_CLASSES[size]["maxActivities"]
+    if max_activities:
+        description = f"Tuned for up to {max_activities} activities"
+    else:
+        bounded = [c["maxActivities"] for c in TUNING_CLASSES.values() if c["maxActivities"]]
+        description = f"Tuned for more than {max(bounded)} activities"
+    return {
+        **{key: settings[key] for key in TUNED_SETTING_KEYS},
+        "generations": winner["generations"],
+        "maxActivities": max_activities,
+        "description": description
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Tune GA settings per instance-size class by successive halving")
+    parser.add_argument("--sizes", default=",".join(TUNING_CLASSES),
+                        help=f"Comma-separated size classes (default: {','.join(TUNING_CLASSES)})")
+    parser.add_argument("--candidates", type=int, default=27, help="Settings sampled per size class (default: 27)")
+    parser.add_argument("--eta", type=int, default=3, help="Keep 1/eta of the candidates per rung (default: 3)")
+    parser.add_argument("--min-evaluations", type=int, default=2000,
+                        help="Fitness evaluations per run in the first rung (default: 2000)")
+    parser.add_argument("--seeds", type=int, default=2, help="Seeded runs per instance (default: 2)")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for sampling candidates and for the runs (default: 0)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes (default: CPU count)")
+    parser.add_argument("--output", default="tuned_presets.json",
+                        help="Presets file, loadable with TIMETABLE_PRESETS_FILE (default: tuned_presets.json)")
+    args = parser.parse_args(argv)
+
+    sizes = [size for size in args.sizes.split(",") if size]
+    unknown = [size for size in sizes if size not in TUNING_CLASSES]
+    if unknown:
+        parser.error(f"unknown size class(es): {', '.join(unknown)}")
+    if args.eta < 2:
+        parser.error("--eta must be at least 2")
+
+    candidates = candidate_settings(args.candidates, args.seed)
+    seeds = [args.seed + i for i in range(args.seeds)]
+    presets = {}
+    races = {}
+    with ProcessPoolExecutor(max_workers=args.workers) as executor:
+        for size in sizes:
+            print(f"{size}:", file=sys.stderr)
+            race = successive_halving(executor, candidates, TUNING_CLASSES[size]["instances"], seeds,
+                                      args.min_evaluations, args.eta)
+            winner = race["winner"]
+            presets[size] = tuned_preset(size, candidates[winner["candidate"]], winner)
+            races[size] = race["rungs"]
+
+    result = {
+        "createdAt": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "processor": platform.processor() or platform.machine(),
+        "tuning": {
+            "candidates": candidates,
+            "staticPresets": list(PRESETS)[:len(candidates)],
+            "eta": args.eta,
+            "minEvaluations": args.min_evaluations,
+            "seeds": seeds,
+            "rungs": races
+        },
+        "presets": presets
+    }
+    with open(args.output, "w") as f:
+        json.dump(result, f, indent=2)
+    print(json.dumps(presets, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
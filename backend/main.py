@@ -1,13 +1,21 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Response
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from typing import List, Dict, Any, Optional
 import uvicorn
 from datetime import datetime
 import json
+import os
 
 # Import our routers
 from routers.timetable_modular import router as timetable_router
+from routers.jobs import router as jobs_router
+from routers.validation_sessions import router as validation_sessions_router
+from routers.timetables import router as timetables_router
+from routers.edit_sessions import router as edit_sessions_router
+from utils.job_manager import job_manager
+from utils.compression import CompressionMiddleware
+from utils.metrics import metrics, MetricsMiddleware, CONTENT_TYPE as METRICS_CONTENT_TYPE
 
 # Create FastAPI app
 app = FastAPI(
@@ -25,8 +33,22 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress large responses (gzip/brotli) and accept compressed request bodies
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=int(os.environ.get("TIMETABLE_COMPRESSION_MIN_BYTES", "1024")),
+    max_request_bytes=int(float(os.environ.get("TIMETABLE_MAX_REQUEST_MB", "64")) * 1024 * 1024)
+)
+
+# Request latency per route for /metrics (outermost, so it includes compression time)
+app.add_middleware(MetricsMiddleware)
+
 # Include routers
 app.include_router(timetable_router, prefix="/api", tags=["timetable"])
+app.include_router(jobs_router, prefix="/api", tags=["jobs"])
+app.include_router(validation_sessions_router, prefix="/api", tags=["validation"])
+app.include_router(timetables_router, prefix="/api", tags=["timetables"])
+app.include_router(edit_sessions_router, prefix="/api", tags=["timetables"])
 
 # Basic response models
 class HealthResponse(BaseModel):
@@ -60,6 +82,11 @@ async def health_check():
         version="1.0.0"
     )
 
+# Prometheus scrape endpoint (per-instance, in-process registry)
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    return Response(content=metrics.render(), media_type=METRICS_CONTENT_TYPE)
+
 # Test endpoint to verify backend-frontend communication
 @app.post("/test", response_model=TestResponse)
 async def test_endpoint(data: Dict[str, Any]):
@@ -170,6 +197,15 @@ async def startup_event():
     print("Health Check: http://localhost:8000/health")
     print("Test Endpoint: http://localhost:8000/test")
     print("Modular Architecture: Enhanced GA v2.0")
+    if os.environ.get("TIMETABLE_RESUME_JOBS", "1") == "1":
+        resumed = job_manager.resume_interrupted_jobs()
+        if resumed:
+            print(f"Resumed {len(resumed)} interrupted generation job(s)")
+
+# Shutdown event
+@app.on_event("shutdown")
+async def shutdown_event():
+    job_manager.shutdown()
 
 # Main entry point
 if __name__ == "__main__":
@@ -0,0 +1,101 @@
+from fastapi import APIRouter, HTTPException, Query
+from typing import Dict, Any
+import time
+
+from algorithms.compiled_instance import get_compiled_instance
+from utils.edit_sessions import edit_sessions, EditSession, EditError
+from utils.timetable_store import timetable_store
+from utils.compression import FastJSONResponse
+
+router = APIRouter()
+
+
+def _get_session_or_404(session_id: str):
+    session = edit_sessions.get(session_id)
+    if not session:
+        raise HTTPException(status_code=404, detail=f"Edit session {session_id} not found or expired")
+    return session
+
+
+@router.post("/edit-sessions")
+async def create_edit_session(request_data: Dict[str, Any]):
+    """
+    Hold a solution server-side for manual moves and swaps.
+    Body: {"timetableId": "..."} for a stored timetable, or {"universityData": {...}, "solution": [GA activity dicts]}
+    """
+    timetable_id = request_data.get("timetableId")
+    if timetable_id:
+        if timetable_store is None:
+            raise HTTPException(status_code=503, detail="Timetable persistence is disabled (TIMETABLE_STORE_DB is empty)")
+        loaded = timetable_store.load_solution(timetable_id)
+        if loaded is None:
+            raise HTTPException(status_code=404, detail=f"Timetable {timetable_id} not found")
+        university_data, solution = loaded
+    else:
+        university_data = request_data.get("universityData")
+        solution = request_data.get("solution")
+        if not university_data or solution is None:
+            raise HTTPException(status_code=400, detail="timetableId, or universityData and solution, are required")
+
+    try:
+        editor = EditSession(university_data, solution, get_compiled_instance(university_data))
+    except (EditError, KeyError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid solution: {e}")
+
+    session = edit_sessions.add(editor)
+    return {"sessionId": session.id, "timetableId": timetable_id, **editor.summary()}
+
+
+@router.get("/edit-sessions/{session_id}")
+async def get_edit_session(session_id: str, include_solution: bool = Query(False, alias="includeSolution")):
+    """
+    Current fitness and full conflict report of an edit session (optionally with the edited solution)
+    """
+    session = _get_session_or_404(session_id)
+    with session.lock:
+        response = {
+            "sessionId": session.id,
+            **session.state.summary(),
+            "conflicts": session.state.conflicts()
+        }
+        if include_solution:
+            response["solution"] = session.state.solution
+        return FastJSONResponse(response)
+
+
+@router.post("/edit-sessions/{session_id}/edits")
+async def apply_edits(session_id: str, edit: Dict[str, Any]):
+    """
+    Move or swap activities and get back the fitness change and the conflicts that appeared or were resolved.
+
+    Body: {"operations": [{"op": "move", "activityId": "...", "day": "Monday", "timeSlotId": 3, "roomId": 2},
+                          {"op": "swap", "activityIds": ["...", "..."]}],
+           "dryRun": false}
+    A move may change any of day, timeSlotId, roomId and teacherId; a swap exchanges time and room.
+    Operations are applied all-or-nothing; with dryRun the session is left unchanged.
+    """
+    session = _get_session_or_404(session_id)
+    operations = edit.get("operations", [edit] if "op" in edit else [])
+
+    start_time = time.time()
+    with session.lock:
+        try:
+            result = session.state.apply(operations, dry_run=bool(edit.get("dryRun", False)))
+        except EditError as e:
+            raise HTTPException(status_code=400, detail={"message": str(e), "version": session.state.version})
+
+    return {
+        "sessionId": session.id,
+        **result,
+        "elapsedMs": round((time.time() - start_time) * 1000, 3)
+    }
+
+
+@router.delete("/edit-sessions/{session_id}")
+async def delete_edit_session(session_id: str):
+    """
+    Discard an edit session
+    """
+    if not edit_sessions.delete(session_id):
+        raise HTTPException(status_code=404, detail=f"Edit session {session_id} not found or expired")
+    return {"sessionId": session_id, "deleted": True}
@@ -0,0 +1,151 @@
+from fastapi import APIRouter, HTTPException, Header
+from fastapi.responses import StreamingResponse, FileResponse
+from fastapi.concurrency import run_in_threadpool
+from typing import Dict, Any, Optional
+import logging
+import os
+
+from utils.job_manager import job_manager, JOB_COMPLETED, JOB_FAILED
+from utils.generation_service import estimate_generation
+from utils.event_stream import stream_job_events, SSE_HEADERS
+from utils.columnar_format import wants_msgpack, msgpack_response
+from utils.compression import FastJSONResponse
+from utils.solve_profiler import admin_token_valid, resolve_profile_mode, profile_path, PROFILE_FILES
+
+router = APIRouter()
+
+
+def _get_job_or_404(job_id: str):
+    job = job_manager.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return job
+
+
+def _require_admin(x_admin_token: Optional[str]):
+    if not admin_token_valid(x_admin_token):
+        raise HTTPException(status_code=403, detail="A valid X-Admin-Token header is required")
+
+
+@router.post("/jobs", status_code=202)
+async def create_generation_job(request_data: Dict[str, Any],
+                                idempotency_key: Optional[str] = Header(None),
+                                x_admin_token: Optional[str] = Header(None)):
+    """
+    Queue a timetable generation (same payload as /generate-timetable) and return its job id.
+    Admins may add "captureProfile": true | "both" | "sampling" | "cprofile" to profile the solve
+    (true captures both collapsed stacks and a pstats dump).
+    """
+    if request_data.get("captureProfile"):
+        _require_admin(x_admin_token)
+        if resolve_profile_mode(request_data["captureProfile"]) is None:
+            raise HTTPException(status_code=400, detail='captureProfile must be true, "both", "sampling" or "cprofile"')
+    
+    # Refuse requests the cost model rejects before they take a worker
+    if request_data.get("universityData"):
+        try:
+            estimate = await run_in_threadpool(estimate_generation, request_data)
+        except Exception as e:
+            # Malformed data is reported by the job's own validation
+            logging.warning(f"Could not estimate job cost: {str(e)}")
+            estimate = None
+        if estimate and estimate["admission"]["decision"] == "reject":
+            raise HTTPException(status_code=422, detail={
+                "message": "The predicted solve time exceeds the server limit and the request could not be downgraded to fit",
+                "admission": estimate["admission"]
+            })
+    job = job_manager.submit(request_data, idempotency_key=idempotency_key)
+    return {
+        **job.to_status(),
+        "statusUrl": f"/api/jobs/{job.id}",
+        "resultUrl": f"/api/jobs/{job.id}/result"
+    }
+
+
+@router.get("/jobs")
+async def list_generation_jobs():
+    """
+    List known jobs with their status
+    """
+    return {"jobs": job_manager.list_jobs(), "counts": job_manager.counts()}
+
+
+@router.get("/jobs/resumable")
+async def list_resumable_jobs():
+    """
+    List interrupted jobs (e.g. by a restart) that have a saved request and can be resumed
+    """
+    return {"jobIds": job_manager.resumable_job_ids()}
+
+
+@router.get("/jobs/{job_id}")
+async def get_generation_job(job_id: str):
+    """
+    Get job status, progress and best fitness so far
+    """
+    return _get_job_or_404(job_id).to_status()
+
+
+@router.get("/jobs/{job_id}/events")
+async def stream_generation_job_events(job_id: str):
+    """
+    Stream per-generation progress of a job as Server-Sent Events, ending with the result
+    """
+    job = _get_job_or_404(job_id)
+    return StreamingResponse(stream_job_events(job), media_type="text/event-stream", headers=SSE_HEADERS)
+
+
+@router.get("/jobs/{job_id}/result")
+async def get_generation_job_result(job_id: str, accept: Optional[str] = Header(None)):
+    """
+    Get the generation response of a finished job (MessagePack with "Accept: application/msgpack")
+    """
+    job = _get_job_or_404(job_id)
+    if job.status in (JOB_COMPLETED, JOB_FAILED) and job.result is not None:
+        if wants_msgpack(accept):
+            return msgpack_response(job.result)
+        return FastJSONResponse(job.result)
+    if job.status == JOB_FAILED:
+        return {
+            "success": False,
+            "error": job.error,
+            "message": "The generation job failed before producing a result",
+            "details": {"errorType": "JOB_FAILED"}
+        }
+    raise HTTPException(status_code=409, detail=f"Job {job_id} is {job.status}, result not available")
+
+
+@router.get("/jobs/{job_id}/profile")
+async def get_generation_job_profile(job_id: str, format: str = "collapsed",
+                                     x_admin_token: Optional[str] = Header(None)):
+    """
+    Download a job's captured profile: flamegraph collapsed stacks ("collapsed") or a pstats dump ("pstats")
+    """
+    _require_admin(x_admin_token)
+    if format not in PROFILE_FILES:
+        raise HTTPException(status_code=400, detail=f"format must be one of: {', '.join(PROFILE_FILES)}")
+    path = profile_path(job_id, format)
+    if not os.path.exists(path):
+        raise HTTPException(status_code=404, detail=f"No {format} profile for job {job_id}")
+    media_type = "text/plain" if format == "collapsed" else "application/octet-stream"
+    return FileResponse(path, media_type=media_type, filename=os.path.basename(path))
+
+
+@router.post("/jobs/{job_id}/resume", status_code=202)
+async def resume_generation_job(job_id: str):
+    """
+    Resume an interrupted job (e.g. stopped by a restart) from its last checkpoint
+    """
+    job = job_manager.resume(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"No saved state for job {job_id}")
+    return job.to_status()
+
+
+@router.delete("/jobs/{job_id}")
+async def cancel_generation_job(job_id: str):
+    """
+    Cancel a queued or running job
+    """
+    _get_job_or_404(job_id)
+    return job_manager.cancel(job_id).to_status()
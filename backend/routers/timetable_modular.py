@@ -1,185 +1,63 @@
-from fastapi import APIRouter, HTTPException
-from typing import Dict, Any
-import time
+from fastapi import APIRouter, HTTPException, Header
+from fastapi.responses import StreamingResponse
+from fastapi.concurrency import run_in_threadpool
+from typing import Dict, Any, Optional
 import logging
 from datetime import datetime
 
 # Import our modular components
-from algorithms.enhanced_genetic_algorithm import EnhancedTimetableGA
-from utils.enhanced_validator import (
-    generate_validation_suggestions, 
-    perform_pre_generation_checks,
-    validate_enhanced_university_data
-)
-from utils.timetable_formatter import (
-    format_enhanced_timetable,
-    calculate_enhanced_teacher_utilization,
-    calculate_enhanced_room_utilization,
-    calculate_constraint_satisfaction
-)
-from utils.conflict_analyzer import check_enhanced_conflicts
-from utils.data_validator import validate_university_data_structure
+from utils.enhanced_validator import validate_enhanced_university_data
+from utils.generation_service import generate_timetable_cached, estimate_generation
+from utils.result_cache import result_cache
+from algorithms.compiled_instance import compiled_instance_cache
+from utils.timetable_store import timetable_store
+from utils.edit_sessions import edit_sessions
+from utils.event_stream import stream_timetable_generation, SSE_HEADERS
+from utils.columnar_format import wants_msgpack, msgpack_response
+from utils.compression import FastJSONResponse
+from utils.presets import PRESETS, PRESET_AUTO, AUTO_TIME_BUDGET_SECONDS
 
 router = APIRouter()
 
 @router.post("/generate-timetable")
-async def generate_enhanced_timetable(request_data: Dict[str, Any]):
+async def generate_enhanced_timetable(request_data: Dict[str, Any], accept: Optional[str] = Header(None)):
     """
-    Generate university timetable using Enhanced Genetic Algorithm
+    Generate university timetable using Enhanced Genetic Algorithm.
+    Send "responseFormat": "columnar" for the compact dictionary-encoded timetable and
+    "Accept: application/msgpack" for a MessagePack body.
     """
+    # Solve in a worker thread so identical concurrent requests can be coalesced
+    result = await run_in_threadpool(generate_timetable_cached, request_data)
+    if wants_msgpack(accept):
+        return msgpack_response(result)
+    return FastJSONResponse(result)
+
+@router.post("/generate-timetable/stream")
+async def stream_enhanced_timetable(request_data: Dict[str, Any]):
+    """
+    Generate a timetable while streaming per-generation progress as Server-Sent Events.
+    The final event ("result") carries the same payload as /generate-timetable, or is an
+    "error" event if the generation crashed.
+    """
+    return StreamingResponse(
+        stream_timetable_generation(request_data),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS
+    )
+
+@router.post("/estimate")
+async def estimate_generation_cost(request_data: Dict[str, Any]):
+    """
+    Predict solve time and memory for a /generate-timetable payload (nothing is solved),
+    with the admission decision and effective settings the service would use
+    """
+    if not request_data.get("universityData"):
+        raise HTTPException(status_code=400, detail="universityData is required")
     try:
-        start_time = time.time()
-        
-        # Extract university data
-        university_data = request_data.get("universityData", {})
-        algorithm_settings = request_data.get("algorithmSettings", {})
-        
-        # Basic validation
-        if not university_data:
-            return {
-                "success": False,
-                "error": "Missing university data",
-                "message": "Please provide university data including teachers, subjects, rooms, students, and time slots",
-                "details": {
-                    "errorType": "MISSING_DATA",
-                    "requiredFields": ["basicInfo", "teachers", "subjects", "rooms", "students", "timeSlots"]
-                }
-            }
-        
-        # Validate data structure with detailed feedback
-        validation_result = validate_university_data_structure(university_data)
-        if not validation_result["valid"]:
-            return {
-                "success": False,
-                "error": "Data validation failed",
-                "message": "Your university data has validation errors that prevent timetable generation",
-                "details": {
-                    "errorType": "VALIDATION_FAILED",
-                    "errors": validation_result["errors"],
-                    "warnings": validation_result.get("warnings", []),
-                    "suggestions": generate_validation_suggestions(validation_result["errors"])
-                }
-            }
-        
-        # Additional pre-generation checks
-        pre_check_result = perform_pre_generation_checks(university_data)
-        if not pre_check_result["canGenerate"]:
-            return {
-                "success": False,
-                "error": "Pre-generation checks failed",
-                "message": "Critical issues found that prevent timetable generation",
-                "details": {
-                    "errorType": "PRE_GENERATION_FAILED",
-                    "criticalIssues": pre_check_result["criticalIssues"],
-                    "recommendations": pre_check_result["recommendations"]
-                }
-            }
-        
-        # Create enhanced GA instance
-        ga = EnhancedTimetableGA(university_data)
-        
-        # Override GA parameters if provided in request
-        if algorithm_settings:
-            ga.population_size = algorithm_settings.get("populationSize", ga.population_size)
-            ga.generations = algorithm_settings.get("generations", ga.generations)
-            ga.mutation_rate = algorithm_settings.get("mutationRate", ga.mutation_rate)
-            ga.crossover_rate = algorithm_settings.get("crossoverRate", ga.crossover_rate)
-            ga.elite_size = algorithm_settings.get("eliteSize", ga.elite_size)
-        
-        # Run enhanced GA algorithm
-        best_solution, best_fitness, algorithm_stats = ga.solve()
-        
-        if not best_solution:
-            return {
-                "success": False,
-                "error": "Algorithm failed to generate solution",
-                "message": "The genetic algorithm could not produce a valid timetable with the given constraints",
-                "details": {
-                    "errorType": "ALGORITHM_FAILURE",
-                    "suggestions": [
-                        "Try relaxing some constraints",
-                        "Add more teachers or rooms",
-                        "Reduce course hours or student enrollments",
-                        "Increase algorithm generations or population size"
-                    ]
-                }
-            }
-        
-        # Format timetable for response
-        formatted_timetable = format_enhanced_timetable(best_solution, university_data)
-        
-        execution_time = time.time() - start_time
-        
-        # Calculate enhanced statistics
-        teacher_utilization = calculate_enhanced_teacher_utilization(best_solution, university_data)
-        room_utilization = calculate_enhanced_room_utilization(best_solution, university_data)
-        
-        # Check for conflicts with detailed reporting
-        conflicts = check_enhanced_conflicts(best_solution, ga)
-        
-        # Calculate constraint satisfaction metrics
-        constraint_metrics = calculate_constraint_satisfaction(best_solution, ga)
-        
-        response = {
-            "success": True,
-            "message": "Timetable generated successfully using Enhanced Genetic Algorithm",
-            "executionTime": f"{execution_time:.2f} seconds",
-            "algorithmStats": {
-                **algorithm_stats,
-                "algorithm": "Enhanced Genetic Algorithm v2.0",
-                "constraintViolations": len([c for c in conflicts if c["type"] == "hard_constraint"])
-            },
-            "timetable": formatted_timetable,
-            "conflicts": conflicts,
-            "constraintMetrics": constraint_metrics,
-            "statistics": {
-                "teacherUtilization": teacher_utilization,
-                "roomUtilization": room_utilization,
-                "totalActivities": len(best_solution),
-                "totalTimeSlots": len(university_data.get("timeSlots", [])) * len(university_data.get("basicInfo", {}).get("workingDays", [])),
-                "utilizationPercentage": round((len(best_solution) / max(1, len(university_data.get("timeSlots", [])) * len(university_data.get("basicInfo", {}).get("workingDays", [])))) * 100, 1),
-                "qualityScore": round((best_fitness / 100000) * 100, 2)
-            },
-            "generatedAt": datetime.now().isoformat()
-        }
-        
-        return response
-        
-    except Exception as e:
-        import traceback
-        error_traceback = traceback.format_exc()
-        logging.error(f"Timetable generation error: {str(e)}")
-        logging.error(f"Full traceback: {error_traceback}")
-        
-        # Provide meaningful error messages based on the exception
-        error_message = str(e)
-        error_type = "GENERATION_ERROR"
-        suggestions = []
-        
-        if "can only concatenate str" in error_message:
-            error_message = "Time slot format incompatibility detected"
-            error_type = "TIME_SLOT_FORMAT_ERROR"
-            suggestions = ["Ensure time slots have consistent ID format (all strings or all numbers)"]
-        elif "No qualified teacher" in error_message:
-            error_type = "TEACHER_QUALIFICATION_ERROR" 
-            suggestions = ["Add subject names/codes to teacher 'subjectsCanTeach' arrays"]
-        elif "not enough values to unpack" in error_message:
-            error_type = "DATA_STRUCTURE_ERROR"
-            suggestions = ["Check that all required fields are present in your data"]
-        elif "list index out of range" in error_message:
-            error_type = "INSUFFICIENT_DATA_ERROR"
-            suggestions = ["Ensure you have sufficient teachers, rooms, and time slots for your requirements"]
-        
-        return {
-            "success": False,
-            "error": error_message,
-            "message": f"An unexpected error occurred during timetable generation: {error_message}",
-            "details": {
-                "errorType": error_type,
-                "suggestions": suggestions,
-                "technicalDetails": error_traceback if logging.getLogger().isEnabledFor(logging.DEBUG) else None
-            }
-        }
+        return await run_in_threadpool(estimate_generation, request_data)
+    except ValueError as e:
+        # Unknown preset, engine or replacement, invalid seed or checkpointInterval
+        raise HTTPException(status_code=422, detail=str(e))
 
 @router.post("/validate-enhanced-data")
 async def validate_enhanced_data_endpoint(request_data: Dict[str, Any]):
@@ -188,7 +66,7 @@ async def validate_enhanced_data_endpoint(request_data: Dict[str, Any]):
     """
     try:
         university_data = request_data.get("universityData", request_data)
-        return validate_enhanced_university_data(university_data)
+        return FastJSONResponse(validate_enhanced_university_data(university_data))
         
     except Exception as e:
         logging.error(f"Validation error: {str(e)}")
@@ -199,6 +77,21 @@ async def validate_enhanced_data_endpoint(request_data: Dict[str, Any]):
             "recommendations": ["Please check your data format and try again"]
         }
 
+@router.get("/cache/status")
+async def get_result_cache_status():
+    """
+    Result cache statistics (hits, misses, coalesced requests, tier sizes)
+    """
+    return result_cache.status()
+
+@router.delete("/cache")
+async def clear_result_cache():
+    """
+    Drop all cached generation results
+    """
+    result_cache.clear()
+    return {"success": True, "message": "Result cache cleared"}
+
 @router.get("/algorithm-settings-enhanced")
 async def get_enhanced_algorithm_settings():
     """
@@ -253,31 +146,17 @@ async def get_enhanced_algorithm_settings():
             }
         },
         "presets": {
-            "fast": {
-                "populationSize": 40,
-                "generations": 75,
-                "mutationRate": 0.15,
-                "crossoverRate": 0.8,
-                "eliteSize": 4,
-                "description": "Quick generation with acceptable quality (1-2 minutes)"
-            },
-            "balanced": {
-                "populationSize": 60,
-                "generations": 150,
-                "mutationRate": 0.12,
-                "crossoverRate": 0.85,
-                "eliteSize": 6,
-                "description": "Good balance of speed and quality (2-4 minutes)"
-            },
-            "quality": {
-                "populationSize": 100,
-                "generations": 250,
-                "mutationRate": 0.1,
-                "crossoverRate": 0.9,
-                "eliteSize": 8,
-                "description": "High quality results (5-10 minutes)"
+            **PRESETS,
+            PRESET_AUTO: {
+                "description": "Derived per instance (size, tightness, domain sizes) to fit algorithmSettings.timeBudgetSeconds",
+                "defaultTimeBudgetSeconds": AUTO_TIME_BUDGET_SECONDS
             }
-        }
+        },
+        "usage": "Send algorithmSettings.preset; explicit settings in the same request override the preset. "
+                 "POST /api/estimate predicts the solve time of any settings. "
+                 "Add algorithmSettings.seed (non-negative integer) for a reproducible run. "
+                 "algorithmSettings.engine \"steadyState\" replaces members in place (replacement: "
+                 "\"worst\" or \"similar\") instead of rebuilding the population every generation."
     }
 
 @router.get("/status-enhanced")
@@ -302,10 +181,29 @@ async def get_enhanced_api_status():
         },
         "modules": [
             "algorithms.enhanced_genetic_algorithm",
+            "algorithms.compiled_instance",
             "utils.constraint_checker",
             "utils.timetable_formatter", 
             "utils.enhanced_validator",
-            "utils.conflict_analyzer"
+            "utils.conflict_analyzer",
+            "utils.generation_service",
+            "utils.job_manager",
+            "utils.event_stream",
+            "utils.result_cache",
+            "utils.validation_sessions",
+            "utils.columnar_format",
+            "utils.compression",
+            "utils.timetable_store",
+            "utils.occupancy",
+            "utils.session_store",
+            "utils.edit_sessions",
+            "utils.profiling",
+            "utils.search_trace",
+            "utils.metrics",
+            "utils.solve_profiler",
+            "utils.memory_budget",
+            "utils.cost_model",
+            "utils.presets"
         ],
         "features": {
             "error_handling": "comprehensive with meaningful messages",
@@ -313,5 +211,9 @@ async def get_enhanced_api_status():
             "conflict_detection": "detailed with severity levels",
             "performance": "optimized with modular architecture"
         },
+        "resultCache": result_cache.status(),
+        "compiledInstanceCache": compiled_instance_cache.status(),
+        "timetableStore": timetable_store.status() if timetable_store else {"enabled": False},
+        "editSessions": edit_sessions.status(),
         "timestamp": datetime.now().isoformat()
     }
\ No newline at end of file
@@ -0,0 +1,158 @@
+from fastapi import APIRouter, HTTPException, Query
+from typing import Dict, Any, Optional
+import time
+
+from algorithms.compiled_instance import get_compiled_instance
+from utils.timetable_store import timetable_store
+from utils.occupancy import OccupancyIndex, occupancy_cache
+from utils.compression import FastJSONResponse
+
+router = APIRouter()
+
+
+def _require_store():
+    if timetable_store is None:
+        raise HTTPException(status_code=503, detail="Timetable persistence is disabled (TIMETABLE_STORE_DB is empty)")
+    return timetable_store
+
+
+def _get_timetable_or_404(timetable_id: str):
+    timetable = _require_store().get_timetable(timetable_id)
+    if not timetable:
+        raise HTTPException(status_code=404, detail=f"Timetable {timetable_id} not found")
+    return timetable
+
+
+@router.get("/timetables")
+async def list_stored_timetables(dataset_hash: Optional[str] = Query(None, alias="datasetHash"),
+                                 limit: int = Query(50, ge=1, le=1000)):
+    """
+    List stored timetables, newest first (optionally for one dataset hash)
+    """
+    return {"timetables": _require_store().list_timetables(dataset_hash, limit)}
+
+
+@router.get("/timetables/{timetable_id}")
+async def get_stored_timetable(timetable_id: str):
+    """
+    Settings and statistics of a stored timetable
+    """
+    return _get_timetable_or_404(timetable_id)
+
+
+@router.get("/timetables/{timetable_id}/activities")
+async def get_stored_timetable_activities(timetable_id: str):
+    """
+    All activities of a stored timetable in day/period order
+    """
+    _get_timetable_or_404(timetable_id)
+    return FastJSONResponse({"timetableId": timetable_id, "activities": timetable_store.activities(timetable_id)})
+
+
+@router.get("/timetables/{timetable_id}/teachers/{teacher_id}")
+async def get_teacher_timetable(timetable_id: str, teacher_id: str):
+    """
+    Weekly schedule of one teacher
+    """
+    _get_timetable_or_404(timetable_id)
+    return {"timetableId": timetable_id, "teacherId": teacher_id,
+            "activities": timetable_store.activities_for_teacher(timetable_id, teacher_id)}
+
+
+@router.get("/timetables/{timetable_id}/rooms/{room_id}")
+async def get_room_timetable(timetable_id: str, room_id: str):
+    """
+    Weekly occupancy of one room
+    """
+    _get_timetable_or_404(timetable_id)
+    return {"timetableId": timetable_id, "roomId": room_id,
+            "activities": timetable_store.activities_for_room(timetable_id, room_id)}
+
+
+@router.get("/timetables/{timetable_id}/groups/{group_id}")
+async def get_group_timetable(timetable_id: str, group_id: str):
+    """
+    Weekly schedule of one student group
+    """
+    _get_timetable_or_404(timetable_id)
+    return {"timetableId": timetable_id, "studentGroupId": group_id,
+            "activities": timetable_store.activities_for_group(timetable_id, group_id)}
+
+
+@router.get("/timetables/{timetable_id}/slots")
+async def get_slot_activities(timetable_id: str, day: str, slot: str):
+    """
+    Everything scheduled at one (day, time slot)
+    """
+    _get_timetable_or_404(timetable_id)
+    return {"timetableId": timetable_id, "day": day, "slot": slot,
+            "activities": timetable_store.activities_at(timetable_id, day, slot)}
+
+
+@router.get("/timetables/{timetable_id}/free-rooms")
+async def get_free_rooms(timetable_id: str, day: str, slot: str,
+                         min_capacity: int = Query(0, alias="minCapacity"),
+                         room_type: Optional[str] = Query(None, alias="type")):
+    """
+    Rooms not used at (day, time slot), smallest first; filter by minimum capacity and room type
+    """
+    rooms = _require_store().free_rooms(timetable_id, day, slot, min_capacity, room_type)
+    if rooms is None:
+        raise HTTPException(status_code=404, detail=f"Timetable {timetable_id} not found")
+    return {"timetableId": timetable_id, "day": day, "slot": slot, "rooms": rooms}
+
+
+def _move_options_response(index: OccupancyIndex, request_data: Dict[str, Any], start_time: float) -> Dict[str, Any]:
+    if "activityId" not in request_data:
+        raise HTTPException(status_code=400, detail="activityId is required")
+    result = index.move_options(request_data["activityId"], request_data.get("limit"))
+    if result is None:
+        raise HTTPException(status_code=404, detail=f"Activity {request_data['activityId']} is not in this timetable")
+    return {**result, "elapsedMs": round((time.time() - start_time) * 1000, 3)}
+
+
+@router.post("/timetables/{timetable_id}/move-options")
+async def get_stored_move_options(timetable_id: str, request_data: Dict[str, Any]):
+    """
+    Every (day, slot, room) an activity of a stored timetable can move to without a teacher,
+    student group or room clash, ranked by soft-constraint cost. Body: {"activityId": 12, "limit": 50}
+    """
+    store = _require_store()
+    start_time = time.time()
+
+    def build():
+        loaded = store.load_solution(timetable_id)
+        if loaded is None:
+            raise HTTPException(status_code=404, detail=f"Timetable {timetable_id} not found")
+        university_data, solution = loaded
+        return OccupancyIndex(get_compiled_instance(university_data), solution, university_data.get("constraints"))
+
+    index = occupancy_cache.get_or_build(timetable_id, build)
+    return _move_options_response(index, request_data, start_time)
+
+
+@router.post("/move-options")
+async def get_move_options(request_data: Dict[str, Any]):
+    """
+    Same as /timetables/{id}/move-options for a posted solution:
+    {"universityData": {...}, "solution": [GA activity dicts], "activityId": 12, "limit": 50}
+    """
+    university_data = request_data.get("universityData")
+    solution = request_data.get("solution")
+    if not university_data or solution is None:
+        raise HTTPException(status_code=400, detail="universityData and solution are required")
+
+    start_time = time.time()
+    index = OccupancyIndex(get_compiled_instance(university_data), solution, university_data.get("constraints"))
+    return _move_options_response(index, request_data, start_time)
+
+
+@router.delete("/timetables/{timetable_id}")
+async def delete_stored_timetable(timetable_id: str):
+    """
+    Remove a stored timetable and its activity rows
+    """
+    if not _require_store().delete(timetable_id):
+        raise HTTPException(status_code=404, detail=f"Timetable {timetable_id} not found")
+    occupancy_cache.discard(timetable_id)
+    return {"timetableId": timetable_id, "deleted": True}
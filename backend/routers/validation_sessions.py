@@ -0,0 +1,97 @@
+from fastapi import APIRouter, HTTPException
+from typing import Dict, Any
+import time
+
+from utils.enhanced_validator import validate_enhanced_university_data
+from utils.validation_sessions import validation_sessions, IncrementalValidator, PatchError, REQUIRED_SECTIONS
+from utils.compression import FastJSONResponse
+
+router = APIRouter()
+
+
+def _get_session_or_404(session_id: str):
+    session = validation_sessions.get(session_id)
+    if not session:
+        raise HTTPException(status_code=404, detail=f"Validation session {session_id} not found or expired")
+    return session
+
+
+@router.post("/validation-sessions")
+async def create_validation_session(request_data: Dict[str, Any]):
+    """
+    Validate a full dataset once and keep it server-side for incremental re-validation.
+    Accepts the university data directly or wrapped as {"universityData": ...}.
+    """
+    university_data = request_data.get("universityData", request_data)
+    if any(section not in university_data for section in REQUIRED_SECTIONS):
+        # Structural problems are reported exactly like the one-shot validator, without a session
+        return {**validate_enhanced_university_data(university_data), "sessionId": None}
+
+    try:
+        session = validation_sessions.add(IncrementalValidator(university_data))
+    except PatchError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return FastJSONResponse({
+        **session.state.full_result(),
+        "sessionId": session.id,
+        "version": session.state.version
+    })
+
+
+@router.get("/validation-sessions/{session_id}")
+async def get_validation_session(session_id: str):
+    """
+    Full current validation result of a session (same shape as /validate-enhanced)
+    """
+    session = _get_session_or_404(session_id)
+    with session.lock:
+        return FastJSONResponse({
+            **session.state.full_result(),
+            "sessionId": session.id,
+            "version": session.state.version
+        })
+
+
+@router.patch("/validation-sessions/{session_id}")
+async def patch_validation_session(session_id: str, patch: Dict[str, Any]):
+    """
+    Apply add/update/remove operations on teachers, subjects, rooms or students and
+    return only the errors and warnings that appeared or were resolved.
+
+    Body: {"operations": [{"op": "update", "collection": "teachers", "id": 3,
+                           "item": {"subjectsCanTeach": [...]}}, ...]}
+    "add" takes a full item (with id), "update" merges the given fields, "remove" takes an id.
+    """
+    session = _get_session_or_404(session_id)
+    operations = patch.get("operations", [patch] if "op" in patch else [])
+
+    start_time = time.time()
+    with session.lock:
+        try:
+            changes = session.state.apply(operations)
+        except PatchError as e:
+            raise HTTPException(status_code=400, detail={
+                "message": str(e),
+                "appliedOperations": e.applied,
+                "changes": e.changes,
+                "version": session.state.version
+            })
+
+        return {
+            "sessionId": session.id,
+            "version": session.state.version,
+            "changes": changes,
+            **session.state.summary(),
+            "elapsedMs": round((time.time() - start_time) * 1000, 3)
+        }
+
+
+@router.delete("/validation-sessions/{session_id}")
+async def delete_validation_session(session_id: str):
+    """
+    Discard a validation session
+    """
+    if not validation_sessions.delete(session_id):
+        raise HTTPException(status_code=404, detail=f"Validation session {session_id} not found or expired")
+    return {"sessionId": session_id, "deleted": True}
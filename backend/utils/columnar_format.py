@@ -0,0 +1,141 @@
+from fastapi import HTTPException
+from fastapi.responses import Response
+from typing import Dict, Any, List, Optional
+
+# Values of the top-level "responseFormat" request option
+RESPONSE_FORMAT_NESTED = "nested"
+RESPONSE_FORMAT_COLUMNAR = "columnar"
+RESPONSE_FORMATS = (RESPONSE_FORMAT_NESTED, RESPONSE_FORMAT_COLUMNAR)
+
+COLUMNAR_VERSION = 1
+MSGPACK_MEDIA_TYPES = ("application/msgpack", "application/x-msgpack")
+
+
+class _Dictionary:
+    """Assigns consecutive integer codes to table rows in first-seen order"""
+
+    def __init__(self):
+        self.codes: Dict[Any, int] = {}
+        self.rows: List[Dict[str, Any]] = []
+
+    def code(self, key: Any, make_row) -> int:
+        code = self.codes.get(key)
+        if code is None:
+            code = len(self.rows)
+            self.codes[key] = code
+            self.rows.append(make_row())
+        return code
+
+
+def build_columnar_timetable(solution: List[Dict[str, Any]], university_data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Dictionary-encoded timetable: small lookup tables for subjects, teachers, rooms,
+    student groups, days and time slots, plus one integer column per activity field.
+    Row i of the timetable is made of element i of every column.
+    """
+    working_days = university_data.get("basicInfo", {}).get("workingDays", [])
+    time_slots = university_data.get("timeSlots", [])
+    day_codes = {day: idx for idx, day in enumerate(working_days)}
+    slot_codes = {ts["id"]: idx for idx, ts in enumerate(time_slots)}
+
+    subjects, teachers, rooms, groups = _Dictionary(), _Dictionary(), _Dictionary(), _Dictionary()
+    columns = {
+        "subject": [], "teacher": [], "room": [], "group": [],
+        "day": [], "slot": [], "duration": [], "sessionNumber": [], "totalSessions": []
+    }
+
+    for activity in solution:
+        columns["subject"].append(subjects.code(activity["subjectId"], lambda: {
+            "id": activity["subjectId"],
+            "name": activity["subjectName"],
+            "code": activity.get("subjectCode", ""),
+            "type": activity["subjectType"],
+            "department": activity.get("department", "")
+        }))
+        columns["teacher"].append(teachers.code(activity["teacherId"], lambda: {
+            "id": activity["teacherId"],
+            "name": activity.get("teacherName", "Unknown")
+        }))
+        columns["room"].append(rooms.code(activity["roomId"], lambda: {
+            "id": activity["roomId"],
+            "name": activity.get("roomName", "Unknown")
+        }))
+        columns["group"].append(groups.code(activity["studentGroupId"], lambda: {
+            "id": activity["studentGroupId"],
+            "name": activity["studentGroupName"],
+            "studentCount": activity["studentCount"]
+        }))
+        columns["day"].append(day_codes.get(activity["day"], -1))
+        columns["slot"].append(slot_codes.get(activity["timeSlotId"], -1))
+        columns["duration"].append(activity["duration"])
+        columns["sessionNumber"].append(activity.get("sessionNumber", 1))
+        columns["totalSessions"].append(activity.get("totalSessions", 1))
+
+    return {
+        "format": RESPONSE_FORMAT_COLUMNAR,
+        "version": COLUMNAR_VERSION,
+        "length": len(solution),
+        "tables": {
+            "subjects": subjects.rows,
+            "teachers": teachers.rows,
+            "rooms": rooms.rows,
+            "groups": groups.rows,
+            "days": list(working_days),
+            "timeSlots": [
+                {"id": ts["id"], "time": f"{ts['startTime']}-{ts['endTime']}"} for ts in time_slots
+            ]
+        },
+        "columns": columns
+    }
+
+
+def expand_columnar_timetable(columnar: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Decode a columnar timetable back into one dict per activity (reference decoder for clients)"""
+    tables = columnar["tables"]
+    columns = columnar["columns"]
+    rows = []
+    for i in range(columnar["length"]):
+        subject = tables["subjects"][columns["subject"][i]]
+        group = tables["groups"][columns["group"][i]]
+        day_code, slot_code = columns["day"][i], columns["slot"][i]
+        time_slot = tables["timeSlots"][slot_code] if slot_code >= 0 else {"id": None, "time": None}
+        rows.append({
+            "day": tables["days"][day_code] if day_code >= 0 else None,
+            "period": time_slot["id"],
+            "time": time_slot["time"],
+            "subject": subject["name"],
+            "subjectCode": subject["code"],
+            "teacher": tables["teachers"][columns["teacher"][i]]["name"],
+            "studentGroup": group["name"],
+            "room": tables["rooms"][columns["room"][i]]["name"],
+            "studentCount": group["studentCount"],
+            "type": subject["type"],
+            "duration": columns["duration"][i],
+            "department": subject["department"],
+            "sessionInfo": f"Session {columns['sessionNumber'][i]} of {columns['totalSessions'][i]}"
+        })
+    return rows
+
+
+def wants_msgpack(accept_header: Optional[str]) -> bool:
+    """True if the client's Accept header asks for MessagePack"""
+    if not accept_header:
+        return False
+    return any(media_type in accept_header for media_type in MSGPACK_MEDIA_TYPES)
+
+
+def encode_msgpack(payload: Dict[str, Any]) -> bytes:
+    """Encode a response as MessagePack (needs the optional msgpack package)"""
+    try:
+        import msgpack
+    except ImportError:
+        raise RuntimeError("MessagePack responses require the 'msgpack' package (pip install msgpack)")
+    return msgpack.packb(payload, use_bin_type=True, default=str)
+
+
+def msgpack_response(payload: Dict[str, Any]) -> Response:
+    """MessagePack-encoded response, or 406 when the optional encoder is not installed"""
+    try:
+        return Response(content=encode_msgpack(payload), media_type=MSGPACK_MEDIA_TYPES[0])
+    except RuntimeError as e:
+        raise HTTPException(status_code=406, detail=str(e))
@@ -0,0 +1,257 @@
+from fastapi.responses import JSONResponse
+from typing import Any, Dict, List, Optional, Tuple
+import gzip
+import json
+import logging
+import zlib
+
+try:
+    import orjson
+except ImportError:  # plain json fallback keeps the API working without the optional encoder
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Bodies smaller than this are sent uncompressed (compression overhead outweighs the gain)
+DEFAULT_MINIMUM_SIZE = 1024
+
+# Upper bound for a decompressed request body, guards against compression bombs
+DEFAULT_MAX_REQUEST_BYTES = 64 * 1024 * 1024
+
+# Responses that must reach the client incrementally are never buffered
+STREAMING_CONTENT_TYPES = (b"text/event-stream",)
+
+
+class UnsupportedEncodingError(ValueError):
+    """Request body uses a Content-Encoding this server cannot decode"""
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSON response rendered with orjson when available.
+    Return it directly from an endpoint to skip FastAPI's jsonable_encoder pass over the payload.
+    """
+
+    def render(self, content: Any) -> bytes:
+        if orjson is not None:
+            return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS, default=str)
+        return json.dumps(content, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8")
+
+
+def available_encodings() -> List[str]:
+    """Response encodings this server can produce, in order of preference"""
+    return (["br"] if brotli is not None else []) + ["gzip"]
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """Pick the best supported encoding from an Accept-Encoding header (honours q-values)"""
+    accepted: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        fields = part.strip().split(";")
+        name = fields[0].strip().lower()
+        if not name:
+            continue
+        quality = 1.0
+        for param in fields[1:]:
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[name] = quality
+
+    best, best_quality = None, 0.0
+    for encoding in available_encodings():
+        quality = accepted.get(encoding, accepted.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def compress_body(body: bytes, encoding: str, gzip_level: int = 6, brotli_quality: int = 5) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=brotli_quality)
+    return gzip.compress(body, compresslevel=gzip_level)
+
+
+def decompress_body(body: bytes, encoding: str, max_bytes: int) -> bytes:
+    """Decode a request body; raises ValueError for corrupt or oversized input"""
+    encoding = encoding.strip().lower()
+    if encoding in ("", "identity"):
+        return body
+    if encoding in ("gzip", "x-gzip", "deflate"):
+        # wbits=MAX_WBITS|32 auto-detects gzip and zlib headers
+        decompressor = zlib.decompressobj(zlib.MAX_WBITS | 32)
+        try:
+            data = decompressor.decompress(body, max_bytes + 1)
+        except zlib.error as e:
+            raise ValueError(f"Corrupt {encoding} request body: {e}")
+    elif encoding == "br":
+        if brotli is None:
+            raise UnsupportedEncodingError("Brotli request bodies are not supported by this server")
+        # Like the gzip path, stop producing output one byte past the limit; the decoder
+        # keeps its unflushed output and hands it out on later calls with empty input
+        decompressor = brotli.Decompressor()
+        try:
+            chunks = [decompressor.process(body, output_buffer_limit=max_bytes + 1)]
+            size = len(chunks[0])
+            while size <= max_bytes and not decompressor.can_accept_more_data():
+                chunks.append(decompressor.process(b"", output_buffer_limit=max_bytes + 1 - size))
+                size += len(chunks[-1])
+        except brotli.error as e:
+            raise ValueError(f"Corrupt br request body: {e}")
+        if size <= max_bytes and not decompressor.is_finished():
+            raise ValueError("Corrupt br request body: truncated stream")
+        data = b"".join(chunks)
+    else:
+        raise UnsupportedEncodingError(f"Unsupported Content-Encoding: {encoding}")
+
+    if len(data) > max_bytes:
+        raise ValueError(f"Decompressed request body exceeds {max_bytes} bytes")
+    return data
+
+
+def _header(headers: List[Tuple[bytes, bytes]], name: bytes) -> Optional[bytes]:
+    for key, value in headers:
+        if key.lower() == name:
+            return value
+    return None
+
+
+class CompressionMiddleware:
+    """
+    ASGI middleware that
+      - compresses responses with brotli or gzip as negotiated by Accept-Encoding,
+        when the body is at least minimum_size bytes, and
+      - transparently decodes gzip/deflate/br request bodies (Content-Encoding).
+    Server-Sent Event streams are passed through untouched.
+    """
+
+    def __init__(self, app, minimum_size: int = DEFAULT_MINIMUM_SIZE,
+                 max_request_bytes: int = DEFAULT_MAX_REQUEST_BYTES,
+                 gzip_level: int = 6, brotli_quality: int = 5):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.max_request_bytes = max_request_bytes
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = list(scope.get("headers", []))
+        content_encoding = _header(headers, b"content-encoding")
+        if content_encoding:
+            try:
+                body = await self._read_body(receive)
+                body = decompress_body(body, content_encoding.decode("latin-1"), self.max_request_bytes)
+            except UnsupportedEncodingError as e:
+                await self._send_error(send, 415, str(e))
+                return
+            except ValueError as e:
+                await self._send_error(send, 400, str(e))
+                return
+            headers = [(k, v) for k, v in headers if k.lower() not in (b"content-encoding", b"content-length")]
+            headers.append((b"content-length", str(len(body)).encode("latin-1")))
+            scope = {**scope, "headers": headers}
+            receive = self._replay(body, receive)
+
+        accept_encoding = _header(headers, b"accept-encoding")
+        encoding = choose_encoding(accept_encoding.decode("latin-1")) if accept_encoding else None
+        if encoding is None or scope.get("method") == "HEAD":
+            await self.app(scope, receive, send)
+            return
+
+        await self.app(scope, receive, self._compressing_send(send, encoding))
+
+    def _compressing_send(self, send, encoding: str):
+        start_message = None
+        passthrough = False
+        chunks: List[bytes] = []
+
+        async def wrapped_send(message):
+            nonlocal start_message, passthrough
+            if message["type"] == "http.response.start":
+                response_headers = message.get("headers", [])
+                content_type = _header(response_headers, b"content-type") or b""
+                if (_header(response_headers, b"content-encoding") is not None
+                        or content_type.startswith(STREAMING_CONTENT_TYPES)):
+                    passthrough = True
+                    await send(message)
+                else:
+                    start_message = message
+                return
+
+            if passthrough or message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            chunks.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+
+            body = b"".join(chunks)
+            response_headers = [
+                (k, v) for k, v in start_message.get("headers", [])
+                if k.lower() != b"content-length"
+            ]
+            if len(body) >= self.minimum_size:
+                body = compress_body(body, encoding, self.gzip_level, self.brotli_quality)
+                response_headers.append((b"content-encoding", encoding.encode("latin-1")))
+                vary = _header(response_headers, b"vary")
+                if vary is None:
+                    response_headers.append((b"vary", b"Accept-Encoding"))
+                elif b"accept-encoding" not in vary.lower():
+                    response_headers = [(k, v) for k, v in response_headers if k.lower() != b"vary"]
+                    response_headers.append((b"vary", vary + b", Accept-Encoding"))
+            response_headers.append((b"content-length", str(len(body)).encode("latin-1")))
+
+            await send({**start_message, "headers": response_headers})
+            await send({"type": "http.response.body", "body": body})
+
+        return wrapped_send
+
+    async def _read_body(self, receive) -> bytes:
+        chunks = []
+        size = 0
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                raise ValueError("Client disconnected while sending the request body")
+            chunk = message.get("body", b"")
+            size += len(chunk)
+            if size > self.max_request_bytes:
+                raise ValueError(f"Compressed request body exceeds {self.max_request_bytes} bytes")
+            chunks.append(chunk)
+            if not message.get("more_body", False):
+                return b"".join(chunks)
+
+    @staticmethod
+    def _replay(body: bytes, receive):
+        sent = False
+
+        async def replay_receive():
+            nonlocal sent
+            if not sent:
+                sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        return replay_receive
+
+    @staticmethod
+    async def _send_error(send, status: int, detail: str):
+        logging.warning(f"Rejected request body: {detail}")
+        body = json.dumps({"detail": detail}).encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode("latin-1"))]
+        })
+        await send({"type": "http.response.body", "body": body})
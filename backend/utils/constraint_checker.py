@@ -2,14 +2,41 @@ from typing import Dict, Any, List
 from collections import defaultdict
 import logging
 
+# Fitness of a chromosome without any penalty
+MAX_FITNESS = 100000
+
+
+def fitness_from_penalty(penalty: float) -> float:
+    """Fitness of a total penalty (higher is better, clipped at 0)"""
+    return max(0, MAX_FITNESS - penalty)
+
+
 class ConstraintChecker:
     """Handles all constraint checking and fitness calculation"""
     
-    def __init__(self, ga_instance):
+    CHECKS = (
+        "check_teacher_conflicts", "check_student_conflicts", "check_room_conflicts",
+        "check_room_capacity_violations", "check_teacher_qualification_violations",
+        "check_room_type_violations", "check_teacher_workload_violations",
+        "check_consecutive_hours_violations", "check_schedule_gaps", "check_lunch_break_violations",
+        "check_teacher_preference_violations", "check_research_day_violations"
+    )
+    
+    def __init__(self, ga_instance, profiler=None):
         self.ga = ga_instance
+        
+        # Time every check separately ("fitness.teacher_conflicts", ...) when profiling
+        if profiler is not None and profiler.enabled:
+            for name in self.CHECKS:
+                setattr(self, name, profiler.wrap(f"fitness.{name[len('check_'):]}", getattr(self, name)))
     
     def calculate_enhanced_fitness(self, chromosome: List[Dict[str, Any]]) -> float:
         """Enhanced fitness calculation with proper penalty weights"""
+        # Return fitness (higher is better, max possible is MAX_FITNESS)
+        return fitness_from_penalty(self.calculate_penalty(chromosome))
+    
+    def calculate_penalty(self, chromosome: List[Dict[str, Any]]) -> int:
+        """Total weighted penalty (unbounded, unlike fitness which stops at 0)"""
         penalty = 0
         
         # Hard Constraints (Must be zero for valid solution)
@@ -28,8 +55,25 @@ class ConstraintChecker:
         penalty += self.check_teacher_preference_violations(chromosome) * self.ga.penalty_weights["preference_violation"]
         penalty += self.check_research_day_violations(chromosome) * self.ga.penalty_weights["research_day_violation"]
         
-        # Return fitness (higher is better, max possible is 100000)
-        return max(0, 100000 - penalty)
+        return penalty
+    
+    def calculate_soft_penalty(self, chromosome: List[Dict[str, Any]]) -> int:
+        """Weighted penalty of the soft constraints only"""
+        return (self.check_teacher_workload_violations(chromosome) * self.ga.penalty_weights["workload_violation"] +
+                self.check_consecutive_hours_violations(chromosome) * self.ga.penalty_weights["consecutive_violation"] +
+                self.check_schedule_gaps(chromosome) * self.ga.penalty_weights["gap_penalty"] +
+                self.check_lunch_break_violations(chromosome) * self.ga.penalty_weights["lunch_violation"] +
+                self.check_teacher_preference_violations(chromosome) * self.ga.penalty_weights["preference_violation"] +
+                self.check_research_day_violations(chromosome) * self.ga.penalty_weights["research_day_violation"])
+    
+    def count_hard_violations(self, chromosome: List[Dict[str, Any]]) -> int:
+        """Total number of hard constraint violations (unweighted)"""
+        return (self.check_teacher_conflicts(chromosome) +
+                self.check_student_conflicts(chromosome) +
+                self.check_room_conflicts(chromosome) +
+                self.check_room_capacity_violations(chromosome) +
+                self.check_teacher_qualification_violations(chromosome) +
+                self.check_room_type_violations(chromosome))
     
     def check_teacher_conflicts(self, chromosome: List[Dict[str, Any]]) -> int:
         """Check for teacher conflicts (same teacher, same time)"""
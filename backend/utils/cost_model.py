@@ -0,0 +1,192 @@
+from typing import Dict, Any, List, Optional, Tuple
+import json
+import logging
+import os
+
+from algorithms.enhanced_genetic_algorithm import ENGINE_STEADY_STATE
+from utils.memory_budget import estimate_solve_memory, MIN_POPULATION_SIZE
+
+# Predicted solve time above which requests are downgraded or rejected (0 = no limit)
+MAX_SOLVE_SECONDS = float(os.environ.get("TIMETABLE_MAX_SOLVE_SECONDS", "600"))
+
+# "downgrade": shrink generations, then population, to fit the limit; "reject": refuse the request
+ADMISSION_POLICY = os.environ.get("TIMETABLE_ADMISSION_POLICY", "downgrade")
+
+# Coefficients fitted by `python -m benchmarks.fit_cost_model` (set to use a refitted file)
+COST_MODEL_PATH = os.environ.get("TIMETABLE_COST_MODEL", "")
+
+# Fewest generations a downgraded request is left with
+MIN_GENERATIONS = 10
+
+# Seconds per unit of each cost term, fitted with benchmarks/fit_cost_model.py (CPython 3.11, x86_64;
+# 53 runs of 74-888 activities with both engines, mean relative error 20%)
+DEFAULT_COEFFICIENTS = {
+    "constant": 1.132e-02,
+    "initialization": 2.679e-05,
+    "evaluation": 2.608e-06,
+    "evaluationResources": 3.727e-05,
+    "reproduction": 4.624e-05
+}
+
+COST_TERMS = tuple(DEFAULT_COEFFICIENTS)
+
+
+def instance_features(ga) -> Dict[str, Any]:
+    """Size features of a configured GA run (instance plus effective algorithm settings)"""
+    slots = len(ga.time_slots) * len(ga.working_days)
+    tournament = min(ga.tournament_size, ga.population_size)
+    offspring = max(0, ga.population_size - min(ga.elite_size, ga.population_size))
+    if ga.engine == ENGINE_STEADY_STATE:
+        # One child per step and at least one step per generation; tournaments read stored fitness
+        offspring = max(1, offspring)
+        evaluations = offspring
+    else:
+        # Population evaluation plus the tournaments that pick both parents of each child
+        evaluations = ga.population_size + 2 * tournament * offspring
+    return {
+        "activities": len(ga.activities),
+        "teachers": len(ga.teachers),
+        "rooms": len(ga.rooms),
+        "weeklySlots": slots,
+        # Share of room-slots the activities occupy
+        "slotDensity": round(len(ga.activities) / (slots * len(ga.rooms)), 4) if slots and ga.rooms else None,
+        "populationSize": ga.population_size,
+        "generations": ga.generations,
+        "eliteSize": ga.elite_size,
+        "tournamentSize": ga.tournament_size,
+        "engine": ga.engine,
+        "evaluationsPerGeneration": evaluations,
+        "offspringPerGeneration": offspring
+    }
+
+
+def cost_terms(features: Dict[str, Any], generations: Optional[int] = None) -> Dict[str, float]:
+    """
+    Work units the model charges for a run: chromosome construction (population x activities),
+    fitness evaluations x activities and x resources (per-teacher/room bookkeeping in the checks),
+    and offspring copied through crossover and mutation (x activities).
+    """
+    generations = features["generations"] if generations is None else generations
+    activities = features["activities"]
+    evaluations = generations * features["evaluationsPerGeneration"]
+    return {
+        "constant": 1.0,
+        "initialization": features["populationSize"] * activities,
+        "evaluation": evaluations * activities,
+        "evaluationResources": evaluations * (features["teachers"] + features["rooms"]),
+        "reproduction": generations * features["offspringPerGeneration"] * activities
+    }
+
+
+def fit_coefficients(samples: List[Tuple[Dict[str, float], float]]) -> Dict[str, float]:
+    """
+    Non-negative fit of seconds = sum(coefficient x term) over (terms, seconds) samples, minimising
+    relative error so small and large runs count alike. While any coefficient is negative, the most
+    negative term is dropped and the rest refitted.
+    """
+    active = list(COST_TERMS)
+    while active:
+        solution = _least_squares([[terms[name] / seconds for name in active] for terms, seconds in samples],
+                                  [1.0] * len(samples))
+        if solution is None:
+            break
+        fitted = dict(zip(active, solution))
+        most_negative = min(active, key=lambda name: fitted[name])
+        if fitted[most_negative] >= 0:
+            return {name: fitted.get(name, 0.0) for name in COST_TERMS}
+        active.remove(most_negative)
+    return dict(DEFAULT_COEFFICIENTS)
+
+
+def _least_squares(rows: List[List[float]], targets: List[float]) -> Optional[List[float]]:
+    """Solve the normal equations (rows are column-scaled first for conditioning)"""
+    width = len(rows[0])
+    scales = [max(abs(row[j]) for row in rows) or 1.0 for j in range(width)]
+    scaled = [[row[j] / scales[j] for j in range(width)] for row in rows]
+    matrix = [[sum(r[i] * r[j] for r in scaled) for j in range(width)] +
+              [sum(r[i] * t for r, t in zip(scaled, targets))] for i in range(width)]
+
+    # Gaussian elimination with partial pivoting
+    for col in range(width):
+        pivot = max(range(col, width), key=lambda r: abs(matrix[r][col]))
+        if abs(matrix[pivot][col]) < 1e-12:
+            return None
+        matrix[col], matrix[pivot] = matrix[pivot], matrix[col]
+        for r in range(width):
+            if r != col:
+                factor = matrix[r][col] / matrix[col][col]
+                matrix[r] = [a - factor * b for a, b in zip(matrix[r], matrix[col])]
+    return [matrix[i][width] / matrix[i][i] / scales[i] for i in range(width)]
+
+
+class CostModel:
+    """Linear solve-time model over cost_terms(); memory comes from the memory budget estimator"""
+
+    def __init__(self, coefficients: Optional[Dict[str, float]] = None, source: str = "default"):
+        self.coefficients = {**DEFAULT_COEFFICIENTS, **(coefficients or {})}
+        self.source = source
+
+    @classmethod
+    def load(cls, path: str = COST_MODEL_PATH) -> "CostModel":
+        if path:
+            try:
+                with open(path) as f:
+                    return cls(json.load(f)["coefficients"], source=path)
+            except (OSError, ValueError, KeyError) as e:
+                logging.warning(f"Could not load cost model from {path}, using defaults: {str(e)}")
+        return cls()
+
+    def predict_seconds(self, features: Dict[str, Any], generations: Optional[int] = None) -> float:
+        terms = cost_terms(features, generations)
+        return sum(self.coefficients[name] * value for name, value in terms.items())
+
+    def predict(self, ga) -> Dict[str, Any]:
+        """Upper-bound prediction: the run is assumed to use all its generations (no early stop)"""
+        features = instance_features(ga)
+        return {
+            "features": features,
+            "predictedSeconds": round(self.predict_seconds(features), 3),
+            "predictedMemoryBytes": estimate_solve_memory(ga)["estimatedBytes"],
+            "model": self.source
+        }
+
+
+cost_model = CostModel.load()
+
+
+def admit_solve(ga, model: CostModel = cost_model, max_seconds: float = MAX_SOLVE_SECONDS,
+                policy: str = ADMISSION_POLICY) -> Dict[str, Any]:
+    """
+    Admission decision for a configured GA run: "accept", "downgrade" (ga.generations and
+    ga.population_size are reduced in place until the prediction fits) or "reject".
+    """
+    prediction = model.predict(ga)
+    decision = {"decision": "accept", "maxSeconds": max_seconds or None, **prediction}
+    if not max_seconds or prediction["predictedSeconds"] <= max_seconds:
+        return decision
+    if policy != "downgrade":
+        decision["decision"] = "reject"
+        return decision
+
+    original = {"populationSize": ga.population_size, "generations": ga.generations, "eliteSize": ga.elite_size}
+    population_size = ga.population_size
+    while True:
+        ga.population_size = population_size
+        if population_size < original["populationSize"]:
+            ga.elite_size = max(1, original["eliteSize"] * population_size // original["populationSize"])
+        features = instance_features(ga)
+        per_generation = model.predict_seconds(features, 1) - model.predict_seconds(features, 0)
+        fixed = model.predict_seconds(features, 0)
+        generations = int((max_seconds - fixed) / per_generation) if per_generation > 0 else ga.generations
+        if generations >= MIN_GENERATIONS:
+            ga.generations = min(generations, original["generations"])
+            return {**decision, "decision": "downgrade", "original": original, **model.predict(ga)}
+        if population_size <= MIN_POPULATION_SIZE:
+            break
+        population_size = max(MIN_POPULATION_SIZE, population_size * 3 // 4)
+
+    ga.population_size, ga.generations, ga.elite_size = (
+        original["populationSize"], original["generations"], original["eliteSize"]
+    )
+    decision["decision"] = "reject"
+    return decision
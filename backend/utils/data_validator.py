@@ -1,6 +1,9 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 
-def validate_university_data_structure(university_data: Dict[str, Any]) -> Dict[str, Any]:
+from algorithms.compiled_instance import CompiledInstance, get_compiled_instance
+
+def validate_university_data_structure(university_data: Dict[str, Any],
+                                       compiled: Optional[CompiledInstance] = None) -> Dict[str, Any]:
     """Validate university data structure"""
     errors = []
     warnings = []
@@ -14,39 +17,26 @@ def validate_university_data_structure(university_data: Dict[str, Any]) -> Dict[
     if errors:
         return {"valid": False, "errors": errors, "warnings": warnings}
     
-    # Validate teacher-subject relationships
-    subjects = university_data.get("subjects", [])
-    teachers = university_data.get("teachers", [])
-    students = university_data.get("students", [])
-    rooms = university_data.get("rooms", [])
+    # Validate teacher-subject relationships using the instance's inverted indexes
+    compiled = compiled or get_compiled_instance(university_data)
+    subjects = compiled.subjects
+    students = compiled.students
     
-    # Check if all subjects have qualified teachers
+    # Check if all subjects have qualified teachers (by name or code)
     for subject in subjects:
         subject_name = subject.get("name", "")
         subject_code = subject.get("code", "")
-        qualified_teachers = []
-        
-        # Check both subject name and code
-        for teacher in teachers:
-            subjects_can_teach = teacher.get("subjectsCanTeach", [])
-            if subject_name in subjects_can_teach or subject_code in subjects_can_teach:
-                qualified_teachers.append(teacher)
-        
-        if not qualified_teachers:
+        if not compiled.count_teachers_for(subject_name, subject_code):
             errors.append(f"No qualified teacher found for subject: {subject_name} ({subject_code})")
     
     # Check lab subjects have lab rooms
-    lab_subjects = [s for s in subjects if s.get("type") == "Lab"]
-    lab_rooms = [r for r in rooms if r.get("type") == "Laboratory"]
-    
-    if lab_subjects and not lab_rooms:
+    if compiled.lab_subjects and not compiled.lab_rooms:
         errors.append("Lab subjects found but no laboratory rooms available")
     
     # Check room capacities
     for student_group in students:
         total_students = student_group.get("totalStudents", 0)
-        suitable_rooms = [r for r in rooms if r.get("capacity", 0) >= total_students]
-        if not suitable_rooms:
+        if not compiled.count_rooms_with_capacity(total_students):
             errors.append(f"No room large enough for student group {student_group.get('batch', 'Unknown')} ({total_students} students)")
     
     return {
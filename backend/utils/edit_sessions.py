@@ -0,0 +1,421 @@
+from typing import Dict, Any, List, Optional, Tuple
+from collections import Counter, defaultdict
+from bisect import insort
+import copy
+import os
+
+from algorithms.compiled_instance import CompiledInstance, get_compiled_instance
+from algorithms.enhanced_genetic_algorithm import build_penalty_weights
+from utils.conflict_analyzer import check_enhanced_conflicts
+from utils.constraint_checker import fitness_from_penalty
+from utils.occupancy import teacher_day_penalty
+from utils.session_store import SessionStore
+
+# Fields exchanged by a swap: the two activities trade their placement (time and room)
+SWAP_FIELDS = ("day", "timeSlotId", "roomId", "roomName")
+
+# Resource kinds that must not be double-booked, with their conflict category and penalty weight
+CELL_KINDS = {
+    "teacher": ("teacherId", "teacher_conflict"),
+    "group": ("studentGroupId", "student_conflict"),
+    "room": ("roomId", "room_conflict")
+}
+
+_EMPTY = (0, 0, [])
+
+
+class EditError(ValueError):
+    """An edit referenced an unknown activity, day, time slot, room or teacher"""
+
+
+class EditSession:
+    """
+    A solution held server-side for manual editing. Penalty, hard violation count and
+    conflicts are kept per constraint key (a teacher/group/room cell, an activity, a teacher's
+    workload or one teacher-day), so an edit only re-evaluates the keys it touches.
+
+    Exposes the attributes ConstraintChecker and check_enhanced_conflicts read from the GA,
+    so the full checks can be run against the current solution at any time.
+    """
+
+    def __init__(self, university_data: Dict[str, Any], solution: List[Dict[str, Any]],
+                 compiled: Optional[CompiledInstance] = None):
+        self.university_data = university_data
+        self.compiled = compiled or get_compiled_instance(university_data)
+        self.teachers_dict = self.compiled.teachers_dict
+        self.rooms_dict = self.compiled.rooms_dict
+        self.time_slots_dict = self.compiled.time_slots_dict
+        self.time_slot_indices = self.compiled.time_slot_indices
+        self.penalty_weights = build_penalty_weights(university_data.get("constraints", {}))
+
+        basic_info = university_data.get("basicInfo", {})
+        lunch_start = basic_info.get("lunchBreakStart", "12:00")
+        lunch_end = basic_info.get("lunchBreakEnd", "13:00")
+        self.lunch_slot_ids = {
+            slot_id for slot_id, ts in self.time_slots_dict.items()
+            if (ts.get("startTime", "") >= lunch_start and ts.get("startTime", "") < lunch_end) or
+               (ts.get("endTime", "") > lunch_start and ts.get("endTime", "") <= lunch_end)
+        }
+
+        self.solution = copy.deepcopy(solution)
+        self.positions: Dict[Any, int] = {}
+        for position, activity in enumerate(self.solution):
+            if activity.get("activityId") in self.positions:
+                raise EditError(f"Duplicate activityId {activity.get('activityId')} in solution")
+            self.positions[activity.get("activityId")] = position
+
+        # Solution positions per (resource, day, slot), kept sorted so conflicts list subjects in solution order
+        self.cells: Dict[str, Dict[Tuple[Any, Any, Any], List[int]]] = {kind: defaultdict(list) for kind in CELL_KINDS}
+        self.teacher_hours: Dict[Any, int] = defaultdict(int)
+        self.teacher_activity_count: Dict[Any, int] = defaultdict(int)
+        self.teacher_day_slots: Dict[Tuple[Any, Any], List[int]] = defaultdict(list)
+
+        # Constraint key -> (weighted penalty, hard violations, conflict entries); zero entries are not stored
+        self.contributions: Dict[Tuple, Tuple[int, int, List[Dict[str, Any]]]] = {}
+        self.penalty = 0
+        self.hard_violations = 0
+        self.version = 0
+        self._before: Optional[Dict[Tuple, List[Dict[str, Any]]]] = None
+
+        keys = []
+        for position, activity in enumerate(self.solution):
+            self._index(position, 1)
+            keys.extend(self._keys_of(position))
+        self._refresh(keys)
+
+    def get_qualified_teachers(self, subject_name: str) -> List[Any]:
+        return self.compiled.subject_teacher_map.get(subject_name, [])
+
+    @property
+    def fitness(self) -> float:
+        return fitness_from_penalty(self.penalty)
+
+    # Edits
+
+    def apply(self, operations: List[Dict[str, Any]], dry_run: bool = False) -> Dict[str, Any]:
+        """
+        Apply move/swap operations atomically (all or none) and return the fitness change plus
+        the conflicts that appeared or were resolved. With dry_run the solution is left unchanged.
+        """
+        if not operations:
+            raise EditError("No edit operations given")
+
+        penalty_before, hard_before, fitness_before = self.penalty, self.hard_violations, self.fitness
+        undo: List[Tuple[int, Dict[str, Any]]] = []
+        self._before = {}
+        try:
+            for number, operation in enumerate(operations):
+                try:
+                    self._apply_operation(operation, undo)
+                except EditError as e:
+                    raise EditError(f"Operation {number}: {e}")
+
+            added, resolved = self._diff()
+            result = {
+                "dryRun": dry_run,
+                "fitness": self.fitness,
+                "fitnessDelta": self.fitness - fitness_before,
+                "penalty": self.penalty,
+                "penaltyDelta": self.penalty - penalty_before,
+                "hardViolations": self.hard_violations,
+                "hardViolationsDelta": self.hard_violations - hard_before,
+                "addedConflicts": added,
+                "resolvedConflicts": resolved,
+                "activities": [copy.deepcopy(self.solution[position]) for position in dict.fromkeys(p for p, _ in undo)]
+            }
+            if dry_run:
+                self._revert(undo)
+            else:
+                self.version += 1
+        except EditError:
+            self._revert(undo)
+            raise
+        finally:
+            self._before = None
+
+        result["version"] = self.version
+        return result
+
+    def _apply_operation(self, operation: Dict[str, Any], undo: List[Tuple[int, Dict[str, Any]]]):
+        op = operation.get("op")
+        if op == "move":
+            position = self._position(operation.get("activityId"))
+            fields: Dict[str, Any] = {}
+            if "day" in operation:
+                if operation["day"] not in self.compiled.day_index:
+                    raise EditError(f"Unknown day {operation['day']}")
+                fields["day"] = operation["day"]
+            if "timeSlotId" in operation:
+                if operation["timeSlotId"] not in self.time_slots_dict:
+                    raise EditError(f"Unknown time slot {operation['timeSlotId']}")
+                fields["timeSlotId"] = operation["timeSlotId"]
+            if "roomId" in operation:
+                room = self.rooms_dict.get(operation["roomId"])
+                if room is None:
+                    raise EditError(f"Unknown room {operation['roomId']}")
+                fields["roomId"] = operation["roomId"]
+                fields["roomName"] = room.get("name", "Unknown")
+            if "teacherId" in operation:
+                teacher = self.teachers_dict.get(operation["teacherId"])
+                if teacher is None:
+                    raise EditError(f"Unknown teacher {operation['teacherId']}")
+                fields["teacherId"] = operation["teacherId"]
+                fields["teacherName"] = teacher.get("name", "Unknown")
+            if not fields:
+                raise EditError("move needs at least one of day, timeSlotId, roomId or teacherId")
+            self._change(position, fields, undo)
+        elif op == "swap":
+            activity_ids = operation.get("activityIds")
+            if not isinstance(activity_ids, list) or len(activity_ids) != 2:
+                raise EditError("swap needs activityIds with exactly two activities")
+            first, second = (self._position(activity_id) for activity_id in activity_ids)
+            first_fields = {field: self.solution[first].get(field) for field in SWAP_FIELDS}
+            second_fields = {field: self.solution[second].get(field) for field in SWAP_FIELDS}
+            self._change(first, second_fields, undo)
+            self._change(second, first_fields, undo)
+        else:
+            raise EditError(f"Unsupported operation {op!r} (expected move or swap)")
+
+    def _position(self, activity_id: Any) -> int:
+        position = self.positions.get(activity_id)
+        if position is None:
+            raise EditError(f"Activity {activity_id} not found")
+        return position
+
+    def _change(self, position: int, fields: Dict[str, Any], undo: List[Tuple[int, Dict[str, Any]]]):
+        activity = self.solution[position]
+        undo.append((position, {field: activity.get(field) for field in fields}))
+        self._set_fields(position, fields)
+
+    def _revert(self, undo: List[Tuple[int, Dict[str, Any]]]):
+        for position, fields in reversed(undo):
+            self._set_fields(position, fields)
+
+    def _set_fields(self, position: int, fields: Dict[str, Any]):
+        keys = self._keys_of(position)
+        self._index(position, -1)
+        self.solution[position].update(fields)
+        self._index(position, 1)
+        self._refresh(keys + self._keys_of(position))
+
+    # Indexes
+
+    def _keys_of(self, position: int) -> List[Tuple]:
+        """Every constraint key whose evaluation depends on the activity at this position"""
+        activity = self.solution[position]
+        day, time_slot_id, teacher_id = activity["day"], activity["timeSlotId"], activity["teacherId"]
+        keys = [(kind, activity[field], day, time_slot_id) for kind, (field, _) in CELL_KINDS.items()]
+        keys.append(("activity", position))
+        keys.append(("workload", teacher_id))
+        keys.append(("teacherDay", teacher_id, day))
+        return keys
+
+    def _index(self, position: int, sign: int):
+        activity = self.solution[position]
+        day, time_slot_id, teacher_id = activity["day"], activity["timeSlotId"], activity["teacherId"]
+        for kind, (field, _) in CELL_KINDS.items():
+            cell = (activity[field], day, time_slot_id)
+            if sign > 0:
+                insort(self.cells[kind][cell], position)
+            else:
+                self.cells[kind][cell].remove(position)
+                if not self.cells[kind][cell]:
+                    del self.cells[kind][cell]
+
+        self.teacher_hours[teacher_id] += sign * (activity["duration"] // 60)
+        self.teacher_activity_count[teacher_id] += sign
+        if time_slot_id in self.time_slot_indices:
+            slots = self.teacher_day_slots[(teacher_id, day)]
+            if sign > 0:
+                slots.append(self.time_slot_indices[time_slot_id])
+            else:
+                slots.remove(self.time_slot_indices[time_slot_id])
+
+    def _refresh(self, keys: List[Tuple]):
+        for key in dict.fromkeys(keys):
+            old = self.contributions.pop(key, _EMPTY)
+            if self._before is not None and key not in self._before:
+                self._before[key] = old[2]
+            new = self._evaluate(key)
+            self.penalty += new[0] - old[0]
+            self.hard_violations += new[1] - old[1]
+            if new[0] or new[2]:
+                self.contributions[key] = new
+
+    def _diff(self) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """Conflicts added and resolved since apply() started (as multisets over all touched keys)"""
+        before_counts, after_counts = Counter(), Counter()
+        for key, before in self._before.items():
+            after = self.contributions.get(key, _EMPTY)[2]
+            if before != after:
+                before_counts.update(tuple(conflict.items()) for conflict in before)
+                after_counts.update(tuple(conflict.items()) for conflict in after)
+        added = [dict(items) for items in (after_counts - before_counts).elements()]
+        resolved = [dict(items) for items in (before_counts - after_counts).elements()]
+        return added, resolved
+
+    # Constraint evaluation (mirrors ConstraintChecker and check_enhanced_conflicts)
+
+    def _evaluate(self, key: Tuple) -> Tuple[int, int, List[Dict[str, Any]]]:
+        kind = key[0]
+        if kind in CELL_KINDS:
+            return self._evaluate_cell(kind, key[1], key[2], key[3])
+        if kind == "activity":
+            return self._evaluate_activity(self.solution[key[1]])
+        if kind == "workload":
+            return self._evaluate_workload(key[1])
+        teacher_id, day = key[1], key[2]
+        penalty = teacher_day_penalty(self.teachers_dict.get(teacher_id),
+                                      self.teacher_day_slots.get((teacher_id, day), []), self.penalty_weights)
+        return (penalty, 0, []) if penalty else _EMPTY
+
+    def _evaluate_cell(self, kind: str, resource_id: Any, day: Any, time_slot_id: Any):
+        positions = self.cells[kind].get((resource_id, day, time_slot_id))
+        if not positions or len(positions) < 2:
+            return _EMPTY
+
+        activities = [self.solution[position] for position in positions]
+        first = activities[0]
+        if kind == "teacher":
+            description = f"Teacher {first.get('teacherName', f'Teacher {resource_id}')} has multiple classes scheduled"
+        elif kind == "group":
+            description = f"Student group {first['studentGroupName']} has multiple classes scheduled"
+        else:
+            description = f"Room {first.get('roomName', f'Room {resource_id}')} is double-booked"
+
+        category = CELL_KINDS[kind][1]
+        subjects = [activity["subjectName"] for activity in activities]
+        conflict = {
+            "type": "hard_constraint",
+            "category": category,
+            "description": description,
+            "details": f"Day: {day}, Time Slot: {time_slot_id}, Subjects: {', '.join(subjects)}",
+            "severity": "critical",
+            "affectedActivities": len(activities)
+        }
+        count = len(activities) - 1
+        return count * self.penalty_weights[category], count, [conflict]
+
+    def _evaluate_activity(self, activity: Dict[str, Any]):
+        weights = self.penalty_weights
+        penalty, hard, conflicts = 0, 0, []
+
+        if activity["teacherId"] not in self.get_qualified_teachers(activity["subjectName"]):
+            penalty += weights["qualification_violation"]
+            hard += 1
+            conflicts.append({
+                "type": "hard_constraint",
+                "category": "qualification_violation",
+                "description": "Teacher not qualified for subject",
+                "details": f"Teacher: {activity.get('teacherName', 'Unknown')} assigned to teach {activity['subjectName']} but not qualified",
+                "severity": "high",
+                "affectedActivities": 1
+            })
+
+        room = self.rooms_dict.get(activity["roomId"])
+        if room:
+            required_type = activity.get("requiredRoomType", "Classroom")
+            room_type = room.get("type", "Classroom")
+            if required_type == "Laboratory" and room_type != "Laboratory":
+                penalty += weights["room_type_violation"]
+                hard += 1
+                conflicts.append({
+                    "type": "hard_constraint",
+                    "category": "room_type_violation",
+                    "description": "Lab subject scheduled in non-lab room",
+                    "details": f"Subject: {activity['subjectName']} (requires {required_type}) assigned to {activity.get('roomName', 'Unknown')} (type: {room_type})",
+                    "severity": "high",
+                    "affectedActivities": 1
+                })
+            if activity["studentCount"] > room.get("capacity", 0):
+                penalty += weights["capacity_violation"]
+                hard += 1
+                conflicts.append({
+                    "type": "hard_constraint",
+                    "category": "capacity_violation",
+                    "description": "Room capacity exceeded",
+                    "details": f"Room: {activity.get('roomName', 'Unknown')} (capacity: {room.get('capacity', 0)}) assigned {activity['studentCount']} students for {activity['subjectName']}",
+                    "severity": "medium",
+                    "affectedActivities": 1
+                })
+
+        teacher = self.teachers_dict.get(activity["teacherId"])
+        if teacher:
+            preferred_days = teacher.get("preferredDays", [])
+            if preferred_days and activity["day"] not in preferred_days:
+                penalty += weights["preference_violation"]
+            if activity["day"] in teacher.get("researchDays", []):
+                penalty += 2 * weights["research_day_violation"]
+                conflicts.append({
+                    "type": "soft_constraint",
+                    "category": "research_day_violation",
+                    "description": "Teaching scheduled on research day",
+                    "details": f"Teacher: {activity.get('teacherName', 'Unknown')} scheduled on research day {activity['day']} for {activity['subjectName']}",
+                    "severity": "medium",
+                    "affectedActivities": 1
+                })
+
+        if activity["timeSlotId"] in self.lunch_slot_ids:
+            penalty += weights["lunch_violation"]
+            conflicts.append({
+                "type": "soft_constraint",
+                "category": "lunch_violation",
+                "description": "Class scheduled during lunch break",
+                "details": f"Subject: {activity['subjectName']}, Teacher: {activity.get('teacherName', 'Unknown')}, Day: {activity['day']}",
+                "severity": "low",
+                "affectedActivities": 1
+            })
+
+        return penalty, hard, conflicts
+
+    def _evaluate_workload(self, teacher_id: Any):
+        teacher = self.teachers_dict.get(teacher_id)
+        if not teacher or not self.teacher_activity_count.get(teacher_id):
+            return _EMPTY
+
+        hours = self.teacher_hours[teacher_id]
+        min_hours = teacher.get("minHoursPerWeek", 0)
+        max_hours = teacher.get("maxHoursPerWeek", 40)
+        teacher_name = teacher.get("name", f"Teacher {teacher_id}")
+        if hours < min_hours:
+            return (min_hours - hours) * self.penalty_weights["workload_violation"], 0, [{
+                "type": "soft_constraint",
+                "category": "workload_violation",
+                "description": "Teacher under-utilized",
+                "details": f"Teacher: {teacher_name} has {hours} hours/week (minimum: {min_hours})",
+                "severity": "low",
+                "affectedActivities": 0
+            }]
+        if hours > max_hours:
+            return (hours - max_hours) * 2 * self.penalty_weights["workload_violation"], 0, [{
+                "type": "soft_constraint",
+                "category": "workload_violation",
+                "description": "Teacher overloaded",
+                "details": f"Teacher: {teacher_name} has {hours} hours/week (maximum: {max_hours})",
+                "severity": "medium",
+                "affectedActivities": 0
+            }]
+        return _EMPTY
+
+    # Views
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "version": self.version,
+            "activities": len(self.solution),
+            "fitness": self.fitness,
+            "penalty": self.penalty,
+            "hardViolations": self.hard_violations,
+            "conflictCount": sum(len(conflicts) for _, _, conflicts in self.contributions.values())
+        }
+
+    def conflicts(self) -> List[Dict[str, Any]]:
+        """Full conflict report of the current solution, in check_enhanced_conflicts order"""
+        return check_enhanced_conflicts(self.solution, self)
+
+
+edit_sessions = SessionStore(
+    "edit",
+    max_sessions=int(os.environ.get("TIMETABLE_EDIT_SESSIONS", "50")),
+    idle_timeout=float(os.environ.get("TIMETABLE_EDIT_SESSION_TTL", "1800"))
+)
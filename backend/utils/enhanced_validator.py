@@ -1,6 +1,8 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from collections import defaultdict
 
+from algorithms.compiled_instance import CompiledInstance, get_compiled_instance
+
 def generate_validation_suggestions(errors: List[str]) -> List[str]:
     """Generate helpful suggestions based on validation errors"""
     suggestions = []
@@ -21,17 +23,19 @@ def generate_validation_suggestions(errors: List[str]) -> List[str]:
     
     return suggestions
 
-def perform_pre_generation_checks(university_data: Dict[str, Any]) -> Dict[str, Any]:
+def perform_pre_generation_checks(university_data: Dict[str, Any],
+                                  compiled: Optional[CompiledInstance] = None) -> Dict[str, Any]:
     """Perform comprehensive pre-generation checks"""
     critical_issues = []
     recommendations = []
     can_generate = True
     
-    teachers = university_data.get("teachers", [])
-    subjects = university_data.get("subjects", [])
-    students = university_data.get("students", [])
-    time_slots = university_data.get("timeSlots", [])
-    working_days = university_data.get("basicInfo", {}).get("workingDays", [])
+    compiled = compiled or get_compiled_instance(university_data)
+    teachers = compiled.teachers
+    subjects = compiled.subjects
+    students = compiled.students
+    time_slots = compiled.time_slots
+    working_days = compiled.working_days
     
     # Check if we have enough data to generate anything
     if not teachers:
@@ -64,11 +68,7 @@ def perform_pre_generation_checks(university_data: Dict[str, Any]) -> Dict[str,
         for subject in subjects:
             subject_name = subject.get("name", "")
             subject_code = subject.get("code", "")
-            qualified_teachers = [
-                t for t in teachers 
-                if subject_name in t.get("subjectsCanTeach", []) or subject_code in t.get("subjectsCanTeach", [])
-            ]
-            if not qualified_teachers:
+            if not compiled.count_teachers_for(subject_name, subject_code):
                 unqualified_subjects.append(f"{subject_name} ({subject_code})")
         
         if unqualified_subjects:
@@ -77,10 +77,7 @@ def perform_pre_generation_checks(university_data: Dict[str, Any]) -> Dict[str,
             can_generate = False
         
         # Check workload feasibility
-        for subject in subjects:
-            hours_per_week = subject.get("hoursPerWeek", 3)
-            enrolled_groups = len([sg for sg in students if subject["id"] in sg.get("subjects", [])])
-            total_required_hours += hours_per_week * enrolled_groups
+        total_required_hours = compiled.total_required_hours()
         
         total_available_hours = sum(teacher.get("maxHoursPerWeek", 20) for teacher in teachers)
         
@@ -106,7 +103,8 @@ def perform_pre_generation_checks(university_data: Dict[str, Any]) -> Dict[str,
         }
     }
 
-def validate_enhanced_university_data(university_data: Dict[str, Any]) -> Dict[str, Any]:
+def validate_enhanced_university_data(university_data: Dict[str, Any],
+                                     compiled: Optional[CompiledInstance] = None) -> Dict[str, Any]:
     """
     Enhanced validation with detailed analysis and recommendations
     """
@@ -128,27 +126,28 @@ def validate_enhanced_university_data(university_data: Dict[str, Any]) -> Dict[s
             "recommendations": recommendations
         }
     
-    subjects = university_data.get("subjects", [])
-    teachers = university_data.get("teachers", [])
-    students = university_data.get("students", [])
-    rooms = university_data.get("rooms", [])
+    compiled = compiled or get_compiled_instance(university_data)
+    subjects = compiled.subjects
+    teachers = compiled.teachers
+    students = compiled.students
+    rooms = compiled.rooms
     
-    # Enhanced validation checks
+    # Enhanced validation checks (index lookups keep these near-linear in the data size)
     
     # 1. Teacher-Subject qualification analysis
     unqualified_subjects = []
     for subject in subjects:
         subject_name = subject.get("name", "")
-        qualified_teachers = [t for t in teachers if subject_name in t.get("subjectsCanTeach", [])]
-        if not qualified_teachers:
+        qualified_count = compiled.count_teachers_for(subject_name)
+        if not qualified_count:
             unqualified_subjects.append(subject_name)
             errors.append(f"No qualified teacher found for subject: {subject_name}")
-        elif len(qualified_teachers) == 1:
+        elif qualified_count == 1:
             warnings.append(f"Only one qualified teacher for subject: {subject_name}")
     
     # 2. Lab infrastructure analysis
-    lab_subjects = [s for s in subjects if s.get("type") == "Lab"]
-    lab_rooms = [r for r in rooms if r.get("type") == "Laboratory"]
+    lab_subjects = compiled.lab_subjects
+    lab_rooms = compiled.lab_rooms
     
     if lab_subjects and not lab_rooms:
         errors.append("Lab subjects found but no laboratory rooms available")
@@ -161,19 +160,15 @@ def validate_enhanced_university_data(university_data: Dict[str, Any]) -> Dict[s
         total_students = student_group.get("totalStudents", 0)
         batch = student_group.get("batch", "Unknown")
         
-        suitable_rooms = [r for r in rooms if r.get("capacity", 0) >= total_students]
-        if not suitable_rooms:
+        suitable_room_count = compiled.count_rooms_with_capacity(total_students)
+        if not suitable_room_count:
             capacity_issues.append(batch)
             errors.append(f"No room large enough for {batch} ({total_students} students)")
-        elif len(suitable_rooms) < 3:
+        elif suitable_room_count < 3:
             warnings.append(f"Limited room options for {batch} ({total_students} students)")
     
     # 4. Workload analysis
-    total_required_hours = 0
-    for subject in subjects:
-        hours_per_week = subject.get("hoursPerWeek", 3)
-        enrolled_groups = len([sg for sg in students if subject["id"] in sg.get("subjects", [])])
-        total_required_hours += hours_per_week * enrolled_groups
+    total_required_hours = compiled.total_required_hours()
     
     total_available_hours = sum(teacher.get("maxHoursPerWeek", 20) for teacher in teachers)
     min_available_hours = sum(teacher.get("minHoursPerWeek", 0) for teacher in teachers)
@@ -194,9 +189,7 @@ def validate_enhanced_university_data(university_data: Dict[str, Any]) -> Dict[s
         recommendations.append("Consider adding more laboratory rooms or scheduling lab sessions carefully")
     
     # 6. Time slot analysis
-    time_slots = university_data.get("timeSlots", [])
-    working_days = university_data.get("basicInfo", {}).get("workingDays", [])
-    total_time_slots = len(time_slots) * len(working_days)
+    total_time_slots = len(compiled.time_slots) * len(compiled.working_days)
     
     if total_required_hours > total_time_slots * 0.8:
         warnings.append("High time slot utilization - may lead to scheduling conflicts")
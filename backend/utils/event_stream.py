@@ -0,0 +1,112 @@
+from typing import Dict, Any, AsyncIterator
+import asyncio
+import json
+import logging
+
+from algorithms.solve_control import CancellationToken, SolveCancelled
+from utils.generation_service import generate_timetable_cached
+
+# Seconds between keep-alive comments while a stream is idle
+KEEPALIVE_INTERVAL = 15.0
+
+# Disable proxy buffering so events reach the client as they are produced
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+# Seconds between progress polls for job event streams
+JOB_POLL_INTERVAL = 0.25
+
+
+def format_sse(event: str, data: Any) -> str:
+    """Encode one Server-Sent Events message"""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+async def stream_timetable_generation(request_data: Dict[str, Any]) -> AsyncIterator[str]:
+    """
+    Run a generation in a worker thread and yield one SSE message per GA generation,
+    followed by the full generation response as the final "result" event, or by an
+    "error" event if the worker crashed.
+
+    Closing the stream (client disconnect) stops the solve at the next generation.
+    """
+    loop = asyncio.get_event_loop()
+    queue: asyncio.Queue = asyncio.Queue()
+    cancel_token = CancellationToken()
+
+    def emit(event: str, data: Any):
+        try:
+            loop.call_soon_threadsafe(queue.put_nowait, (event, data))
+        except RuntimeError:
+            # Event loop already closed, nobody is listening anymore
+            cancel_token.cancel("stream closed")
+
+    def on_progress(progress: Dict[str, Any]):
+        emit("progress", progress)
+
+    def worker():
+        try:
+            result = generate_timetable_cached(request_data, progress_callback=on_progress,
+                                               cancel_token=cancel_token)
+        except SolveCancelled:
+            logging.info("Streaming generation stopped after client disconnect")
+            return
+        except Exception as e:
+            logging.error(f"Streaming generation crashed: {str(e)}")
+            emit("error", {
+                "success": False,
+                "error": str(e),
+                "message": f"An unexpected error occurred during timetable generation: {str(e)}",
+                "details": {"errorType": "GENERATION_ERROR"}
+            })
+            return
+        emit("result", result)
+
+    loop.run_in_executor(None, worker)
+
+    try:
+        yield format_sse("started", {"status": "running"})
+        while True:
+            try:
+                event, data = await asyncio.wait_for(queue.get(), timeout=KEEPALIVE_INTERVAL)
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+
+            yield format_sse(event, data)
+            if event in ("result", "error"):
+                break
+    finally:
+        cancel_token.cancel("stream closed")
+
+
+async def stream_job_events(job) -> AsyncIterator[str]:
+    """
+    Yield the progress events of a background job as SSE messages until it finishes,
+    then its final status and (if any) its result payload.
+    """
+    last_sequence = 0
+    idle_time = 0.0
+
+    yield format_sse("status", job.to_status())
+    while True:
+        finished = job.is_finished()
+        events = job.progress_events_since(last_sequence)
+        for sequence, progress in events:
+            last_sequence = sequence
+            yield format_sse("progress", progress)
+
+        if finished:
+            break
+
+        if events:
+            idle_time = 0.0
+        else:
+            idle_time += JOB_POLL_INTERVAL
+            if idle_time >= KEEPALIVE_INTERVAL:
+                idle_time = 0.0
+                yield ": keep-alive\n\n"
+        await asyncio.sleep(JOB_POLL_INTERVAL)
+
+    yield format_sse("status", job.to_status())
+    if job.result is not None:
+        yield format_sse("result", job.result)
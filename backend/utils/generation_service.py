@@ -0,0 +1,430 @@
+from typing import Dict, Any, Callable, Optional
+import sqlite3
+import time
+import logging
+from datetime import datetime
+
+from algorithms.enhanced_genetic_algorithm import EnhancedTimetableGA, ENGINES, REPLACEMENTS
+from algorithms.solve_control import CancellationToken, SolveCancelled, CheckpointError, valid_seed, valid_checkpoint_interval
+from algorithms.compiled_instance import get_compiled_instance
+from utils.enhanced_validator import (
+    generate_validation_suggestions,
+    perform_pre_generation_checks
+)
+from utils.timetable_formatter import (
+    group_activities_by_slot,
+    format_enhanced_timetable,
+    format_timetable_views,
+    calculate_enhanced_teacher_utilization,
+    calculate_enhanced_room_utilization,
+    calculate_constraint_satisfaction
+)
+from utils.columnar_format import (
+    build_columnar_timetable,
+    RESPONSE_FORMATS,
+    RESPONSE_FORMAT_NESTED,
+    RESPONSE_FORMAT_COLUMNAR
+)
+from utils.conflict_analyzer import check_enhanced_conflicts
+from utils.constraint_checker import MAX_FITNESS
+from utils.data_validator import validate_university_data_structure
+from utils.result_cache import result_cache, canonical_request_hash
+from utils.timetable_store import timetable_store
+from utils.profiling import PhaseProfiler, NULL_PROFILER
+from utils.search_trace import summarize_trace
+from utils.metrics import observe_solve
+from utils.memory_budget import fit_to_memory_budget, solve_memory_budget, track_peak_memory, TRACK_MEMORY
+from utils.cost_model import admit_solve
+from utils.presets import resolve_algorithm_settings, PRESETS, PRESET_AUTO
+
+
+def generate_timetable_cached(request_data: Dict[str, Any],
+                              progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None,
+                              cancel_token: Optional[CancellationToken] = None,
+                              checkpoint_path: Optional[str] = None,
+                              resume_from: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Serve a generation from the result cache, joining an identical in-flight solve if there is one,
+    and fall back to run_timetable_generation. Send "useCache": false to force a fresh solve.
+    """
+    def compute():
+        return run_timetable_generation(request_data, progress_callback=progress_callback,
+                                        cancel_token=cancel_token, checkpoint_path=checkpoint_path,
+                                        resume_from=resume_from)
+    
+    if request_data.get("useCache") is False:
+        return compute()
+    
+    cache_key = canonical_request_hash(request_data)
+    result, cache_status = result_cache.get_or_compute(cache_key, compute, cancel_token=cancel_token)
+    return {**result, "cache": {"status": cache_status, "key": cache_key}}
+
+
+def apply_algorithm_settings(ga: EnhancedTimetableGA, algorithm_settings: Dict[str, Any]):
+    """Request-level algorithmSettings override the dataset's own"""
+    if algorithm_settings:
+        ga.population_size = algorithm_settings.get("populationSize", ga.population_size)
+        ga.generations = algorithm_settings.get("generations", ga.generations)
+        ga.mutation_rate = algorithm_settings.get("mutationRate", ga.mutation_rate)
+        ga.crossover_rate = algorithm_settings.get("crossoverRate", ga.crossover_rate)
+        ga.elite_size = algorithm_settings.get("eliteSize", ga.elite_size)
+        ga.tournament_size = algorithm_settings.get("tournamentSize", ga.tournament_size)
+        ga.max_stagnation_generations = algorithm_settings.get("maxStagnationGenerations", ga.max_stagnation_generations)
+        ga.record_trace = algorithm_settings.get("trace", ga.record_trace)
+        ga.engine = algorithm_settings.get("engine", ga.engine)
+        ga.replacement = algorithm_settings.get("replacement", ga.replacement)
+        if "seed" in algorithm_settings:
+            ga.set_seed(algorithm_settings["seed"])
+
+
+def estimate_generation(request_data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Predicted solve time and memory for a generation request, with the admission decision
+    and memory budget outcome the service would apply (nothing is solved)
+    """
+    university_data = request_data.get("universityData", {})
+    algorithm_settings = request_data.get("algorithmSettings", {})
+    ga = EnhancedTimetableGA(university_data, get_compiled_instance(university_data))
+    algorithm_settings, preset = resolve_algorithm_settings(ga, algorithm_settings)
+    if not valid_checkpoint_interval(algorithm_settings.get("checkpointInterval")):
+        raise ValueError(f"Invalid checkpointInterval {algorithm_settings.get('checkpointInterval')!r}: "
+                         f"expected a positive integer")
+    if algorithm_settings.get("engine", ga.engine) not in ENGINES:
+        raise ValueError(f"Unknown engine {algorithm_settings.get('engine')!r}: expected one of {', '.join(ENGINES)}")
+    if algorithm_settings.get("replacement", ga.replacement) not in REPLACEMENTS:
+        raise ValueError(f"Unknown replacement {algorithm_settings.get('replacement')!r}: "
+                         f"expected one of {', '.join(REPLACEMENTS)}")
+    apply_algorithm_settings(ga, algorithm_settings)
+    requested = admit_solve(ga, max_seconds=0)
+    admission = admit_solve(ga)
+    memory = fit_to_memory_budget(ga, solve_memory_budget(algorithm_settings)) if admission["decision"] != "reject" else None
+    return {
+        **{key: requested[key] for key in ("features", "predictedSeconds", "predictedMemoryBytes", "model")},
+        "admission": admission,
+        "memory": memory,
+        "preset": preset,
+        "effectiveSettings": {"populationSize": ga.population_size, "generations": ga.generations,
+                              "mutationRate": ga.mutation_rate, "crossoverRate": ga.crossover_rate,
+                              "eliteSize": ga.elite_size, "engine": ga.engine}
+    }
+
+
+def run_timetable_generation(request_data: Dict[str, Any],
+                             progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None,
+                             cancel_token: Optional[CancellationToken] = None,
+                             checkpoint_path: Optional[str] = None,
+                             resume_from: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Run the full generation pipeline (validation, GA, formatting) for one request.
+
+    Shared by the synchronous /generate-timetable endpoint and the background job workers.
+    Errors are reported in the response body; only SolveCancelled propagates.
+    """
+    try:
+        start_time = time.time()
+        
+        # Extract university data
+        university_data = request_data.get("universityData", {})
+        algorithm_settings = request_data.get("algorithmSettings", {})
+        response_format = request_data.get("responseFormat", RESPONSE_FORMAT_NESTED)
+        
+        if response_format not in RESPONSE_FORMATS:
+            return {
+                "success": False,
+                "error": f"Unknown response format: {response_format}",
+                "message": f"responseFormat must be one of: {', '.join(RESPONSE_FORMATS)}",
+                "details": {
+                    "errorType": "INVALID_RESPONSE_FORMAT",
+                    "supportedFormats": list(RESPONSE_FORMATS)
+                }
+            }
+        
+        # Basic validation
+        if not university_data:
+            return {
+                "success": False,
+                "error": "Missing university data",
+                "message": "Please provide university data including teachers, subjects, rooms, students, and time slots",
+                "details": {
+                    "errorType": "MISSING_DATA",
+                    "requiredFields": ["basicInfo", "teachers", "subjects", "rooms", "students", "timeSlots"]
+                }
+            }
+        
+        # Per-phase timing, returned as algorithmStats.profile
+        profiler = PhaseProfiler() if algorithm_settings.get("profile") else NULL_PROFILER
+        
+        # Indexes shared by validation and the GA (reused across requests on the same dataset)
+        with profiler.phase("initialization"):
+            compiled = get_compiled_instance(university_data)
+        
+        # Validate data structure with detailed feedback
+        with profiler.phase("validation"):
+            validation_result = validate_university_data_structure(university_data, compiled)
+        if not validation_result["valid"]:
+            return {
+                "success": False,
+                "error": "Data validation failed",
+                "message": "Your university data has validation errors that prevent timetable generation",
+                "details": {
+                    "errorType": "VALIDATION_FAILED",
+                    "errors": validation_result["errors"],
+                    "warnings": validation_result.get("warnings", []),
+                    "suggestions": generate_validation_suggestions(validation_result["errors"])
+                }
+            }
+        
+        # Additional pre-generation checks
+        with profiler.phase("validation"):
+            pre_check_result = perform_pre_generation_checks(university_data, compiled)
+        if not pre_check_result["canGenerate"]:
+            return {
+                "success": False,
+                "error": "Pre-generation checks failed",
+                "message": "Critical issues found that prevent timetable generation",
+                "details": {
+                    "errorType": "PRE_GENERATION_FAILED",
+                    "criticalIssues": pre_check_result["criticalIssues"],
+                    "recommendations": pre_check_result["recommendations"]
+                }
+            }
+        
+        # Create enhanced GA instance
+        with profiler.phase("initialization"):
+            ga = EnhancedTimetableGA(university_data, compiled)
+        ga.profiler = profiler
+        
+        # Expand presets ("auto" derives settings from instance features and a time budget)
+        try:
+            algorithm_settings, preset = resolve_algorithm_settings(ga, algorithm_settings)
+        except ValueError as e:
+            return {
+                "success": False,
+                "error": str(e),
+                "message": f"algorithmSettings.preset must be one of: {', '.join([PRESET_AUTO, *PRESETS])}",
+                "details": {
+                    "errorType": "INVALID_PRESET",
+                    "supportedPresets": [PRESET_AUTO, *PRESETS]
+                }
+            }
+        
+        # A seed makes the run reproducible: same seed, data and settings give the same timetable
+        if not valid_seed(algorithm_settings.get("seed")):
+            return {
+                "success": False,
+                "error": f"Invalid seed: {algorithm_settings.get('seed')!r}",
+                "message": "algorithmSettings.seed must be a non-negative integer",
+                "details": {"errorType": "INVALID_SEED"}
+            }
+        
+        # Checkpoints are written every checkpointInterval generations
+        if not valid_checkpoint_interval(algorithm_settings.get("checkpointInterval")):
+            return {
+                "success": False,
+                "error": f"Invalid checkpointInterval: {algorithm_settings.get('checkpointInterval')!r}",
+                "message": "algorithmSettings.checkpointInterval must be a positive integer",
+                "details": {"errorType": "INVALID_CHECKPOINT_INTERVAL"}
+            }
+        
+        if (algorithm_settings.get("engine", ga.engine) not in ENGINES
+                or algorithm_settings.get("replacement", ga.replacement) not in REPLACEMENTS):
+            return {
+                "success": False,
+                "error": f"Unknown engine or replacement: {algorithm_settings.get('engine', ga.engine)!r}, "
+                         f"{algorithm_settings.get('replacement', ga.replacement)!r}",
+                "message": f"algorithmSettings.engine must be one of: {', '.join(ENGINES)}; "
+                           f"algorithmSettings.replacement must be one of: {', '.join(REPLACEMENTS)}",
+                "details": {
+                    "errorType": "INVALID_ENGINE",
+                    "supportedEngines": list(ENGINES),
+                    "supportedReplacements": list(REPLACEMENTS)
+                }
+            }
+        
+        # Override GA parameters if provided in request
+        apply_algorithm_settings(ga, algorithm_settings)
+        
+        # Admission control: predicted solve time against the configured limit
+        admission = admit_solve(ga)
+        if admission["decision"] == "reject":
+            return {
+                "success": False,
+                "error": "Request exceeds solve limits",
+                "message": "The predicted solve time exceeds the server limit and the request could not be downgraded to fit",
+                "details": {
+                    "errorType": "ADMISSION_REJECTED",
+                    "admission": admission,
+                    "suggestions": [
+                        "Reduce population size or generations",
+                        "Split the dataset into smaller scheduling problems"
+                    ]
+                }
+            }
+        
+        # Keep the solve within its memory budget (shrinks the population when the estimate exceeds it)
+        memory_report = fit_to_memory_budget(ga, solve_memory_budget(algorithm_settings))
+        if not memory_report["fits"]:
+            return {
+                "success": False,
+                "error": "Memory budget exceeded",
+                "message": "The estimated solver memory exceeds the budget even at the smallest population size",
+                "details": {
+                    "errorType": "MEMORY_BUDGET_EXCEEDED",
+                    "memory": memory_report,
+                    "suggestions": [
+                        "Raise the server budget (TIMETABLE_SOLVE_MEMORY_MB) or algorithmSettings.memoryBudgetMb",
+                        "Split the dataset into smaller scheduling problems"
+                    ]
+                }
+            }
+        
+        # Run enhanced GA algorithm
+        with observe_solve(ga) as solve_record, \
+                track_peak_memory(algorithm_settings.get("trackMemory", TRACK_MEMORY)) as traced_memory:
+            best_solution, best_fitness, algorithm_stats = ga.solve(
+                progress_callback=progress_callback,
+                cancel_token=cancel_token,
+                checkpoint_path=checkpoint_path,
+                checkpoint_interval=algorithm_settings.get("checkpointInterval") or 10,
+                resume_from=resume_from
+            )
+            solve_record["outcome"] = "success" if best_solution else "no_solution"
+        algorithm_stats["memory"] = {**memory_report, **traced_memory}
+        algorithm_stats["admission"] = admission
+        if preset:
+            algorithm_stats["preset"] = preset
+        
+        # Full trace goes to a file; the response carries a downsampled copy
+        if "trace" in algorithm_stats:
+            algorithm_stats["trace"] = summarize_trace(algorithm_stats["trace"])
+        
+        if not best_solution:
+            return {
+                "success": False,
+                "error": "Algorithm failed to generate solution",
+                "message": "The genetic algorithm could not produce a valid timetable with the given constraints",
+                "details": {
+                    "errorType": "ALGORITHM_FAILURE",
+                    "suggestions": [
+                        "Try relaxing some constraints",
+                        "Add more teachers or rooms",
+                        "Reduce course hours or student enrollments",
+                        "Increase algorithm generations or population size"
+                    ]
+                }
+            }
+        
+        # Format timetable for response (one grouping pass shared by all views)
+        with profiler.phase("formatting"):
+            grouped_activities = group_activities_by_slot(best_solution)
+            if response_format == RESPONSE_FORMAT_COLUMNAR:
+                formatted_timetable = build_columnar_timetable(best_solution, university_data)
+            else:
+                formatted_timetable = format_enhanced_timetable(best_solution, university_data, grouped_activities)
+        
+        execution_time = time.time() - start_time
+        
+        # Calculate enhanced statistics
+        with profiler.phase("metrics"):
+            teacher_utilization = calculate_enhanced_teacher_utilization(best_solution, university_data)
+            room_utilization = calculate_enhanced_room_utilization(best_solution, university_data)
+        
+        # Check for conflicts with detailed reporting
+        with profiler.phase("conflicts"):
+            conflicts = check_enhanced_conflicts(best_solution, ga)
+        
+        # Calculate constraint satisfaction metrics
+        with profiler.phase("metrics"):
+            constraint_metrics = calculate_constraint_satisfaction(best_solution, ga)
+        
+        response = {
+            "success": True,
+            "message": "Timetable generated successfully using Enhanced Genetic Algorithm",
+            "executionTime": f"{execution_time:.2f} seconds",
+            "algorithmStats": {
+                **algorithm_stats,
+                "algorithm": "Enhanced Genetic Algorithm v2.0",
+                "constraintViolations": len([c for c in conflicts if c["type"] == "hard_constraint"])
+            },
+            "timetable": formatted_timetable,
+            "conflicts": conflicts,
+            "constraintMetrics": constraint_metrics,
+            "statistics": {
+                "teacherUtilization": teacher_utilization,
+                "roomUtilization": room_utilization,
+                "totalActivities": len(best_solution),
+                "totalTimeSlots": len(university_data.get("timeSlots", [])) * len(university_data.get("basicInfo", {}).get("workingDays", [])),
+                "utilizationPercentage": round((len(best_solution) / max(1, len(university_data.get("timeSlots", [])) * len(university_data.get("basicInfo", {}).get("workingDays", [])))) * 100, 1),
+                "qualityScore": round((best_fitness / MAX_FITNESS) * 100, 2)
+            },
+            "generatedAt": datetime.now().isoformat()
+        }
+        
+        # Optional per-teacher, per-room and per-group schedules
+        if request_data.get("includeViews"):
+            with profiler.phase("formatting"):
+                response["views"] = format_timetable_views(best_solution, university_data, grouped_activities)
+        
+        # Persist the solution for later per-resource queries
+        if timetable_store is not None and request_data.get("persist", True):
+            try:
+                with profiler.phase("persistence"):
+                    response["timetableId"] = timetable_store.save(
+                        compiled.dataset_hash, university_data, best_solution,
+                        settings=algorithm_settings,
+                        stats={
+                            "algorithmStats": response["algorithmStats"],
+                            "statistics": response["statistics"],
+                            "constraintMetrics": constraint_metrics
+                        },
+                        fitness=best_fitness
+                    )
+            except sqlite3.Error as e:
+                logging.warning(f"Could not persist generated timetable: {str(e)}")
+                response["timetableId"] = None
+        
+        if profiler.enabled:
+            response["algorithmStats"]["profile"] = profiler.report()
+        
+        return response
+        
+    except SolveCancelled:
+        raise
+    except Exception as e:
+        import traceback
+        error_traceback = traceback.format_exc()
+        logging.error(f"Timetable generation error: {str(e)}")
+        logging.error(f"Full traceback: {error_traceback}")
+        
+        # Provide meaningful error messages based on the exception
+        error_message = str(e)
+        error_type = "GENERATION_ERROR"
+        suggestions = []
+        
+        if isinstance(e, CheckpointError):
+            error_type = "CHECKPOINT_ERROR"
+            suggestions = ["Submit the request again to restart the generation from scratch"]
+        elif "can only concatenate str" in error_message:
+            error_message = "Time slot format incompatibility detected"
+            error_type = "TIME_SLOT_FORMAT_ERROR"
+            suggestions = ["Ensure time slots have consistent ID format (all strings or all numbers)"]
+        elif "No qualified teacher" in error_message:
+            error_type = "TEACHER_QUALIFICATION_ERROR" 
+            suggestions = ["Add subject names/codes to teacher 'subjectsCanTeach' arrays"]
+        elif "not enough values to unpack" in error_message:
+            error_type = "DATA_STRUCTURE_ERROR"
+            suggestions = ["Check that all required fields are present in your data"]
+        elif "list index out of range" in error_message:
+            error_type = "INSUFFICIENT_DATA_ERROR"
+            suggestions = ["Ensure you have sufficient teachers, rooms, and time slots for your requirements"]
+        
+        return {
+            "success": False,
+            "error": error_message,
+            "message": f"An unexpected error occurred during timetable generation: {error_message}",
+            "details": {
+                "errorType": error_type,
+                "suggestions": suggestions,
+                "technicalDetails": error_traceback if logging.getLogger().isEnabledFor(logging.DEBUG) else None
+            }
+        }
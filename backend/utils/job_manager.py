@@ -0,0 +1,329 @@
+from typing import Dict, Any, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from collections import OrderedDict, deque
+from contextlib import nullcontext
+from datetime import datetime
+import threading
+import logging
+import uuid
+import json
+import os
+
+from algorithms.solve_control import CancellationToken, SolveCancelled
+from utils.generation_service import generate_timetable_cached
+from utils.metrics import JOB_QUEUE_WAIT
+from utils.solve_profiler import capture_profile, resolve_profile_mode, remove_profile
+
+# Job lifecycle states
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_COMPLETED = "completed"
+JOB_FAILED = "failed"
+JOB_CANCELLED = "cancelled"
+
+FINISHED_STATES = {JOB_COMPLETED, JOB_FAILED, JOB_CANCELLED}
+
+# Per-generation progress events kept for streaming subscribers
+MAX_PROGRESS_EVENTS = 1000
+
+# Cancellation reason used when the service stops; such jobs keep their checkpoint for resuming
+SHUTDOWN_REASON = "shutdown"
+
+
+class TimetableJob:
+    """A single background timetable generation request"""
+
+    def __init__(self, request_data: Dict[str, Any], idempotency_key: Optional[str] = None,
+                 job_id: Optional[str] = None, resume: bool = False):
+        self.id = job_id or uuid.uuid4().hex
+        self.request_data = request_data
+        self.idempotency_key = idempotency_key
+        self.status = JOB_QUEUED
+        self.created_at = datetime.now()
+        self.started_at = None
+        self.finished_at = None
+        self.progress = {}
+        self.progress_events = deque(maxlen=MAX_PROGRESS_EVENTS)
+        self.progress_event_count = 0
+        self.result = None
+        self.error = None
+        self.future = None
+        self.cancel_token = CancellationToken()
+        self.resume = resume
+        self.resumed_from_generation = None
+        self.profile = None
+
+    def is_finished(self) -> bool:
+        return self.status in FINISHED_STATES
+
+    def record_progress(self, progress: Dict[str, Any]):
+        self.progress = progress
+        self.progress_event_count += 1
+        self.progress_events.append((self.progress_event_count, progress))
+
+    def progress_events_since(self, sequence: int) -> List[tuple]:
+        """Progress events with a sequence number greater than the given one"""
+        return [event for event in list(self.progress_events) if event[0] > sequence]
+
+    def to_status(self) -> Dict[str, Any]:
+        """Public status view (without the result payload)"""
+        total_generations = self.progress.get("totalGenerations", 0)
+        generation = self.progress.get("generation", 0)
+        if self.status == JOB_COMPLETED:
+            percent = 100.0
+        else:
+            percent = round(generation / total_generations * 100, 1) if total_generations else 0.0
+
+        return {
+            "jobId": self.id,
+            "status": self.status,
+            "createdAt": self.created_at.isoformat(),
+            "startedAt": self.started_at.isoformat() if self.started_at else None,
+            "finishedAt": self.finished_at.isoformat() if self.finished_at else None,
+            "progress": {
+                "generation": generation,
+                "totalGenerations": total_generations,
+                "percent": percent
+            },
+            "bestFitness": self.progress.get("bestFitness"),
+            "resumedFromGeneration": self.resumed_from_generation,
+            "profile": self.profile,
+            "error": self.error
+        }
+
+
+class JobManager:
+    """Runs timetable generations on a bounded pool of background workers"""
+
+    def __init__(self, max_workers: int = 2, max_finished_jobs: int = 200,
+                 checkpoint_dir: Optional[str] = None):
+        self.checkpoint_dir = checkpoint_dir
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="timetable-job")
+        self.max_workers = max_workers
+        self.max_finished_jobs = max_finished_jobs
+        self.jobs: "OrderedDict[str, TimetableJob]" = OrderedDict()
+        self.idempotency_index: Dict[str, str] = {}
+        self.lock = threading.Lock()
+
+    def submit(self, request_data: Dict[str, Any], idempotency_key: Optional[str] = None) -> TimetableJob:
+        """Queue a generation request; a repeated idempotency key returns the existing job"""
+        with self.lock:
+            if idempotency_key and idempotency_key in self.idempotency_index:
+                existing = self.jobs.get(self.idempotency_index[idempotency_key])
+                if existing and existing.status not in (JOB_FAILED, JOB_CANCELLED):
+                    return existing
+
+            job = TimetableJob(request_data, idempotency_key)
+            self.jobs[job.id] = job
+            if idempotency_key:
+                self.idempotency_index[idempotency_key] = job.id
+            evicted = self._evict_finished_jobs()
+
+        for job_id in evicted:
+            remove_profile(job_id)
+        self._save_request(job)
+        return self._start(job)
+
+    def resume(self, job_id: str) -> Optional[TimetableJob]:
+        """
+        Re-queue an interrupted job from its last checkpoint (or from scratch if none was written).
+        Works after a restart as long as the job's files are still in the checkpoint directory.
+        """
+        job = self.get(job_id)
+        if job and job.status in (JOB_QUEUED, JOB_RUNNING, JOB_COMPLETED):
+            return job
+
+        request_data = self._load_request(job_id)
+        if request_data is None:
+            return None
+
+        job = TimetableJob(request_data, job_id=job_id, resume=True)
+        with self.lock:
+            self.jobs[job_id] = job
+            self.jobs.move_to_end(job_id)
+        return self._start(job)
+
+    def resumable_job_ids(self) -> List[str]:
+        """Jobs with a saved request in the checkpoint directory that are not active in this process"""
+        if not self.checkpoint_dir or not os.path.isdir(self.checkpoint_dir):
+            return []
+        job_ids = [name[:-len(".request.json")] for name in os.listdir(self.checkpoint_dir)
+                   if name.endswith(".request.json")]
+        return [job_id for job_id in job_ids
+                if not (self.get(job_id) and not self.get(job_id).is_finished())]
+
+    def resume_interrupted_jobs(self) -> List[str]:
+        """Resume every job left behind by a previous process (called at startup)"""
+        resumed = []
+        for job_id in self.resumable_job_ids():
+            if self.resume(job_id):
+                resumed.append(job_id)
+        if resumed:
+            logging.info(f"Resumed {len(resumed)} interrupted timetable job(s)")
+        return resumed
+
+    def _start(self, job: TimetableJob) -> TimetableJob:
+        job.future = self.executor.submit(self._run_job, job)
+        logging.info(f"Queued timetable job {job.id}")
+        return job
+
+    def get(self, job_id: str) -> Optional[TimetableJob]:
+        with self.lock:
+            return self.jobs.get(job_id)
+
+    def list_jobs(self) -> List[Dict[str, Any]]:
+        with self.lock:
+            return [job.to_status() for job in self.jobs.values()]
+
+    def cancel(self, job_id: str) -> Optional[TimetableJob]:
+        """Request cancellation; queued jobs never start, running ones stop at the next generation"""
+        job = self.get(job_id)
+        if not job or job.is_finished():
+            return job
+
+        job.cancel_token.cancel("cancelled by user")
+        if job.future and job.future.cancel():
+            self._finish(job, JOB_CANCELLED)
+            self._remove_files(job.id)
+            remove_profile(job.id)
+        return job
+
+    def counts(self) -> Dict[str, int]:
+        with self.lock:
+            counts = {state: 0 for state in (JOB_QUEUED, JOB_RUNNING, JOB_COMPLETED, JOB_FAILED, JOB_CANCELLED)}
+            for job in self.jobs.values():
+                counts[job.status] += 1
+            return counts
+
+    def shutdown(self):
+        """Stop all jobs; running ones checkpoint their state so they can be resumed later"""
+        for job in list(self.jobs.values()):
+            if not job.is_finished():
+                job.cancel_token.cancel(SHUTDOWN_REASON)
+                if job.future:
+                    job.future.cancel()
+        # Running solves stop at their next generation boundary after writing a checkpoint
+        self.executor.shutdown(wait=True)
+
+    def _run_job(self, job: TimetableJob):
+        if job.cancel_token.is_cancelled:
+            self._finish(job, JOB_CANCELLED)
+            return
+
+        job.status = JOB_RUNNING
+        job.started_at = datetime.now()
+        JOB_QUEUE_WAIT.observe((job.started_at - job.created_at).total_seconds())
+
+        checkpoint_path = self._checkpoint_path(job.id)
+        resume_from = None
+        if job.resume and checkpoint_path and os.path.exists(checkpoint_path):
+            resume_from = checkpoint_path
+
+        def on_progress(progress: Dict[str, Any]):
+            if resume_from and job.resumed_from_generation is None:
+                job.resumed_from_generation = progress["generation"] - 1
+            job.record_progress(progress)
+
+        # Admin-requested profile capture (checked by the router); profiles the solve, never a cache hit
+        request_data = job.request_data
+        profile_mode = resolve_profile_mode(request_data.get("captureProfile", False))
+        if profile_mode:
+            request_data = {**request_data, "useCache": False}
+
+        try:
+            with capture_profile(job.id, profile_mode) if profile_mode else nullcontext() as profile_info:
+                job.profile = profile_info
+                result = generate_timetable_cached(
+                    request_data,
+                    progress_callback=on_progress,
+                    cancel_token=job.cancel_token,
+                    checkpoint_path=checkpoint_path,
+                    resume_from=resume_from
+                )
+        except SolveCancelled:
+            self._finish(job, JOB_CANCELLED)
+            if job.cancel_token.reason != SHUTDOWN_REASON:
+                self._remove_files(job.id)
+                remove_profile(job.id)
+            logging.info(f"Timetable job {job.id} cancelled ({job.cancel_token.reason})")
+            return
+        except Exception as e:
+            job.error = str(e)
+            self._finish(job, JOB_FAILED)
+            # Only jobs interrupted by a shutdown are resumable; a crash would repeat on every restart
+            self._remove_files(job.id)
+            logging.error(f"Timetable job {job.id} crashed: {str(e)}")
+            return
+
+        job.result = result
+        if not result.get("success"):
+            job.error = result.get("error")
+        self._finish(job, JOB_COMPLETED if result.get("success") else JOB_FAILED)
+        self._remove_files(job.id)
+
+    def _checkpoint_path(self, job_id: str) -> Optional[str]:
+        if not self.checkpoint_dir:
+            return None
+        return os.path.join(self.checkpoint_dir, f"{job_id}.ckpt")
+
+    def _request_path(self, job_id: str) -> Optional[str]:
+        if not self.checkpoint_dir:
+            return None
+        return os.path.join(self.checkpoint_dir, f"{job_id}.request.json")
+
+    def _save_request(self, job: TimetableJob):
+        """Persist the request payload so the job can be resumed by another process"""
+        path = self._request_path(job.id)
+        if not path:
+            return
+        try:
+            os.makedirs(self.checkpoint_dir, exist_ok=True)
+            with open(path, "w") as f:
+                json.dump(job.request_data, f)
+        except OSError as e:
+            logging.warning(f"Could not persist request for job {job.id}: {str(e)}")
+
+    def _load_request(self, job_id: str) -> Optional[Dict[str, Any]]:
+        path = self._request_path(job_id)
+        if not path or not os.path.exists(path):
+            return None
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logging.warning(f"Could not load saved request for job {job_id}: {str(e)}")
+            return None
+
+    def _remove_files(self, job_id: str):
+        for path in (self._checkpoint_path(job_id), self._request_path(job_id)):
+            if path and os.path.exists(path):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    def _finish(self, job: TimetableJob, status: str):
+        job.status = status
+        job.finished_at = datetime.now()
+        # The request payload is no longer needed once the job is done
+        job.request_data = None
+
+    def _evict_finished_jobs(self) -> List[str]:
+        """
+        Drop the oldest finished jobs beyond the retention limit (caller holds the lock).
+        Returns their ids; their profile files are removed by the caller after releasing the lock.
+        """
+        finished = [job_id for job_id, job in self.jobs.items() if job.is_finished()]
+        evicted = finished[:max(0, len(finished) - self.max_finished_jobs)]
+        for job_id in evicted:
+            job = self.jobs.pop(job_id)
+            if job.idempotency_key and self.idempotency_index.get(job.idempotency_key) == job_id:
+                del self.idempotency_index[job.idempotency_key]
+        return evicted
+
+
+job_manager = JobManager(
+    max_workers=int(os.environ.get("TIMETABLE_JOB_WORKERS", "2")),
+    max_finished_jobs=int(os.environ.get("TIMETABLE_JOB_RETENTION", "200")),
+    checkpoint_dir=os.environ.get("TIMETABLE_CHECKPOINT_DIR", "checkpoints") or None
+)
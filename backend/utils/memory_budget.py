@@ -0,0 +1,129 @@
+from typing import Dict, Any, Optional
+from contextlib import contextmanager
+import os
+import sys
+import threading
+import tracemalloc
+
+from algorithms.enhanced_genetic_algorithm import ENGINE_STEADY_STATE
+
+# Default per-solve memory budget; a request may lower it with algorithmSettings.memoryBudgetMb (0 = no budget)
+SOLVE_MEMORY_BUDGET_MB = float(os.environ.get("TIMETABLE_SOLVE_MEMORY_MB", "1024"))
+
+# Trace allocations of every solve (peak reported in algorithmStats.memory); costly, off by default
+TRACK_MEMORY = os.environ.get("TIMETABLE_TRACK_MEMORY", "0") == "1"
+
+# Smallest population the budget may shrink a solve to
+MIN_POPULATION_SIZE = 10
+
+# Fields the GA adds to each assigned activity copy
+ASSIGNED_FIELDS = ("teacherId", "roomId", "day", "timeSlotId", "period", "teacherName", "roomName")
+
+_tracking_lock = threading.Lock()
+_tracking_solves = 0
+_started_tracing = False
+
+
+def bytes_per_activity(ga) -> int:
+    """Memory of one assigned activity in one chromosome (the dict, its equipment list and the list slot)"""
+    if not ga.activities:
+        return 0
+    template = ga.activities[0]
+    assigned = dict(template, **{field: None for field in ASSIGNED_FIELDS})
+    return sys.getsizeof(assigned) + sys.getsizeof(template.get("equipmentRequired") or []) + 8
+
+
+def live_chromosomes(population_size: int, steady_state: bool = False) -> int:
+    """
+    Chromosomes alive at the peak of a generation: old and new population, best, crossover child and
+    its mutation. The steady-state engine replaces members in place, so it only holds one population.
+    """
+    if steady_state:
+        return population_size + 3
+    return 2 * population_size + 3
+
+
+def estimate_solve_memory(ga, population_size: Optional[int] = None) -> Dict[str, int]:
+    """Pre-solve estimate of the GA's memory from activity count x population size"""
+    population_size = population_size or ga.population_size
+    per_activity = bytes_per_activity(ga)
+    population_bytes = live_chromosomes(population_size, ga.engine == ENGINE_STEADY_STATE) * len(ga.activities) * per_activity
+    compiled_bytes = getattr(ga.compiled, "estimated_bytes", 0)
+    return {
+        "bytesPerActivity": per_activity,
+        "populationBytes": population_bytes,
+        "compiledBytes": compiled_bytes,
+        "estimatedBytes": population_bytes + compiled_bytes
+    }
+
+
+def solve_memory_budget(algorithm_settings: Dict[str, Any]) -> Optional[int]:
+    """Budget in bytes for one solve (None when unlimited); requests can only tighten the server default"""
+    budgets = [mb for mb in (SOLVE_MEMORY_BUDGET_MB, algorithm_settings.get("memoryBudgetMb")) if mb]
+    return int(min(budgets) * 1024 * 1024) if budgets else None
+
+
+def fit_to_memory_budget(ga, budget_bytes: Optional[int]) -> Dict[str, Any]:
+    """
+    Shrink ga.population_size (and elite size with it) until the estimate fits the budget.
+    Returns the memory report; "fits" is False when even MIN_POPULATION_SIZE does not fit.
+    """
+    estimate = estimate_solve_memory(ga)
+    report: Dict[str, Any] = {**estimate, "budgetBytes": budget_bytes, "fits": True}
+    if budget_bytes is None or estimate["estimatedBytes"] <= budget_bytes:
+        return report
+
+    per_chromosome = len(ga.activities) * estimate["bytesPerActivity"]
+    available = budget_bytes - estimate["compiledBytes"]
+    if not per_chromosome:
+        population_size = ga.population_size
+    elif ga.engine == ENGINE_STEADY_STATE:
+        population_size = available // per_chromosome - 3
+    else:
+        population_size = (available // per_chromosome - 3) // 2
+    if population_size < MIN_POPULATION_SIZE:
+        report["fits"] = False
+        report["minimumBytes"] = estimate_solve_memory(ga, MIN_POPULATION_SIZE)["estimatedBytes"]
+        return report
+
+    report["populationReducedFrom"] = ga.population_size
+    ga.elite_size = max(1, ga.elite_size * population_size // ga.population_size)
+    ga.population_size = population_size
+    report.update(estimate_solve_memory(ga))
+    report["populationSize"] = population_size
+    return report
+
+
+@contextmanager
+def track_peak_memory(enabled: bool):
+    """
+    Trace Python allocations for the duration of the block and yield a dict that receives
+    peakTracedBytes on exit. tracemalloc is process-wide: with concurrent tracked solves the
+    peak covers all of them.
+    """
+    global _tracking_solves, _started_tracing
+    result: Dict[str, Any] = {}
+    if not enabled:
+        yield result
+        return
+
+    with _tracking_lock:
+        if _tracking_solves == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _started_tracing = True
+        _tracking_solves += 1
+        # reset_peak is Python 3.9+; earlier versions report the peak since tracing started
+        if hasattr(tracemalloc, "reset_peak"):
+            tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+    try:
+        yield result
+    finally:
+        with _tracking_lock:
+            current, peak = tracemalloc.get_traced_memory()
+            result["peakTracedBytes"] = peak
+            result["peakAboveStartBytes"] = max(0, peak - baseline)
+            _tracking_solves -= 1
+            if _tracking_solves == 0 and _started_tracing:
+                tracemalloc.stop()
+                _started_tracing = False
@@ -0,0 +1,320 @@
+"""
+In-process metrics registry rendered in the Prometheus text exposition format.
+
+Every API instance keeps its own counters; scrape GET /metrics on each one.
+"""
+from typing import Dict, Any, List, Tuple, Callable, Optional, Sequence
+from contextlib import contextmanager
+import bisect
+import math
+import os
+import sys
+import threading
+import time
+
+from algorithms.solve_control import SolveCancelled
+
+try:
+    import resource
+except ImportError:  # not available on Windows; memory metrics are then omitted
+    resource = None
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Request latency buckets (seconds): from fast lookups up to long synchronous solves
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+SOLVE_BUCKETS = (0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800)
+
+MEMORY_BUCKETS = tuple(mb * 1024 * 1024 for mb in (64, 128, 256, 512, 1024, 2048, 4096, 8192))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    return repr(value)
+
+
+def _format_labels(label_names: Sequence[str], label_values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(str(value))}"' for name, value in zip(label_names, label_values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class _Metric:
+    metric_type = "untyped"
+
+    def __init__(self, name: str, help_text: str, label_names: Sequence[str] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self.values: Dict[Tuple[str, ...], Any] = {}
+        self.lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, Any]) -> Tuple[str, ...]:
+        if set(labels) != set(self.label_names):
+            raise ValueError(f"{self.name} expects labels {self.label_names}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.label_names)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.metric_type}"]
+        with self.lock:
+            for key, value in sorted(self.values.items()):
+                lines.append(f"{self.name}{_format_labels(self.label_names, key)} {_format_value(value)}")
+        return lines
+
+
+class Counter(_Metric):
+    metric_type = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def set(self, value: float, **labels):
+        """Mirror a running total kept elsewhere (e.g. a cache's own hit counter)"""
+        key = self._key(labels)
+        with self.lock:
+            self.values[key] = value
+
+
+class Gauge(_Metric):
+    metric_type = "gauge"
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self.lock:
+            self.values[key] = value
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    metric_type = "histogram"
+
+    def __init__(self, name: str, help_text: str, label_names: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, help_text, label_names)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self.lock:
+            state = self.values.get(key)
+            if state is None:
+                # per-bucket (non-cumulative) counts, then sum and count
+                state = self.values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][bisect.bisect_left(self.buckets, value)] += 1
+            state[1] += value
+            state[2] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.metric_type}"]
+        with self.lock:
+            for key, (counts, total, count) in sorted(self.values.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets + (math.inf,), counts):
+                    cumulative += bucket_count
+                    le = f'le="{_format_value(float(bound))}"'
+                    lines.append(f"{self.name}_bucket{_format_labels(self.label_names, key, le)} {cumulative}")
+                lines.append(f"{self.name}_sum{_format_labels(self.label_names, key)} {_format_value(total)}")
+                lines.append(f"{self.name}_count{_format_labels(self.label_names, key)} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Named metrics plus collectors that refresh mirrored values right before rendering"""
+
+    def __init__(self):
+        self.metrics: Dict[str, _Metric] = {}
+        self.collectors: List[Callable[[], None]] = []
+        self.lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self.lock:
+            if metric.name in self.metrics:
+                raise ValueError(f"Metric {metric.name} is already registered")
+            self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help_text: str, label_names: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, help_text, label_names))
+
+    def gauge(self, name: str, help_text: str, label_names: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, help_text, label_names))
+
+    def histogram(self, name: str, help_text: str, label_names: Sequence[str] = (),
+                  buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help_text, label_names, buckets))
+
+    def collector(self, fn: Callable[[], None]) -> Callable[[], None]:
+        """Register fn to run before every render (usable as a decorator)"""
+        self.collectors.append(fn)
+        return fn
+
+    def render(self) -> str:
+        for collect in self.collectors:
+            collect()
+        with self.lock:
+            metrics = list(self.metrics.values())
+        lines: List[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+def rss_bytes() -> Optional[int]:
+    """Current resident set size (Linux /proc; None elsewhere)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+def peak_rss_bytes() -> Optional[int]:
+    """Highest resident set size of the process so far"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+metrics = MetricsRegistry()
+
+HTTP_REQUEST_DURATION = metrics.histogram(
+    "timetable_http_request_duration_seconds", "HTTP request latency by route template",
+    ("method", "route", "status")
+)
+SOLVE_DURATION = metrics.histogram(
+    "timetable_solve_duration_seconds", "Wall time of GA solves by outcome", ("outcome",), SOLVE_BUCKETS
+)
+SOLVES_ACTIVE = metrics.gauge("timetable_solves_active", "GA solves currently running in this process")
+JOB_QUEUE_WAIT = metrics.histogram(
+    "timetable_job_queue_wait_seconds", "Time background jobs spent queued before starting", buckets=SOLVE_BUCKETS
+)
+JOBS = metrics.gauge("timetable_jobs", "Background generation jobs by status", ("status",))
+FITNESS_EVALUATIONS = metrics.counter("timetable_fitness_evaluations_total", "Fitness evaluations performed by GA solves")
+FITNESS_EVALUATION_RATE = metrics.gauge(
+    "timetable_fitness_evaluations_per_second", "Fitness evaluation throughput of the most recent solve"
+)
+SOLVE_PEAK_RSS = metrics.histogram(
+    "timetable_solve_peak_rss_bytes",
+    "Approximate peak resident memory during a solve (process high-water mark if the solve raised it, "
+    "else the larger of the start and end RSS)",
+    buckets=MEMORY_BUCKETS
+)
+CACHE_REQUESTS = metrics.counter(
+    "timetable_cache_requests_total", "Cache lookups by cache and result", ("cache", "result")
+)
+CACHE_HIT_RATIO = metrics.gauge("timetable_cache_hit_ratio", "Share of cache lookups served from the cache", ("cache",))
+PROCESS_RSS = metrics.gauge("process_resident_memory_bytes", "Resident memory size in bytes")
+PROCESS_PEAK_RSS = metrics.gauge("process_peak_resident_memory_bytes", "Peak resident memory size in bytes")
+
+
+@metrics.collector
+def _collect_runtime():
+    # Imported here: these modules import the generation service, which records into this registry
+    from utils.job_manager import job_manager
+    from utils.result_cache import result_cache
+    from algorithms.compiled_instance import compiled_instance_cache
+
+    for status, count in job_manager.counts().items():
+        JOBS.set(count, status=status)
+
+    for cache, stats, results in (
+        ("result", result_cache.stats, ("hits", "misses", "coalesced")),
+        ("compiledInstance", compiled_instance_cache.stats, ("hits", "misses"))
+    ):
+        for result in results:
+            CACHE_REQUESTS.set(stats[result], cache=cache, result=result)
+        lookups = sum(stats[result] for result in results)
+        CACHE_HIT_RATIO.set(stats["hits"] / lookups if lookups else 0.0, cache=cache)
+
+    rss, peak = rss_bytes(), peak_rss_bytes()
+    if rss is not None:
+        PROCESS_RSS.set(rss)
+    if peak is not None:
+        PROCESS_PEAK_RSS.set(peak)
+
+
+@contextmanager
+def observe_solve(ga):
+    """
+    Record active-solve count, duration, evaluation throughput and memory for one ga.solve().
+    Set record["outcome"] inside the block; exceptions are recorded as "cancelled" or "error".
+    """
+    record = {"outcome": "error"}
+    started = time.perf_counter()
+    rss_before, peak_before = rss_bytes(), peak_rss_bytes()
+    SOLVES_ACTIVE.inc()
+    try:
+        yield record
+    except SolveCancelled:
+        record["outcome"] = "cancelled"
+        raise
+    finally:
+        SOLVES_ACTIVE.dec()
+        elapsed = time.perf_counter() - started
+        SOLVE_DURATION.observe(elapsed, outcome=record["outcome"])
+        evaluations = getattr(ga, "fitness_evaluations", 0)
+        FITNESS_EVALUATIONS.inc(evaluations)
+        if elapsed > 0:
+            FITNESS_EVALUATION_RATE.set(round(evaluations / elapsed, 1))
+        peak_after = peak_rss_bytes()
+        if peak_after is not None and peak_before is not None and peak_after > peak_before:
+            SOLVE_PEAK_RSS.observe(peak_after)
+        elif rss_before is not None:
+            SOLVE_PEAK_RSS.observe(max(rss_before, rss_bytes() or 0))
+
+
+def _route_template(scope) -> str:
+    """Path template of the matched route (bounded label cardinality), or "unmatched" """
+    from starlette.routing import Match
+    for candidate in getattr(scope.get("app"), "routes", []):
+        if getattr(candidate, "path", None) and candidate.matches(scope)[0] == Match.FULL:
+            return candidate.path
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording request latency per method, route template and status code"""
+
+    def __init__(self, app, histogram: Histogram = HTTP_REQUEST_DURATION):
+        self.app = app
+        self.histogram = histogram
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = {"code": 500}
+        started = time.perf_counter()
+
+        async def recording_send(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, recording_send)
+        finally:
+            self.histogram.observe(time.perf_counter() - started, method=scope.get("method", ""),
+                                   route=_route_template(scope), status=status["code"])
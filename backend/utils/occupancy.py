@@ -0,0 +1,234 @@
+from typing import Dict, Any, List, Optional, Tuple
+from collections import OrderedDict, defaultdict
+import threading
+
+from algorithms.compiled_instance import CompiledInstance
+from algorithms.enhanced_genetic_algorithm import build_penalty_weights
+
+
+def _iter_bits(mask: int):
+    """Indices of the set bits of mask, lowest first"""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+def teacher_day_penalty(teacher: Optional[Dict[str, Any]], slot_indices: List[int],
+                        weights: Dict[str, int]) -> int:
+    """Weighted consecutive-hours and gap penalty of one teacher-day (mirrors ConstraintChecker)"""
+    if not slot_indices:
+        return 0
+    sorted_indices = sorted(slot_indices)
+    penalty = 0
+
+    if teacher:
+        max_consecutive = teacher.get("maxConsecutiveHours", 4)
+        consecutive_count = 1
+        max_consecutive_found = 1
+        for i in range(1, len(sorted_indices)):
+            if sorted_indices[i] == sorted_indices[i - 1] + 1:
+                consecutive_count += 1
+                max_consecutive_found = max(max_consecutive_found, consecutive_count)
+            else:
+                consecutive_count = 1
+        if max_consecutive_found > max_consecutive:
+            penalty += (max_consecutive_found - max_consecutive) * weights["consecutive_violation"]
+
+    for i in range(1, len(sorted_indices)):
+        gap = sorted_indices[i] - sorted_indices[i - 1] - 1
+        if gap > 1:
+            penalty += gap * weights["gap_penalty"]
+    return penalty
+
+
+class OccupancyIndex:
+    """
+    Per-resource occupancy bitsets for one solution. Bit (day_index * slots_per_day + slot_index)
+    is set while a teacher, student group or room has at least one activity in that cell.
+    Used to answer "where can this activity move?" without scanning the solution.
+    """
+
+    def __init__(self, compiled: CompiledInstance, solution: List[Dict[str, Any]],
+                 constraints: Optional[Dict[str, Any]] = None):
+        self.compiled = compiled
+        self.penalty_weights = build_penalty_weights(constraints or {})
+        self.slots_per_day = len(compiled.time_slots)
+        self.cell_count = len(compiled.working_days) * self.slots_per_day
+        self.all_cells = (1 << self.cell_count) - 1
+
+        self.activities = {activity["activityId"]: activity for activity in solution}
+        self.busy = {"teacher": defaultdict(int), "group": defaultdict(int), "room": defaultdict(int)}
+        self.counts: Dict[Tuple[str, Any, int], int] = defaultdict(int)
+        # Teacher slot indices per day (a multiset, as the soft constraint checks see it)
+        self.teacher_day_slots: Dict[Tuple[Any, int], List[int]] = defaultdict(list)
+
+        basic_info = compiled.basic_info
+        lunch_start = basic_info.get("lunchBreakStart", "12:00")
+        lunch_end = basic_info.get("lunchBreakEnd", "13:00")
+        self.lunch_slots = [
+            (ts.get("startTime", "") >= lunch_start and ts.get("startTime", "") < lunch_end) or
+            (ts.get("endTime", "") > lunch_start and ts.get("endTime", "") <= lunch_end)
+            for ts in compiled.time_slots
+        ]
+
+        for activity in solution:
+            cell = self.cell_of(activity)
+            if cell is None:
+                continue
+            for kind, resource_id in self._resources(activity):
+                self.counts[(kind, resource_id, cell)] += 1
+                self.busy[kind][resource_id] |= 1 << cell
+            self.teacher_day_slots[(activity["teacherId"], cell // self.slots_per_day)].append(cell % self.slots_per_day)
+
+    @staticmethod
+    def _resources(activity: Dict[str, Any]):
+        return (("teacher", activity["teacherId"]), ("group", activity["studentGroupId"]), ("room", activity["roomId"]))
+
+    def cell_of(self, activity: Dict[str, Any]) -> Optional[int]:
+        day_index = self.compiled.day_index.get(activity.get("day"))
+        slot_index = self.compiled.time_slot_indices.get(activity.get("timeSlotId"))
+        if day_index is None or slot_index is None:
+            return None
+        return day_index * self.slots_per_day + slot_index
+
+    def _busy_without(self, kind: str, resource_id: Any, cell: Optional[int]) -> int:
+        """Occupancy of a resource ignoring the activity being moved (which sits in cell)"""
+        mask = self.busy[kind].get(resource_id, 0)
+        if cell is not None and self.counts.get((kind, resource_id, cell), 0) == 1:
+            mask &= ~(1 << cell)
+        return mask
+
+    def move_options(self, activity_id: Any, limit: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """
+        Every (day, slot, room) where the activity's teacher, student group and a suitable room
+        are all free, ranked by the change in soft-constraint penalty (lowest first).
+        Returns None if the activity is not part of the solution.
+        """
+        activity = self.activities.get(activity_id)
+        if activity is None:
+            return None
+
+        cell = self.cell_of(activity)
+        free_cells = self.all_cells
+        free_cells &= ~self._busy_without("teacher", activity["teacherId"], cell)
+        free_cells &= ~self._busy_without("group", activity["studentGroupId"], cell)
+
+        subject = self.compiled.subjects_dict.get(activity.get("subjectId"), {})
+        required_room_type = activity.get("requiredRoomType") or subject.get("requiredRoomType", "Classroom")
+        candidate_rooms = self.compiled.get_suitable_rooms(required_room_type, activity["studentCount"])
+
+        cell_costs: Dict[int, int] = {}
+        options = []
+        for room_id in dict.fromkeys(candidate_rooms):
+            room_busy = (self._busy_without("room", room_id, cell) if room_id == activity["roomId"]
+                         else self.busy["room"].get(room_id, 0))
+            room_cells = free_cells & ~room_busy
+            room = self.compiled.rooms_dict[room_id]
+            for target in _iter_bits(room_cells):
+                if target == cell and room_id == activity["roomId"]:
+                    continue  # current placement
+                cost = cell_costs.get(target)
+                if cost is None:
+                    cost = cell_costs[target] = self.soft_cost_delta(activity, cell, target)
+                options.append((cost, target, room.get("capacity", 0), room_id))
+
+        options.sort(key=lambda option: (option[0], option[1], option[2]))
+        total = len(options)
+        if limit is not None:
+            options = options[:limit]
+
+        return {
+            "activityId": activity_id,
+            "current": self._describe(cell, activity["roomId"]),
+            "candidateRooms": len(candidate_rooms),
+            "totalOptions": total,
+            "options": [
+                {**self._describe(target, room_id), "softCostDelta": cost}
+                for cost, target, _, room_id in options
+            ]
+        }
+
+    def _describe(self, cell: Optional[int], room_id: Any) -> Dict[str, Any]:
+        room = self.compiled.rooms_dict.get(room_id, {})
+        if cell is None:
+            return {"day": None, "period": None, "time": None, "roomId": room_id, "roomName": room.get("name")}
+        time_slot = self.compiled.time_slots[cell % self.slots_per_day]
+        return {
+            "day": self.compiled.working_days[cell // self.slots_per_day],
+            "period": time_slot["id"],
+            "time": f"{time_slot.get('startTime', '')}-{time_slot.get('endTime', '')}",
+            "roomId": room_id,
+            "roomName": room.get("name")
+        }
+
+    # Soft-constraint cost of a move (mirrors ConstraintChecker's soft checks)
+
+    def soft_cost_delta(self, activity: Dict[str, Any], from_cell: Optional[int], to_cell: int) -> int:
+        """Change in weighted soft penalty when the activity moves from from_cell to to_cell"""
+        teacher_id = activity["teacherId"]
+        teacher = self.compiled.teachers_dict.get(teacher_id)
+        to_day, to_slot = divmod(to_cell, self.slots_per_day)
+        to_slots = self.teacher_day_slots.get((teacher_id, to_day), [])
+
+        if from_cell is None:
+            # Not currently placed on the grid: only the target day changes
+            return (self._day_penalty(teacher, to_slots + [to_slot]) - self._day_penalty(teacher, to_slots)
+                    + self._cell_penalty(teacher, to_day, to_slot))
+
+        from_day, from_slot = divmod(from_cell, self.slots_per_day)
+        from_slots = self.teacher_day_slots[(teacher_id, from_day)]
+        remaining = list(from_slots)
+        remaining.remove(from_slot)
+
+        if from_day == to_day:
+            delta = self._day_penalty(teacher, remaining + [to_slot]) - self._day_penalty(teacher, from_slots)
+        else:
+            delta = (self._day_penalty(teacher, remaining) - self._day_penalty(teacher, from_slots)
+                     + self._day_penalty(teacher, to_slots + [to_slot]) - self._day_penalty(teacher, to_slots))
+        return delta + self._cell_penalty(teacher, to_day, to_slot) - self._cell_penalty(teacher, from_day, from_slot)
+
+    def _cell_penalty(self, teacher: Optional[Dict[str, Any]], day_index: int, slot_index: int) -> int:
+        """Lunch, preferred-day and research-day penalties of one placement"""
+        weights = self.penalty_weights
+        penalty = weights["lunch_violation"] if self.lunch_slots[slot_index] else 0
+        if teacher:
+            day = self.compiled.working_days[day_index]
+            preferred_days = teacher.get("preferredDays", [])
+            if preferred_days and day not in preferred_days:
+                penalty += weights["preference_violation"]
+            if day in teacher.get("researchDays", []):
+                penalty += 2 * weights["research_day_violation"]
+        return penalty
+
+    def _day_penalty(self, teacher: Optional[Dict[str, Any]], slot_indices: List[int]) -> int:
+        return teacher_day_penalty(teacher, slot_indices, self.penalty_weights)
+
+
+class OccupancyCache:
+    """Small LRU of occupancy indexes for stored timetables (they never change once saved)"""
+
+    def __init__(self, max_entries: int = 16):
+        self.max_entries = max_entries
+        self.entries: "OrderedDict[str, OccupancyIndex]" = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get_or_build(self, key: str, build) -> OccupancyIndex:
+        with self.lock:
+            index = self.entries.get(key)
+            if index is not None:
+                self.entries.move_to_end(key)
+                return index
+        index = build()
+        with self.lock:
+            self.entries[key] = index
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        return index
+
+    def discard(self, key: str):
+        with self.lock:
+            self.entries.pop(key, None)
+
+
+occupancy_cache = OccupancyCache()
@@ -0,0 +1,181 @@
+from typing import Dict, Any, Tuple, Optional
+import json
+import logging
+import math
+import os
+
+from algorithms.enhanced_genetic_algorithm import ENGINE_GENERATIONAL
+from utils.cost_model import cost_model, CostModel, instance_features, MAX_SOLVE_SECONDS
+from utils.memory_budget import MIN_POPULATION_SIZE
+
+PRESET_AUTO = "auto"
+
+# Static presets (algorithmSettings.preset); explicit settings in the same request take precedence
+PRESETS: Dict[str, Dict[str, Any]] = {
+    "fast": {
+        "populationSize": 40,
+        "generations": 75,
+        "mutationRate": 0.15,
+        "crossoverRate": 0.8,
+        "eliteSize": 4,
+        "description": "Quick generation with acceptable quality"
+    },
+    "balanced": {
+        "populationSize": 60,
+        "generations": 150,
+        "mutationRate": 0.12,
+        "crossoverRate": 0.85,
+        "eliteSize": 6,
+        "description": "Good balance of speed and quality"
+    },
+    "quality": {
+        "populationSize": 100,
+        "generations": 250,
+        "mutationRate": 0.1,
+        "crossoverRate": 0.9,
+        "eliteSize": 8,
+        "description": "High quality results"
+    }
+}
+
+# Time budget the auto preset plans for unless the request sets timeBudgetSeconds
+AUTO_TIME_BUDGET_SECONDS = float(os.environ.get("TIMETABLE_AUTO_TIME_BUDGET", "60"))
+
+# Auto keeps shrinking the population until it can afford this many generations
+AUTO_MIN_GENERATIONS = 30
+AUTO_MAX_GENERATIONS = 500
+AUTO_MAX_POPULATION = 100
+
+PRESET_SETTING_KEYS = ("populationSize", "generations", "mutationRate", "crossoverRate", "eliteSize",
+                       "tournamentSize", "maxStagnationGenerations")
+
+# Settings benchmarks/tune.py searches over (generations follow from its evaluation budget)
+TUNED_SETTING_KEYS = tuple(key for key in PRESET_SETTING_KEYS if key != "generations")
+
+# Presets written by `python -m benchmarks.tune`; they are added to (or replace) the table above,
+# and the auto preset starts from the tuned settings of the instance's size class
+PRESETS_FILE = os.environ.get("TIMETABLE_PRESETS_FILE", "")
+
+
+def load_tuned_presets(path: str = PRESETS_FILE) -> Dict[str, Dict[str, Any]]:
+    if not path:
+        return {}
+    try:
+        with open(path) as f:
+            return json.load(f)["presets"]
+    except (OSError, ValueError, KeyError) as e:
+        logging.warning(f"Could not load tuned presets from {path}: {str(e)}")
+        return {}
+
+
+TUNED_PRESETS = load_tuned_presets()
+PRESETS.update(TUNED_PRESETS)
+
+
+def tuned_size_class(activities: int, tuned: Dict[str, Dict[str, Any]] = TUNED_PRESETS) -> Optional[str]:
+    """Smallest tuned size class that covers the activity count (maxActivities null means unbounded)"""
+    classes = sorted(((preset["maxActivities"] or math.inf, name) for name, preset in tuned.items()
+                      if "maxActivities" in preset), key=lambda item: item[0])
+    for max_activities, name in classes:
+        if activities <= max_activities:
+            return name
+    return None
+
+
+def search_features(ga) -> Dict[str, Any]:
+    """Instance features the auto preset reads: size, tightness and mean domain sizes"""
+    compiled = ga.compiled
+    weekly_slots = len(ga.time_slots) * len(ga.working_days)
+    activities = ga.activities
+    teacher_domain = [len(ga.subject_teacher_map.get(a["subjectName"], [])) for a in activities]
+    room_domain = [len(compiled.get_suitable_rooms(a["requiredRoomType"], a["studentCount"])) for a in activities]
+    capacity = weekly_slots * len(ga.rooms)
+    return {
+        "activities": len(activities),
+        "weeklySlots": weekly_slots,
+        # Required teaching hours over room-slot capacity
+        "tightness": round(compiled.total_required_hours() / capacity, 4) if capacity else None,
+        "meanTeacherDomain": round(sum(teacher_domain) / len(activities), 2) if activities else 0,
+        "meanRoomDomain": round(sum(room_domain) / len(activities), 2) if activities else 0
+    }
+
+
+def derive_auto_settings(ga, time_budget: float, model: CostModel = cost_model) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    Settings for one instance and time budget:
+      - population grows with log(activities), capped at AUTO_MAX_POPULATION;
+      - generations are whatever the cost model says fits the budget, and the population shrinks
+        (down to MIN_POPULATION_SIZE) until at least AUTO_MIN_GENERATIONS fit;
+      - mutation rate rises with tightness (more conflicts to repair), elites are 10% of the population.
+    With tuned presets loaded, the size class's tuned settings replace these rules; the population
+    still shrinks to fit the budget, keeping the tuned elite share.
+    Returns (settings, features).
+    """
+    features = search_features(ga)
+    tightness = features["tightness"] or 0.0
+    population_size = min(AUTO_MAX_POPULATION, round(20 + 10 * math.log2(1 + features["activities"] / 50)))
+    mutation_rate = round(min(0.25, max(0.05, 0.06 + 0.12 * tightness)), 3)
+    elite_share = (1, 10)
+    tuned = {}
+    size_class = tuned_size_class(features["activities"])
+    if size_class:
+        features["tunedSizeClass"] = size_class
+        tuned = {key: TUNED_PRESETS[size_class][key] for key in TUNED_SETTING_KEYS if key in TUNED_PRESETS[size_class]}
+        population_size = tuned.get("populationSize", population_size)
+        if "eliteSize" in tuned:
+            elite_share = (tuned["eliteSize"], population_size)
+
+    original = (ga.population_size, ga.generations, ga.elite_size, ga.tournament_size)
+    ga.tournament_size = tuned.get("tournamentSize", ga.tournament_size)
+    while True:
+        ga.population_size = population_size
+        ga.elite_size = max(1 if tuned else 2, population_size * elite_share[0] // elite_share[1])
+        ga.generations = 0
+        cost = instance_features(ga)
+        fixed = model.predict_seconds(cost, 0)
+        per_generation = model.predict_seconds(cost, 1) - fixed
+        generations = int((time_budget - fixed) / per_generation) if per_generation > 0 else AUTO_MAX_GENERATIONS
+        if generations >= AUTO_MIN_GENERATIONS or population_size <= MIN_POPULATION_SIZE:
+            break
+        population_size = max(MIN_POPULATION_SIZE, population_size * 3 // 4)
+    elite_size = ga.elite_size
+    ga.population_size, ga.generations, ga.elite_size, ga.tournament_size = original
+
+    settings = {
+        "mutationRate": mutation_rate,
+        "crossoverRate": 0.85,
+        **tuned,
+        "populationSize": population_size,
+        "generations": max(1, min(AUTO_MAX_GENERATIONS, generations)),
+        "eliteSize": elite_size
+    }
+    return settings, features
+
+
+def resolve_algorithm_settings(ga, algorithm_settings: Dict[str, Any]) -> Tuple[Dict[str, Any], Optional[Dict[str, Any]]]:
+    """
+    Expand algorithmSettings.preset ("fast", "balanced", "quality" or "auto") into concrete settings.
+    Settings given explicitly alongside the preset win. Returns (settings, preset report or None).
+    """
+    preset = algorithm_settings.get("preset")
+    if not preset:
+        return algorithm_settings, None
+    if preset == PRESET_AUTO:
+        time_budget = float(algorithm_settings.get("timeBudgetSeconds", AUTO_TIME_BUDGET_SECONDS))
+        if MAX_SOLVE_SECONDS:
+            time_budget = min(time_budget, MAX_SOLVE_SECONDS)
+        # Generations are planned for the engine the run will use
+        ga.engine = algorithm_settings.get("engine", ga.engine)
+        derived, features = derive_auto_settings(ga, time_budget)
+        report = {"preset": preset, "timeBudgetSeconds": time_budget, "features": features}
+    elif preset in PRESETS:
+        derived = {key: PRESETS[preset][key] for key in PRESET_SETTING_KEYS if key in PRESETS[preset]}
+        report = {"preset": preset}
+    else:
+        raise ValueError(f"Unknown preset: {preset} (expected one of: {', '.join([PRESET_AUTO, *PRESETS])})")
+
+    explicit = {key: value for key, value in algorithm_settings.items() if key in PRESET_SETTING_KEYS}
+    settings = {**algorithm_settings, **derived, **explicit}
+    report["settings"] = {**derived, **explicit}
+    report["engine"] = settings.get("engine", ENGINE_GENERATIONAL)
+    return settings, report
@@ -0,0 +1,82 @@
+from typing import Dict, Any, Callable
+from collections import defaultdict
+from contextlib import contextmanager
+import functools
+import time
+
+
+class PhaseProfiler:
+    """
+    Cumulative wall time and call count per named phase of a generation run.
+    Phases may nest (e.g. constraint checks run inside both "fitness" and "selection"),
+    so each phase reports its inclusive time and the shares do not add up to 100%.
+    """
+
+    enabled = True
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.seconds: Dict[str, float] = defaultdict(float)
+        self.calls: Dict[str, int] = defaultdict(int)
+
+    @contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.seconds[name] += time.perf_counter() - start
+            self.calls[name] += 1
+
+    def wrap(self, name: str, fn: Callable) -> Callable:
+        """fn, timed as one call of the named phase per invocation"""
+        @functools.wraps(fn)
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self.seconds[name] += time.perf_counter() - start
+                self.calls[name] += 1
+        return timed
+
+    def report(self) -> Dict[str, Any]:
+        total = time.perf_counter() - self.started_at
+        return {
+            "totalSeconds": round(total, 6),
+            "phases": {
+                name: {
+                    "seconds": round(seconds, 6),
+                    "calls": self.calls[name],
+                    "percent": round(seconds / total * 100, 2) if total > 0 else 0.0
+                }
+                for name, seconds in sorted(self.seconds.items(), key=lambda item: -item[1])
+            }
+        }
+
+
+class _NullPhase:
+    def __enter__(self):
+        return None
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+class NullProfiler:
+    """Stand-in used when profiling is off: phases cost one no-op context manager"""
+
+    enabled = False
+    _phase = _NullPhase()
+
+    def phase(self, name: str):
+        return self._phase
+
+    def wrap(self, name: str, fn: Callable) -> Callable:
+        return fn
+
+    def report(self) -> Dict[str, Any]:
+        return {}
+
+
+NULL_PROFILER = NullProfiler()
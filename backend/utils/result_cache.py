@@ -0,0 +1,277 @@
+from typing import Dict, Any, Callable, Optional
+from collections import OrderedDict
+import threading
+import sqlite3
+import hashlib
+import logging
+import json
+import time
+import zlib
+import os
+
+from algorithms.solve_control import CancellationToken, SolveCancelled
+
+# Request parts that never change the generated timetable and are left out of the cache key
+NON_SEMANTIC_DATA_KEYS = {"metadata"}
+NON_SEMANTIC_SETTINGS = {"checkpointInterval"}
+
+# Top-level request options that shape the response payload, with their defaults
+RESPONSE_OPTIONS = {"includeViews": False, "responseFormat": "nested", "persist": True}
+
+# How often (seconds) a coalesced waiter re-checks its own cancellation token
+WAIT_POLL_INTERVAL = 0.5
+
+
+def canonical_request_hash(request_data: Dict[str, Any]) -> str:
+    """
+    Stable hash of everything that influences a generation result
+    (university data, algorithm settings including the seed, and response options).
+    """
+    university_data = {
+        key: value for key, value in request_data.get("universityData", {}).items()
+        if key not in NON_SEMANTIC_DATA_KEYS
+    }
+    algorithm_settings = {
+        key: value for key, value in (request_data.get("algorithmSettings") or {}).items()
+        if key not in NON_SEMANTIC_SETTINGS
+    }
+    key_parts = {"universityData": university_data, "algorithmSettings": algorithm_settings}
+    # Response options change the payload, so they are part of the key when not left at their default
+    for option, default in RESPONSE_OPTIONS.items():
+        if request_data.get(option, default) != default:
+            key_parts[option] = request_data[option]
+    canonical = json.dumps(key_parts, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class _InFlight:
+    """A solve currently running for one cache key"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class ResultCache:
+    """
+    Two-tier cache of generation responses keyed by canonical request hash.
+    Memory tier is an LRU; the optional SQLite tier survives restarts and is
+    bounded by TTL and total size. Identical in-flight requests share one solve.
+    """
+
+    def __init__(self, max_entries: int = 32, ttl_seconds: float = 3600,
+                 db_path: Optional[str] = None, db_max_bytes: int = 256 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.db_path = db_path
+        self.db_max_bytes = db_max_bytes
+        self.memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self.in_flight: Dict[str, _InFlight] = {}
+        self.lock = threading.Lock()
+        self.db_lock = threading.Lock()
+        self.stats = {"hits": 0, "memoryHits": 0, "diskHits": 0, "misses": 0, "coalesced": 0, "stores": 0, "evictions": 0}
+
+        if self.db_path:
+            self._init_db()
+
+    def get_or_compute(self, key: str, compute: Callable[[], Dict[str, Any]],
+                       cancel_token: Optional[CancellationToken] = None) -> tuple:
+        """
+        Return (result, status) where status is "hit", "coalesced" or "miss".
+        Only successful results are stored.
+        """
+        while True:
+            # Only the memory tier and the in-flight map are read under the lock; the disk tier is
+            # read by the flight's owner after releasing it, so identical requests still coalesce
+            with self.lock:
+                cached = self._get_memory_locked(key)
+                if cached is not None:
+                    return cached, "hit"
+
+                flight = self.in_flight.get(key)
+                if flight is None:
+                    flight = _InFlight()
+                    self.in_flight[key] = flight
+                    owner = True
+                else:
+                    owner = False
+                    flight.waiters += 1
+                    self.stats["coalesced"] += 1
+
+            if owner:
+                return self._compute(key, flight, compute)
+
+            while not flight.done.wait(WAIT_POLL_INTERVAL):
+                if cancel_token and cancel_token.is_cancelled:
+                    raise SolveCancelled(cancel_token.reason or "cancelled")
+
+            if flight.error is None:
+                return flight.result, "coalesced"
+            if not isinstance(flight.error, SolveCancelled):
+                raise flight.error
+            # The solve we were waiting on was cancelled; try again (possibly as the owner)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self.lock:
+            cached = self._get_memory_locked(key)
+        if cached is None:
+            cached = self._get_disk_promoted(key)
+        return cached
+
+    def put(self, key: str, result: Dict[str, Any]):
+        with self.lock:
+            self._put_memory(key, result)
+            self.stats["stores"] += 1
+        if self.db_path:
+            self._put_disk(key, result)
+
+    def clear(self):
+        with self.lock:
+            self.memory.clear()
+        if self.db_path:
+            with self.db_lock, self._connect() as conn:
+                conn.execute("DELETE FROM results")
+
+    def status(self) -> Dict[str, Any]:
+        lookups = self.stats["hits"] + self.stats["misses"] + self.stats["coalesced"]
+        status = {
+            **self.stats,
+            "hitRate": round(self.stats["hits"] / lookups, 4) if lookups else 0.0,
+            "memoryEntries": len(self.memory),
+            "maxMemoryEntries": self.max_entries,
+            "inFlight": len(self.in_flight),
+            "ttlSeconds": self.ttl_seconds,
+            "diskEnabled": bool(self.db_path)
+        }
+        if self.db_path:
+            with self.db_lock, self._connect() as conn:
+                count, size = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results").fetchone()
+            status.update({"diskEntries": count, "diskBytes": size, "maxDiskBytes": self.db_max_bytes})
+        return status
+
+    def _compute(self, key: str, flight: _InFlight, compute: Callable[[], Dict[str, Any]]) -> tuple:
+        """Resolve the flight as its owner: from the disk tier if it has the result, else by solving"""
+        try:
+            result = self._get_disk_promoted(key)
+            if result is not None:
+                flight.result = result
+                return result, "hit"
+
+            with self.lock:
+                self.stats["misses"] += 1
+            result = compute()
+            flight.result = result
+            if result.get("success"):
+                self.put(key, result)
+            return result, "miss"
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self.lock:
+                self.in_flight.pop(key, None)
+            flight.done.set()
+
+    def _get_memory_locked(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self.memory.get(key)
+        if entry is not None:
+            stored_at, result = entry
+            if time.time() - stored_at <= self.ttl_seconds:
+                self.memory.move_to_end(key)
+                self.stats["hits"] += 1
+                self.stats["memoryHits"] += 1
+                return result
+            del self.memory[key]
+        return None
+
+    def _get_disk_promoted(self, key: str) -> Optional[Dict[str, Any]]:
+        """Disk tier lookup (caller must not hold the lock); a hit is copied into the memory tier"""
+        if not self.db_path:
+            return None
+        result = self._get_disk(key, time.time())
+        if result is not None:
+            with self.lock:
+                self._put_memory(key, result)
+                self.stats["hits"] += 1
+                self.stats["diskHits"] += 1
+        return result
+
+    def _put_memory(self, key: str, result: Dict[str, Any]):
+        self.memory[key] = (time.time(), result)
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.max_entries:
+            self.memory.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    # SQLite tier
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=10)
+
+    def _init_db(self):
+        directory = os.path.dirname(self.db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self.db_lock, self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS results (
+                    key TEXT PRIMARY KEY,
+                    stored_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL,
+                    size INTEGER NOT NULL,
+                    payload BLOB NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_results_accessed ON results (accessed_at)")
+
+    def _get_disk(self, key: str, now: float) -> Optional[Dict[str, Any]]:
+        try:
+            with self.db_lock, self._connect() as conn:
+                row = conn.execute("SELECT stored_at, payload FROM results WHERE key = ?", (key,)).fetchone()
+                if row is None:
+                    return None
+                stored_at, payload = row
+                if now - stored_at > self.ttl_seconds:
+                    conn.execute("DELETE FROM results WHERE key = ?", (key,))
+                    return None
+                conn.execute("UPDATE results SET accessed_at = ? WHERE key = ?", (now, key))
+            return json.loads(zlib.decompress(payload))
+        except (sqlite3.Error, zlib.error, ValueError) as e:
+            logging.warning(f"Result cache disk read failed: {str(e)}")
+            return None
+
+    def _put_disk(self, key: str, result: Dict[str, Any]):
+        payload = zlib.compress(json.dumps(result, separators=(",", ":"), default=str).encode("utf-8"))
+        now = time.time()
+        try:
+            with self.db_lock, self._connect() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO results (key, stored_at, accessed_at, size, payload) VALUES (?, ?, ?, ?, ?)",
+                    (key, now, now, len(payload), sqlite3.Binary(payload))
+                )
+                conn.execute("DELETE FROM results WHERE stored_at < ?", (now - self.ttl_seconds,))
+                self._evict_disk_locked(conn)
+        except sqlite3.Error as e:
+            logging.warning(f"Result cache disk write failed: {str(e)}")
+
+    def _evict_disk_locked(self, conn: sqlite3.Connection):
+        """Drop least recently used rows until the tier fits its size budget"""
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+        if total <= self.db_max_bytes:
+            return
+        for key, size in conn.execute("SELECT key, size FROM results ORDER BY accessed_at").fetchall():
+            conn.execute("DELETE FROM results WHERE key = ?", (key,))
+            self.stats["evictions"] += 1
+            total -= size
+            if total <= self.db_max_bytes:
+                break
+
+
+result_cache = ResultCache(
+    max_entries=int(os.environ.get("TIMETABLE_CACHE_SIZE", "32")),
+    ttl_seconds=float(os.environ.get("TIMETABLE_CACHE_TTL", "3600")),
+    db_path=os.environ.get("TIMETABLE_CACHE_DB") or None,
+    db_max_bytes=int(float(os.environ.get("TIMETABLE_CACHE_DB_MAX_MB", "256")) * 1024 * 1024)
+)
@@ -0,0 +1,50 @@
+from typing import Dict, Any, List, Optional
+from collections import Counter
+from datetime import datetime
+import json
+import logging
+import os
+import uuid
+
+# Directory for full per-generation traces (empty string disables writing them)
+TRACE_DIR = os.environ.get("TIMETABLE_TRACE_DIR", "traces")
+
+# Maximum number of trace records returned in a response
+TRACE_POINTS = int(os.environ.get("TIMETABLE_TRACE_POINTS", "100"))
+
+
+def downsample_trace(records: List[Dict[str, Any]], max_points: int = TRACE_POINTS) -> List[Dict[str, Any]]:
+    """Evenly spaced records, always including the first and last generation"""
+    if len(records) <= max_points:
+        return list(records)
+    if max_points < 2:
+        return records[-1:]
+    step = (len(records) - 1) / (max_points - 1)
+    return [records[round(i * step)] for i in range(max_points)]
+
+
+def save_trace(records: List[Dict[str, Any]], directory: Optional[str] = TRACE_DIR) -> Optional[str]:
+    """Write the full trace as JSON Lines (one record per generation); returns the file path"""
+    if not directory:
+        return None
+    path = os.path.join(directory, f"trace-{datetime.now().strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}.jsonl")
+    try:
+        os.makedirs(directory, exist_ok=True)
+        with open(path, "w") as f:
+            for record in records:
+                f.write(json.dumps(record, separators=(",", ":")) + "\n")
+    except OSError as e:
+        logging.warning(f"Could not write convergence trace: {str(e)}")
+        return None
+    return path
+
+
+def summarize_trace(records: List[Dict[str, Any]], directory: Optional[str] = TRACE_DIR,
+                    max_points: int = TRACE_POINTS) -> Dict[str, Any]:
+    """Response form of a GA trace: downsampled records, improvement sources and the full trace file"""
+    return {
+        "generations": len(records),
+        "points": downsample_trace(records, max_points),
+        "improvementSources": dict(Counter(r["improvement"] for r in records if r["improvement"])),
+        "file": save_trace(records, directory)
+    }
@@ -0,0 +1,61 @@
+from typing import Dict, Any, Optional
+from collections import OrderedDict
+import threading
+import logging
+import uuid
+import time
+
+
+class Session:
+    """One server-side session: its state object plus a lock serialising edits to it"""
+
+    def __init__(self, state: Any):
+        self.id = uuid.uuid4().hex
+        self.state = state
+        self.lock = threading.Lock()
+        self.created_at = time.time()
+        self.last_used = self.created_at
+
+
+class SessionStore:
+    """In-memory sessions with idle expiry and a session count limit (least recently used go first)"""
+
+    def __init__(self, kind: str, max_sessions: int = 100, idle_timeout: float = 1800):
+        self.kind = kind
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self.sessions: "OrderedDict[str, Session]" = OrderedDict()
+        self.lock = threading.Lock()
+
+    def add(self, state: Any) -> Session:
+        session = Session(state)
+        with self.lock:
+            self._expire_locked()
+            self.sessions[session.id] = session
+            while len(self.sessions) > self.max_sessions:
+                evicted_id, _ = self.sessions.popitem(last=False)
+                logging.info(f"Evicted {self.kind} session {evicted_id}")
+        return session
+
+    def get(self, session_id: str) -> Optional[Session]:
+        with self.lock:
+            self._expire_locked()
+            session = self.sessions.get(session_id)
+            if session:
+                session.last_used = time.time()
+                self.sessions.move_to_end(session_id)
+            return session
+
+    def delete(self, session_id: str) -> bool:
+        with self.lock:
+            return self.sessions.pop(session_id, None) is not None
+
+    def status(self) -> Dict[str, Any]:
+        with self.lock:
+            self._expire_locked()
+            return {"sessions": len(self.sessions), "maxSessions": self.max_sessions, "idleTimeout": self.idle_timeout}
+
+    def _expire_locked(self):
+        cutoff = time.time() - self.idle_timeout
+        for session_id in [sid for sid, s in self.sessions.items() if s.last_used < cutoff]:
+            del self.sessions[session_id]
@@ -0,0 +1,145 @@
+from typing import Dict, Any, Optional
+from collections import Counter
+from contextlib import contextmanager
+import cProfile
+import hmac
+import logging
+import os
+import sys
+import threading
+import time
+
+# Profile captures are only accepted with this token in the X-Admin-Token header (unset disables them)
+ADMIN_TOKEN = os.environ.get("TIMETABLE_ADMIN_TOKEN", "")
+
+# Where captured profiles are written, one set of files per job
+PROFILE_DIR = os.environ.get("TIMETABLE_PROFILE_DIR", "profiles")
+
+SAMPLE_INTERVAL = float(os.environ.get("TIMETABLE_PROFILE_INTERVAL_MS", "5")) / 1000
+
+PROFILE_MODE_SAMPLING = "sampling"
+PROFILE_MODE_CPROFILE = "cprofile"
+# Sampler and cProfile together: collapsed stacks and a pstats dump from the same solve
+PROFILE_MODE_BOTH = "both"
+PROFILE_MODES = (PROFILE_MODE_SAMPLING, PROFILE_MODE_CPROFILE, PROFILE_MODE_BOTH)
+
+# File suffix per profile format
+PROFILE_FILES = {"collapsed": ".collapsed.txt", "pstats": ".pstats"}
+
+
+def admin_token_valid(token: Optional[str]) -> bool:
+    return bool(ADMIN_TOKEN) and token is not None and hmac.compare_digest(token, ADMIN_TOKEN)
+
+
+def sampling_supported() -> bool:
+    return hasattr(sys, "_current_frames")
+
+
+def resolve_profile_mode(option: Any) -> Optional[str]:
+    """
+    Profile mode for a captureProfile request option: true captures both formats. Without
+    sampler support in the interpreter only cProfile runs. Returns None for an invalid option.
+    """
+    if option is True:
+        option = PROFILE_MODE_BOTH
+    if option in (PROFILE_MODE_SAMPLING, PROFILE_MODE_BOTH) and not sampling_supported():
+        return PROFILE_MODE_CPROFILE
+    return option if option in PROFILE_MODES else None
+
+
+def profile_path(job_id: str, profile_format: str, directory: str = PROFILE_DIR) -> str:
+    return os.path.join(directory, f"{job_id}{PROFILE_FILES[profile_format]}")
+
+
+def remove_profile(job_id: str, directory: str = PROFILE_DIR):
+    """Delete every captured profile file of a job"""
+    for profile_format in PROFILE_FILES:
+        path = profile_path(job_id, profile_format, directory)
+        if os.path.exists(path):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+class SamplingProfiler:
+    """
+    Samples the call stack of one thread at a fixed interval from a background thread.
+    Stacks are aggregated in flamegraph "collapsed" form (root;...;leaf count).
+    """
+
+    def __init__(self, thread_id: int, interval: float = SAMPLE_INTERVAL):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="timetable-profiler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        labels: Dict[Any, str] = {}
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                label = labels.get(code)
+                if label is None:
+                    label = labels[code] = f"{os.path.basename(code.co_filename)}:{code.co_name}"
+                stack.append(label)
+                frame = frame.f_back
+            del frame
+            self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+@contextmanager
+def capture_profile(job_id: str, mode: str, directory: str = PROFILE_DIR):
+    """
+    Profile the current thread for the duration of the block and write the collapsed stacks
+    and/or pstats dump of the mode to the profile directory. Yields a dict that describes the capture once the block exits.
+    """
+    info: Dict[str, Any] = {"mode": mode, "files": {}}
+    started = time.perf_counter()
+    sampler = None
+    profiler = None
+    if mode in (PROFILE_MODE_SAMPLING, PROFILE_MODE_BOTH):
+        sampler = SamplingProfiler(threading.get_ident())
+        sampler.start()
+    if mode in (PROFILE_MODE_CPROFILE, PROFILE_MODE_BOTH):
+        profiler = cProfile.Profile()
+        profiler.enable()
+    try:
+        yield info
+    finally:
+        if profiler is not None:
+            profiler.disable()
+        if sampler is not None:
+            sampler.stop()
+        info["durationSeconds"] = round(time.perf_counter() - started, 3)
+        try:
+            os.makedirs(directory, exist_ok=True)
+            if sampler is not None:
+                info["samples"] = sampler.samples
+                info["intervalMs"] = sampler.interval * 1000
+                with open(profile_path(job_id, "collapsed", directory), "w") as f:
+                    f.write(sampler.collapsed())
+                info["files"]["collapsed"] = profile_path(job_id, "collapsed", directory)
+            if profiler is not None:
+                profiler.dump_stats(profile_path(job_id, "pstats", directory))
+                info["files"]["pstats"] = profile_path(job_id, "pstats", directory)
+        except OSError as e:
+            logging.warning(f"Could not write profile for job {job_id}: {str(e)}")
+            info["error"] = str(e)
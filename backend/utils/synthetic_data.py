@@ -0,0 +1,438 @@
+"""
+Synthetic universityData generator for scale testing.
+
+Instances follow the shape of the GIKI FCSE data in resourses_files/: department-wise course
+lists, the FCSE lecture-hall slot grid, a lecture-hall / computing-lab inventory and faculty
+with research days. Everything is drawn from a seeded random.Random, so the same arguments
+always produce the same instance.
+
+    python -m utils.synthetic_data --activities 20000 --tightness 0.8 --request -o large.json
+"""
+from typing import Dict, Any, List, Optional
+from collections import defaultdict
+import argparse
+import json
+import math
+import random
+import sys
+
+# (code, name) pairs from the FCSE programs; further departments get generated codes
+DEPARTMENTS = [
+    ("AI", "Artificial Intelligence"),
+    ("CE", "Computer Engineering"),
+    ("CS", "Computer Science"),
+    ("DS", "Data Science"),
+    ("CYS", "Cyber Security"),
+    ("SWE", "Software Engineering")
+]
+
+COURSE_TITLES = [
+    "Computing and AI", "Digital Logic Design", "Information & Communication Technologies",
+    "Data Structures & Algorithms", "Discrete Mathematics", "Advance Linear Algebra",
+    "Circuit Analysis", "Computer Organization and Assembly Language", "Operating Systems",
+    "Software Engineering", "Machine Learning", "Knowledge Representation and Problem Solving",
+    "Signals and Systems", "Microprocessor Interfacing", "Computer Communications and Networks",
+    "Database Systems", "Computer Architecture", "Design and Analysis of Algorithms",
+    "Parallel Processing and Distributed Computing", "Digital System Design", "Digital Signal Processing",
+    "Information Assurance", "Software Design and Architecture", "HCI and UI/UX Graphics",
+    "Data Mining", "Data Visualization", "Big Data Analytics", "Cloud and Distributed Computing",
+    "Computational Methods and Techniques", "Entrepreneurship and Technology Commercialization",
+    "Engineering Economics and Management", "Senior Design Project"
+]
+
+ELECTIVE_TITLES = [
+    "Internet of Things", "DevOps", "Software Project Management", "Computer Vision",
+    "Natural Language Processing", "Deep Reinforcement Learning", "Medical Image Processing",
+    "Vulnerability Assessment", "Introduction to Data Science", "Financial Risk Management"
+]
+
+LAB_NAMES = [
+    "Cyber Security Lab", "Data Analytic Lab", "Artificial Intelligence Lab",
+    "Intelligent Computing and Research Laboratory", "High Performance Computing Lab",
+    "Digital System Lab", "System Architecture Lab", "PC Lab", "Software Engineering Lab",
+    "AR/VR Lab", "Embedded Systems and IC Design Lab", "PSD Lab"
+]
+
+LAB_EQUIPMENT = ["Computer", "Projector", "Whiteboard"]
+
+BUILDINGS = ["FCSE Building", "New Academic Block"]
+
+# Teaching periods of the FCSE lecture-hall grid (tea break 10:00-10:30, lunch/prayer 13:20-14:30)
+FCSE_SLOTS = [
+    ("08:00", "08:50"), ("09:00", "09:50"), ("10:30", "11:20"), ("11:30", "12:20"),
+    ("12:30", "13:20"), ("14:30", "15:20"), ("15:30", "16:20"), ("16:30", "17:20")
+]
+
+WORKING_DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday"]
+
+TITLES = ["Prof. Dr.", "Dr.", "Dr.", "Mr.", "Ms."]
+DESIGNATIONS = ["Professor", "Associate Professor", "Assistant Professor", "Lecturer"]
+FIRST_NAMES = [
+    "Qasim", "Talha", "Sarah", "Ahmar", "Waqar", "Usama", "Fahad", "Shahab", "Khurram", "Beenish",
+    "Ali", "Hasan", "Adnan", "Rashid", "Salman", "Nazia", "Taj", "Israr", "Ahsan", "Hanif"
+]
+LAST_NAMES = [
+    "Riaz", "Ashfaq", "Iqbal", "Rashid", "Ahmad", "Manzoor", "Muslim", "Ansari", "Jadoon", "Urooj",
+    "Sandhu", "Zaidi", "Shah", "Jillani", "Ashraf", "Khan", "Munir", "Hassan", "Qadeer", "Imran"
+]
+
+# Mean of the teachers' maxHoursPerWeek range below, used to size the faculty
+MEAN_MAX_HOURS = 15
+
+
+def _sessions(subject: Dict[str, Any]) -> int:
+    """Activities one enrolled group needs for a subject (same rule as CompiledInstance.generate_activities)"""
+    if subject["type"] == "Lab" and subject["duration"] > 60:
+        return 1
+    return subject["hoursPerWeek"]
+
+
+def _department(index: int):
+    if index < len(DEPARTMENTS):
+        return DEPARTMENTS[index]
+    return f"D{index + 1:02d}", f"Department {index + 1}"
+
+
+def _course_title(index: int) -> str:
+    title = COURSE_TITLES[index % len(COURSE_TITLES)]
+    return title if index < len(COURSE_TITLES) else f"{title} {index // len(COURSE_TITLES) + 1}"
+
+
+def activities_per_section(years: int, courses_per_year: int, labs_per_year: int,
+                           electives_per_section: int, hours_per_course: int = 3) -> float:
+    """Average activities generated by one section (electives are only taken from year 3 on)"""
+    elective_years = max(0, years - 2)
+    per_year = courses_per_year * hours_per_course + labs_per_year
+    return per_year + electives_per_section * hours_per_course * elective_years / max(years, 1)
+
+
+def sections_for_target(target_activities: int, departments: int, years: int, courses_per_year: int,
+                        labs_per_year: int, electives_per_section: int) -> int:
+    """Sections per (department, year) that get closest to a target activity count"""
+    per_section = activities_per_section(years, courses_per_year, labs_per_year, electives_per_section)
+    return max(1, round(target_activities / (per_section * departments * years)))
+
+
+def generate_university_data(departments: int = 6, years: int = 4, sections: int = 2,
+                             courses_per_year: int = 5, labs_per_year: int = 2, electives: int = 3,
+                             electives_per_section: int = 1, tightness: float = 0.75,
+                             research_day_ratio: float = 0.3, qualified_per_subject: int = 2,
+                             seed: int = 0) -> Dict[str, Any]:
+    """
+    Build a complete universityData instance.
+
+    tightness is the target ratio of demand to capacity (0 < tightness <= 1): classrooms, labs
+    and faculty are sized so that teaching hours fill about that share of every room-week and of
+    the teachers' maxHoursPerWeek. Higher values give harder instances.
+    """
+    if not 0 < tightness <= 1:
+        raise ValueError("tightness must be in (0, 1]")
+    rng = random.Random(seed)
+    cells_per_week = len(WORKING_DAYS) * len(FCSE_SLOTS)
+
+    department_rows, subjects, students = [], [], []
+    subjects_by_department: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    demand_hours: Dict[int, int] = defaultdict(int)
+    theory_cells = lab_cells = 0
+    next_subject_id = next_group_id = 1
+
+    def add_subject(dept_code: str, faculty: str, title: str, code: str, year: int, kind: str,
+                    is_elective: bool = False) -> Dict[str, Any]:
+        nonlocal next_subject_id
+        lab = kind == "Lab"
+        subject = {
+            "id": next_subject_id,
+            "name": f"{title} ({code})",
+            "code": code,
+            "department": faculty,
+            "program": dept_code,
+            "credits": 1 if lab else 3,
+            "type": kind,
+            "hoursPerWeek": 3,
+            "duration": 180 if lab else 60,
+            "semester": 2 * year - 1,
+            "year": year,
+            "isElective": is_elective,
+            "prerequisites": [],
+            "maxStudents": 60,
+            "requiredRoomType": "Laboratory" if lab else "Classroom",
+            "equipmentRequired": ["Computer"] if lab else [],
+            "description": ""
+        }
+        next_subject_id += 1
+        subjects.append(subject)
+        subjects_by_department[dept_code].append(subject)
+        return subject
+
+    for dept_index in range(departments):
+        dept_code, dept_name = _department(dept_index)
+        faculty = "FCSE" if dept_index < len(DEPARTMENTS) else f"Faculty {dept_index // len(DEPARTMENTS) + 1}"
+        department_rows.append({
+            "id": dept_index + 1, "name": dept_name, "code": dept_code, "head": "", "programs": [dept_code]
+        })
+
+        course_index = 0
+        for year in range(1, years + 1):
+            core, elective_pool = [], []
+            for k in range(courses_per_year):
+                title = _course_title(course_index + k)
+                core.append(add_subject(dept_code, faculty, title, f"{dept_code}{year}{k + 1:02d}", year, "Theory"))
+            for k in range(labs_per_year):
+                title = f"{_course_title(course_index + k)} Lab"
+                core.append(add_subject(dept_code, faculty, title, f"{dept_code}{year}{k + 1:02d}L", year, "Lab"))
+            course_index += courses_per_year
+            if year >= 3:
+                for k in range(electives):
+                    title = ELECTIVE_TITLES[(dept_index + year + k) % len(ELECTIVE_TITLES)]
+                    elective_pool.append(add_subject(dept_code, faculty, title, f"{dept_code}{year}E{k + 1}",
+                                                     year, "Theory", is_elective=True))
+
+            for section in range(sections):
+                chosen = rng.sample(elective_pool, min(electives_per_section, len(elective_pool)))
+                enrolled = core + chosen
+                students.append({
+                    "id": next_group_id,
+                    "batch": f"{dept_code}-{2025 - year + 1}",
+                    "department": faculty,
+                    "program": dept_code,
+                    "year": year,
+                    "semester": 2 * year - 1,
+                    "section": _section_label(section),
+                    "totalStudents": rng.randint(35, 50),
+                    "subjects": [subject["id"] for subject in enrolled],
+                    "type": "Full-time",
+                    "maxHoursPerDay": 8,
+                    "preferredTimeSlots": [],
+                    "unavailableSlots": []
+                })
+                next_group_id += 1
+                for subject in enrolled:
+                    demand_hours[subject["id"]] += subject["hoursPerWeek"]
+                    if subject["type"] == "Lab":
+                        lab_cells += _sessions(subject)
+                    else:
+                        theory_cells += _sessions(subject)
+
+    teachers = _generate_teachers(rng, subjects_by_department, demand_hours, tightness,
+                                  research_day_ratio, qualified_per_subject)
+    classrooms = max(1, math.ceil(theory_cells / (tightness * cells_per_week)))
+    labs = max(1, math.ceil(lab_cells / (tightness * cells_per_week))) if lab_cells else 0
+    rooms = _generate_rooms(rng, classrooms, labs)
+
+    return {
+        "basicInfo": {
+            "universityName": "GIKI (synthetic)",
+            "academicYear": "2025-2026",
+            "semester": "Fall",
+            "totalWeeks": 15,
+            "workingDays": list(WORKING_DAYS),
+            "dailyPeriods": len(FCSE_SLOTS),
+            "periodDuration": 50,
+            "breakDuration": 10,
+            "lunchBreakStart": "13:20",
+            "lunchBreakEnd": "14:30"
+        },
+        "timeSlots": [
+            {"id": idx + 1, "startTime": start, "endTime": end} for idx, (start, end) in enumerate(FCSE_SLOTS)
+        ],
+        "departments": department_rows,
+        "teachers": teachers,
+        "subjects": subjects,
+        "rooms": rooms,
+        "students": students,
+        "constraints": {
+            "hard": {
+                "noClashStudents": True, "noClashTeachers": True, "noClashRooms": True,
+                "respectWorkingHours": True, "roomCapacityCheck": True, "teacherQualificationCheck": True
+            },
+            "soft": {
+                "teacherPreferences": 0.8, "studentPreferences": 0.6, "roomPreferences": 0.7,
+                "minimizeGaps": 0.9, "evenDistribution": 0.8, "lunchBreakRespect": 0.9,
+                "maxConsecutiveHours": 0.8, "buildingChangeMinimize": 0.7
+            }
+        },
+        "metadata": {
+            "version": "1.0",
+            "createdBy": "utils.synthetic_data",
+            "notes": f"seed={seed} departments={departments} years={years} sections={sections} tightness={tightness}"
+        }
+    }
+
+
+def _section_label(index: int) -> str:
+    label = ""
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        label = chr(ord("A") + remainder) + label
+    return label
+
+
+def _generate_teachers(rng: random.Random, subjects_by_department: Dict[str, List[Dict[str, Any]]],
+                       demand_hours: Dict[int, int], tightness: float, research_day_ratio: float,
+                       qualified_per_subject: int) -> List[Dict[str, Any]]:
+    """
+    Department faculty sized to the department's teaching hours. Each subject gets at least
+    qualified_per_subject teachers (more when its sections need them), always the ones with the
+    least qualified demand so far, so every teacher can be loaded to roughly the same share of
+    maxHoursPerWeek.
+    """
+    teachers = []
+    for dept_code, dept_subjects in subjects_by_department.items():
+        hours = sum(demand_hours[subject["id"]] for subject in dept_subjects)
+        count = max(qualified_per_subject, math.ceil(hours / (tightness * MEAN_MAX_HOURS)))
+        faculty = dept_subjects[0]["department"]
+
+        staff = []
+        for _ in range(count):
+            research_days = [rng.choice(WORKING_DAYS)] if rng.random() < research_day_ratio else []
+            max_hours = rng.randint(12, 18)
+            staff.append({
+                "id": len(teachers) + len(staff) + 1,
+                "name": f"{rng.choice(TITLES)} {rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+                "department": faculty,
+                "program": dept_code,
+                "designation": rng.choice(DESIGNATIONS),
+                "qualifications": [],
+                "subjectsCanTeach": [],
+                "maxHoursPerWeek": max_hours,
+                "minHoursPerWeek": rng.randint(3, 6),
+                "preferredTimeSlots": [],
+                "unavailableSlots": [],
+                "preferredDays": [day for day in WORKING_DAYS if day not in research_days],
+                "researchDays": research_days,
+                "maxConsecutiveHours": rng.choice([3, 4]),
+                "maxGapHours": 2
+            })
+
+        load = [0.0] * count
+        for subject in sorted(dept_subjects, key=lambda s: -demand_hours[s["id"]]):
+            # Heavily enrolled subjects need enough qualified teachers to carry all their sections
+            needed = min(count, max(qualified_per_subject,
+                                    math.ceil(demand_hours[subject["id"]] / (tightness * MEAN_MAX_HOURS))))
+            share = demand_hours[subject["id"]] / needed
+            picked = sorted(range(count), key=lambda i: (load[i] / staff[i]["maxHoursPerWeek"], rng.random()))
+            for i in picked[:needed]:
+                staff[i]["subjectsCanTeach"].append(subject["name"])
+                load[i] += share
+        teachers.extend(staff)
+    return teachers
+
+
+def _generate_rooms(rng: random.Random, classrooms: int, labs: int) -> List[Dict[str, Any]]:
+    """Lecture halls (every eighth one a large MLH auditorium) plus computing labs"""
+    rooms = []
+    for idx in range(classrooms):
+        auditorium = idx % 8 == 7
+        building = BUILDINGS[idx % len(BUILDINGS)]
+        rooms.append({
+            "id": len(rooms) + 1,
+            "name": f"MLH-{idx // 8 + 1}" if auditorium else f"Lecture Hall-{idx + 1:02d}",
+            "building": building,
+            "floor": idx // 10 % 3,
+            "type": "Auditorium" if auditorium else "Classroom",
+            "capacity": 120 if auditorium else rng.choice([50, 60, 60, 75]),
+            "equipment": ["Projector", "Whiteboard"],
+            "isAccessible": True,
+            "hasAC": True,
+            "unavailableSlots": [],
+            "preferredFor": [],
+            "maintenanceSlots": []
+        })
+    for idx in range(labs):
+        base = LAB_NAMES[idx % len(LAB_NAMES)]
+        rooms.append({
+            "id": len(rooms) + 1,
+            "name": base if idx < len(LAB_NAMES) else f"{base} {idx // len(LAB_NAMES) + 1}",
+            "building": BUILDINGS[idx % len(BUILDINGS)],
+            "floor": idx % 3,
+            "type": "Laboratory",
+            "capacity": 53,
+            "equipment": list(LAB_EQUIPMENT),
+            "isAccessible": True,
+            "hasAC": True,
+            "unavailableSlots": [],
+            "preferredFor": [],
+            "maintenanceSlots": []
+        })
+    return rooms
+
+
+def describe_instance(university_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Size and achieved tightness (demand / capacity) of an instance"""
+    subjects = {subject["id"]: subject for subject in university_data.get("subjects", [])}
+    rooms = university_data.get("rooms", [])
+    teachers = university_data.get("teachers", [])
+    cells_per_week = len(university_data["basicInfo"]["workingDays"]) * len(university_data["timeSlots"])
+
+    activities = lab_activities = teaching_hours = 0
+    for group in university_data.get("students", []):
+        for subject_id in group.get("subjects", []):
+            subject = subjects.get(subject_id)
+            if not subject:
+                continue
+            sessions = _sessions(subject)
+            activities += sessions
+            teaching_hours += sessions * (subject["duration"] // 60)
+            if subject.get("requiredRoomType") == "Laboratory":
+                lab_activities += sessions
+
+    lab_rooms = sum(1 for room in rooms if room.get("type") == "Laboratory")
+    other_rooms = len(rooms) - lab_rooms
+    return {
+        "activities": activities,
+        "labActivities": lab_activities,
+        "teachers": len(teachers),
+        "subjects": len(subjects),
+        "rooms": len(rooms),
+        "labRooms": lab_rooms,
+        "studentGroups": len(university_data.get("students", [])),
+        "teacherLoad": round(teaching_hours / max(sum(t.get("maxHoursPerWeek", 20) for t in teachers), 1), 3),
+        "classroomOccupancy": round((activities - lab_activities) / max(other_rooms * cells_per_week, 1), 3),
+        "labOccupancy": round(lab_activities / max(lab_rooms * cells_per_week, 1), 3)
+    }
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Generate a synthetic universityData instance for scale testing")
+    parser.add_argument("--departments", type=int, default=6, help="Number of departments (default: 6)")
+    parser.add_argument("--years", type=int, default=4, help="Study years per department (default: 4)")
+    parser.add_argument("--sections", type=int, default=2, help="Sections per department and year (default: 2)")
+    parser.add_argument("--activities", type=int, help="Target activity count; overrides --sections")
+    parser.add_argument("--courses", type=int, default=5, help="Theory courses per year (default: 5)")
+    parser.add_argument("--labs", type=int, default=2, help="Lab courses per year (default: 2)")
+    parser.add_argument("--electives", type=int, default=3, help="Elective pool per upper year (default: 3)")
+    parser.add_argument("--electives-per-section", type=int, default=1, help="Electives each upper-year section takes (default: 1)")
+    parser.add_argument("--tightness", type=float, default=0.75, help="Demand/capacity ratio for rooms and faculty (default: 0.75)")
+    parser.add_argument("--research-day-ratio", type=float, default=0.3, help="Share of teachers with a research day (default: 0.3)")
+    parser.add_argument("--qualified-per-subject", type=int, default=2, help="Qualified teachers per subject (default: 2)")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed (default: 0)")
+    parser.add_argument("--request", action="store_true", help="Wrap as a /generate-timetable request body")
+    parser.add_argument("-o", "--output", help="Output file (default: stdout)")
+    args = parser.parse_args(argv)
+
+    sections = args.sections
+    if args.activities:
+        sections = sections_for_target(args.activities, args.departments, args.years,
+                                       args.courses, args.labs, args.electives_per_section)
+
+    university_data = generate_university_data(
+        departments=args.departments, years=args.years, sections=sections,
+        courses_per_year=args.courses, labs_per_year=args.labs, electives=args.electives,
+        electives_per_section=args.electives_per_section, tightness=args.tightness,
+        research_day_ratio=args.research_day_ratio, qualified_per_subject=args.qualified_per_subject,
+        seed=args.seed
+    )
+    payload = {"universityData": university_data} if args.request else university_data
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(payload, f)
+    else:
+        json.dump(payload, sys.stdout)
+        sys.stdout.write("\n")
+    print(json.dumps({"sections": sections, **describe_instance(university_data)}), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
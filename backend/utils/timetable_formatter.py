@@ -1,11 +1,38 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Tuple
 from collections import defaultdict
 
-def format_enhanced_timetable(solution: List[Dict[str, Any]], university_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+def group_activities_by_slot(solution: List[Dict[str, Any]]) -> Dict[Tuple[Any, Any], List[Dict[str, Any]]]:
+    """Index a solution by (day, timeSlotId) in one pass; activities keep their solution order"""
+    grouped = defaultdict(list)
+    for activity in solution:
+        grouped[(activity["day"], activity["timeSlotId"])].append(activity)
+    return grouped
+
+def format_activity(activity: Dict[str, Any]) -> Dict[str, Any]:
+    """Response representation of one scheduled activity"""
+    return {
+        "subject": activity["subjectName"],
+        "subjectCode": activity.get("subjectCode", ""),
+        "teacher": activity.get("teacherName", "Unknown"),
+        "studentGroup": activity["studentGroupName"],
+        "room": activity.get("roomName", "Unknown"),
+        "studentCount": activity["studentCount"],
+        "type": activity["subjectType"],
+        "duration": activity["duration"],
+        "department": activity.get("department", ""),
+        "sessionInfo": f"Session {activity.get('sessionNumber', 1)} of {activity.get('totalSessions', 1)}"
+    }
+
+def format_enhanced_timetable(solution: List[Dict[str, Any]], university_data: Dict[str, Any],
+                              grouped: Optional[Dict[Tuple[Any, Any], List[Dict[str, Any]]]] = None) -> List[Dict[str, Any]]:
     """Enhanced timetable formatting with better structure"""
     working_days = university_data.get("basicInfo", {}).get("workingDays", [])
     time_slots = university_data.get("timeSlots", [])
     
+    # Activities for each (day, time slot) cell, grouped once instead of scanned per cell
+    if grouped is None:
+        grouped = group_activities_by_slot(solution)
+    
     timetable = []
     
     for day in working_days:
@@ -18,36 +45,51 @@ def format_enhanced_timetable(solution: List[Dict[str, Any]], university_data: D
             period = {
                 "period": time_slot["id"],
                 "time": f"{time_slot['startTime']}-{time_slot['endTime']}",
-                "activities": []
+                "activities": [format_activity(activity) for activity in grouped.get((day, time_slot["id"]), [])]
             }
-            
-            # Find activities for this day and time slot
-            day_activities = [
-                activity for activity in solution 
-                if activity["day"] == day and activity["timeSlotId"] == time_slot["id"]
-            ]
-            
-            for activity in day_activities:
-                formatted_activity = {
-                    "subject": activity["subjectName"],
-                    "subjectCode": activity.get("subjectCode", ""),
-                    "teacher": activity.get("teacherName", "Unknown"),
-                    "studentGroup": activity["studentGroupName"],
-                    "room": activity.get("roomName", "Unknown"),
-                    "studentCount": activity["studentCount"],
-                    "type": activity["subjectType"],
-                    "duration": activity["duration"],
-                    "department": activity.get("department", ""),
-                    "sessionInfo": f"Session {activity.get('sessionNumber', 1)} of {activity.get('totalSessions', 1)}"
-                }
-                period["activities"].append(formatted_activity)
-            
             day_schedule["periods"].append(period)
         
         timetable.append(day_schedule)
     
     return timetable
 
+def format_timetable_views(solution: List[Dict[str, Any]], university_data: Dict[str, Any],
+                           grouped: Optional[Dict[Tuple[Any, Any], List[Dict[str, Any]]]] = None) -> Dict[str, Any]:
+    """
+    Per-teacher, per-room and per-student-group schedules built from the same (day, slot) grouping.
+    Each view maps a resource id to its name and its occupied slots in day/period order.
+    """
+    working_days = university_data.get("basicInfo", {}).get("workingDays", [])
+    time_slots = university_data.get("timeSlots", [])
+    
+    if grouped is None:
+        grouped = group_activities_by_slot(solution)
+    
+    views = {"byTeacher": {}, "byRoom": {}, "byStudentGroup": {}}
+    view_keys = (
+        ("byTeacher", "teacherId", "teacherName"),
+        ("byRoom", "roomId", "roomName"),
+        ("byStudentGroup", "studentGroupId", "studentGroupName")
+    )
+    
+    for day in working_days:
+        for time_slot in time_slots:
+            cell = grouped.get((day, time_slot["id"]))
+            if not cell:
+                continue
+            time_range = f"{time_slot['startTime']}-{time_slot['endTime']}"
+            for activity in cell:
+                entry = {"day": day, "period": time_slot["id"], "time": time_range, **format_activity(activity)}
+                for view_name, id_key, name_key in view_keys:
+                    resource_id = activity.get(id_key)
+                    resource = views[view_name].get(resource_id)
+                    if resource is None:
+                        resource = {"name": activity.get(name_key, "Unknown"), "slots": []}
+                        views[view_name][resource_id] = resource
+                    resource["slots"].append(entry)
+    
+    return views
+
 def calculate_enhanced_teacher_utilization(solution: List[Dict[str, Any]], university_data: Dict[str, Any]) -> Dict[str, str]:
     """Enhanced teacher utilization calculation"""
     teacher_hours = defaultdict(int)
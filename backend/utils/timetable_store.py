@@ -0,0 +1,330 @@
+from typing import Dict, Any, List, Optional, Tuple
+import threading
+import sqlite3
+import logging
+import uuid
+import json
+import time
+import zlib
+import os
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS datasets (
+    hash TEXT PRIMARY KEY,
+    created_at REAL NOT NULL,
+    payload BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS rooms (
+    dataset_hash TEXT NOT NULL,
+    room_id TEXT NOT NULL,
+    name TEXT,
+    type TEXT,
+    capacity INTEGER,
+    PRIMARY KEY (dataset_hash, room_id)
+);
+CREATE TABLE IF NOT EXISTS timetables (
+    id TEXT PRIMARY KEY,
+    dataset_hash TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    fitness REAL,
+    activity_count INTEGER NOT NULL,
+    settings TEXT NOT NULL,
+    stats TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS activities (
+    timetable_id TEXT NOT NULL,
+    activity_id INTEGER NOT NULL,
+    subject_id TEXT,
+    subject_name TEXT,
+    subject_code TEXT,
+    subject_type TEXT,
+    department TEXT,
+    teacher_id TEXT,
+    teacher_name TEXT,
+    room_id TEXT,
+    room_name TEXT,
+    group_id TEXT,
+    group_name TEXT,
+    student_count INTEGER,
+    day TEXT,
+    day_index INTEGER,
+    slot_id TEXT,
+    slot_index INTEGER,
+    slot_time TEXT,
+    duration INTEGER,
+    session_number INTEGER,
+    total_sessions INTEGER,
+    PRIMARY KEY (timetable_id, activity_id)
+);
+CREATE INDEX IF NOT EXISTS idx_timetables_dataset ON timetables (dataset_hash, created_at);
+CREATE INDEX IF NOT EXISTS idx_activities_teacher ON activities (timetable_id, teacher_id);
+CREATE INDEX IF NOT EXISTS idx_activities_room ON activities (timetable_id, room_id);
+CREATE INDEX IF NOT EXISTS idx_activities_group ON activities (timetable_id, group_id);
+CREATE INDEX IF NOT EXISTS idx_activities_slot ON activities (timetable_id, day, slot_id);
+"""
+
+ACTIVITY_COLUMNS = (
+    "activity_id, subject_id, subject_name, subject_code, subject_type, department, teacher_id, teacher_name, "
+    "room_id, room_name, group_id, group_name, student_count, day, day_index, slot_id, slot_index, slot_time, "
+    "duration, session_number, total_sessions"
+)
+
+
+def _key(value: Any) -> Optional[str]:
+    """IDs are stored as text so numeric and string IDs can be queried from URL paths alike"""
+    return None if value is None else str(value)
+
+
+def _row_to_activity(row: sqlite3.Row) -> Dict[str, Any]:
+    """Stored activity in the same shape as the per-resource timetable views"""
+    return {
+        "day": row["day"],
+        "period": row["slot_id"],
+        "time": row["slot_time"],
+        "subject": row["subject_name"],
+        "subjectCode": row["subject_code"],
+        "teacher": row["teacher_name"],
+        "studentGroup": row["group_name"],
+        "room": row["room_name"],
+        "studentCount": row["student_count"],
+        "type": row["subject_type"],
+        "duration": row["duration"],
+        "department": row["department"],
+        "sessionInfo": f"Session {row['session_number']} of {row['total_sessions']}",
+        "activityId": row["activity_id"],
+        "subjectId": row["subject_id"],
+        "teacherId": row["teacher_id"],
+        "roomId": row["room_id"],
+        "studentGroupId": row["group_id"]
+    }
+
+
+class TimetableStore:
+    """
+    SQLite persistence for generated timetables: one row per solution plus its activity rows,
+    indexed by teacher, room, student group and (day, slot) for cheap per-resource queries.
+    Datasets are stored once per content hash so solutions can be re-analysed later.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self.write_lock = threading.Lock()
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    # Writes
+
+    def save(self, dataset_hash: str, university_data: Dict[str, Any], solution: List[Dict[str, Any]],
+             settings: Dict[str, Any], stats: Dict[str, Any], fitness: Optional[float] = None) -> str:
+        """Persist one solution (and its dataset, if new); returns the timetable id"""
+        timetable_id = uuid.uuid4().hex
+        now = time.time()
+        day_index = {day: idx for idx, day in enumerate(university_data.get("basicInfo", {}).get("workingDays", []))}
+        time_slots = university_data.get("timeSlots", [])
+        slot_index = {ts["id"]: idx for idx, ts in enumerate(time_slots)}
+        slot_time = {ts["id"]: f"{ts.get('startTime', '')}-{ts.get('endTime', '')}" for ts in time_slots}
+
+        activity_rows = [
+            (
+                timetable_id, activity["activityId"], _key(activity["subjectId"]), activity["subjectName"],
+                activity.get("subjectCode", ""), activity["subjectType"], activity.get("department", ""),
+                _key(activity["teacherId"]), activity.get("teacherName", "Unknown"),
+                _key(activity["roomId"]), activity.get("roomName", "Unknown"),
+                _key(activity["studentGroupId"]), activity["studentGroupName"], activity["studentCount"],
+                activity["day"], day_index.get(activity["day"], -1),
+                _key(activity["timeSlotId"]), slot_index.get(activity["timeSlotId"], -1),
+                slot_time.get(activity["timeSlotId"], ""),
+                activity["duration"], activity.get("sessionNumber", 1), activity.get("totalSessions", 1)
+            )
+            for activity in solution
+        ]
+
+        with self.write_lock, self._connect() as conn:
+            if conn.execute("SELECT 1 FROM datasets WHERE hash = ?", (dataset_hash,)).fetchone() is None:
+                payload = zlib.compress(json.dumps(university_data, separators=(",", ":"), default=str).encode("utf-8"))
+                conn.execute("INSERT INTO datasets (hash, created_at, payload) VALUES (?, ?, ?)",
+                             (dataset_hash, now, sqlite3.Binary(payload)))
+                conn.executemany(
+                    "INSERT OR REPLACE INTO rooms (dataset_hash, room_id, name, type, capacity) VALUES (?, ?, ?, ?, ?)",
+                    [(dataset_hash, _key(room["id"]), room.get("name", ""), room.get("type", "Classroom"),
+                      room.get("capacity", 0)) for room in university_data.get("rooms", []) if "id" in room]
+                )
+            conn.execute(
+                "INSERT INTO timetables (id, dataset_hash, created_at, fitness, activity_count, settings, stats) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (timetable_id, dataset_hash, now, fitness, len(solution),
+                 json.dumps(settings or {}, default=str), json.dumps(stats or {}, default=str))
+            )
+            conn.executemany(
+                f"INSERT INTO activities (timetable_id, {ACTIVITY_COLUMNS}) VALUES ({', '.join('?' * 22)})",
+                activity_rows
+            )
+        return timetable_id
+
+    def delete(self, timetable_id: str) -> bool:
+        with self.write_lock, self._connect() as conn:
+            deleted = conn.execute("DELETE FROM timetables WHERE id = ?", (timetable_id,)).rowcount
+            conn.execute("DELETE FROM activities WHERE timetable_id = ?", (timetable_id,))
+        return bool(deleted)
+
+    # Queries
+
+    def list_timetables(self, dataset_hash: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
+        query = "SELECT id, dataset_hash, created_at, fitness, activity_count FROM timetables"
+        params: tuple = ()
+        if dataset_hash:
+            query += " WHERE dataset_hash = ?"
+            params = (dataset_hash,)
+        query += " ORDER BY created_at DESC LIMIT ?"
+        with self._connect() as conn:
+            rows = conn.execute(query, params + (limit,)).fetchall()
+        return [
+            {"timetableId": row["id"], "datasetHash": row["dataset_hash"], "createdAt": row["created_at"],
+             "fitness": row["fitness"], "activityCount": row["activity_count"]}
+            for row in rows
+        ]
+
+    def get_timetable(self, timetable_id: str) -> Optional[Dict[str, Any]]:
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM timetables WHERE id = ?", (timetable_id,)).fetchone()
+        if row is None:
+            return None
+        return {
+            "timetableId": row["id"],
+            "datasetHash": row["dataset_hash"],
+            "createdAt": row["created_at"],
+            "fitness": row["fitness"],
+            "activityCount": row["activity_count"],
+            "settings": json.loads(row["settings"]),
+            "stats": json.loads(row["stats"])
+        }
+
+    def get_dataset(self, dataset_hash: str) -> Optional[Dict[str, Any]]:
+        with self._connect() as conn:
+            row = conn.execute("SELECT payload FROM datasets WHERE hash = ?", (dataset_hash,)).fetchone()
+        return json.loads(zlib.decompress(row["payload"])) if row else None
+
+    def load_solution(self, timetable_id: str) -> Optional[Tuple[Dict[str, Any], List[Dict[str, Any]]]]:
+        """
+        Dataset and raw solution (GA activity dicts with the dataset's original, typed IDs)
+        of a stored timetable, for re-analysis; None if the timetable is unknown.
+        """
+        with self._connect() as conn:
+            row = conn.execute("SELECT dataset_hash FROM timetables WHERE id = ?", (timetable_id,)).fetchone()
+            if row is None:
+                return None
+            rows = conn.execute(
+                f"SELECT {ACTIVITY_COLUMNS} FROM activities WHERE timetable_id = ? ORDER BY activity_id",
+                (timetable_id,)
+            ).fetchall()
+        university_data = self.get_dataset(row["dataset_hash"]) or {}
+
+        def id_map(section: str) -> Dict[str, Any]:
+            return {_key(item["id"]): item["id"] for item in university_data.get(section, []) if "id" in item}
+
+        subject_ids, teacher_ids, room_ids, group_ids = (
+            id_map("subjects"), id_map("teachers"), id_map("rooms"), id_map("students")
+        )
+        slot_ids = id_map("timeSlots")
+        subjects = {subject["id"]: subject for subject in university_data.get("subjects", []) if "id" in subject}
+
+        solution = []
+        for activity in rows:
+            subject_id = subject_ids.get(activity["subject_id"], activity["subject_id"])
+            subject = subjects.get(subject_id, {})
+            solution.append({
+                "activityId": activity["activity_id"],
+                "subjectId": subject_id,
+                "subjectName": activity["subject_name"],
+                "subjectCode": activity["subject_code"],
+                "subjectType": activity["subject_type"],
+                "duration": activity["duration"],
+                "studentGroupId": group_ids.get(activity["group_id"], activity["group_id"]),
+                "studentGroupName": activity["group_name"],
+                "studentCount": activity["student_count"],
+                "department": activity["department"],
+                "requiredRoomType": subject.get("requiredRoomType", "Classroom"),
+                "sessionNumber": activity["session_number"],
+                "totalSessions": activity["total_sessions"],
+                "teacherId": teacher_ids.get(activity["teacher_id"], activity["teacher_id"]),
+                "teacherName": activity["teacher_name"],
+                "roomId": room_ids.get(activity["room_id"], activity["room_id"]),
+                "roomName": activity["room_name"],
+                "day": activity["day"],
+                "timeSlotId": slot_ids.get(activity["slot_id"], activity["slot_id"])
+            })
+        return university_data, solution
+
+    def activities(self, timetable_id: str) -> List[Dict[str, Any]]:
+        return self._activities("timetable_id = ?", (timetable_id,))
+
+    def activities_for_teacher(self, timetable_id: str, teacher_id: Any) -> List[Dict[str, Any]]:
+        return self._activities("timetable_id = ? AND teacher_id = ?", (timetable_id, _key(teacher_id)))
+
+    def activities_for_room(self, timetable_id: str, room_id: Any) -> List[Dict[str, Any]]:
+        return self._activities("timetable_id = ? AND room_id = ?", (timetable_id, _key(room_id)))
+
+    def activities_for_group(self, timetable_id: str, group_id: Any) -> List[Dict[str, Any]]:
+        return self._activities("timetable_id = ? AND group_id = ?", (timetable_id, _key(group_id)))
+
+    def activities_at(self, timetable_id: str, day: str, slot_id: Any) -> List[Dict[str, Any]]:
+        return self._activities("timetable_id = ? AND day = ? AND slot_id = ?", (timetable_id, day, _key(slot_id)))
+
+    def free_rooms(self, timetable_id: str, day: str, slot_id: Any, min_capacity: int = 0,
+                   room_type: Optional[str] = None) -> Optional[List[Dict[str, Any]]]:
+        """Rooms of the timetable's dataset with no activity at (day, slot); None if the timetable is unknown"""
+        query = (
+            "SELECT r.room_id, r.name, r.type, r.capacity FROM rooms r "
+            "JOIN timetables t ON t.dataset_hash = r.dataset_hash "
+            "WHERE t.id = ? AND r.capacity >= ? "
+            "AND r.room_id NOT IN (SELECT room_id FROM activities WHERE timetable_id = ? AND day = ? AND slot_id = ?)"
+        )
+        params = [timetable_id, min_capacity, timetable_id, day, _key(slot_id)]
+        if room_type:
+            query += " AND r.type = ?"
+            params.append(room_type)
+        query += " ORDER BY r.capacity, r.name"
+        with self._connect() as conn:
+            if conn.execute("SELECT 1 FROM timetables WHERE id = ?", (timetable_id,)).fetchone() is None:
+                return None
+            rows = conn.execute(query, params).fetchall()
+        return [{"roomId": row["room_id"], "name": row["name"], "type": row["type"], "capacity": row["capacity"]}
+                for row in rows]
+
+    def _activities(self, where: str, params: tuple) -> List[Dict[str, Any]]:
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT {ACTIVITY_COLUMNS} FROM activities WHERE {where} ORDER BY day_index, slot_index, activity_id",
+                params
+            ).fetchall()
+        return [_row_to_activity(row) for row in rows]
+
+    def status(self) -> Dict[str, Any]:
+        with self._connect() as conn:
+            timetables, = conn.execute("SELECT COUNT(*) FROM timetables").fetchone()
+            datasets, = conn.execute("SELECT COUNT(*) FROM datasets").fetchone()
+        return {"enabled": True, "dbPath": self.db_path, "timetables": timetables, "datasets": datasets}
+
+
+def _create_store() -> Optional[TimetableStore]:
+    db_path = os.environ.get("TIMETABLE_STORE_DB", "timetables.db")
+    if not db_path:
+        return None
+    try:
+        return TimetableStore(db_path)
+    except sqlite3.Error as e:
+        logging.warning(f"Timetable store disabled, cannot open {db_path}: {str(e)}")
+        return None
+
+
+# None when persistence is disabled (TIMETABLE_STORE_DB="")
+timetable_store = _create_store()
@@ -0,0 +1,399 @@
+from typing import Dict, Any, List, Optional, Tuple
+from collections import OrderedDict, defaultdict
+from bisect import bisect_left, bisect_right, insort
+import copy
+import os
+
+from utils.session_store import SessionStore
+
+# Collections that can be patched inside a validation session
+PATCHABLE_COLLECTIONS = ("teachers", "subjects", "rooms", "students")
+REQUIRED_SECTIONS = ["basicInfo", "teachers", "subjects", "rooms", "students", "timeSlots"]
+
+# Finding keys for the dataset-wide checks
+LAB_KEY = ("labs",)
+WORKLOAD_KEY = ("workload",)
+TIME_SLOT_KEY = ("timeSlots",)
+RESEARCH_KEY = ("researchDays",)
+
+
+class PatchError(ValueError):
+    """Raised for malformed or inapplicable patch operations"""
+
+    applied = 0
+    changes: Dict[str, List[str]] = {}
+
+
+class IncrementalValidator:
+    """
+    Holds one dataset with mutable inverted indexes and keeps the findings of
+    validate_enhanced_university_data up to date under single-entity patches.
+    Each patch only re-evaluates the findings whose inputs it touched.
+    """
+
+    def __init__(self, university_data: Dict[str, Any]):
+        self.basic_info = copy.deepcopy(university_data.get("basicInfo", {}))
+        self.time_slot_capacity = len(university_data.get("timeSlots", [])) * len(self.basic_info.get("workingDays", []))
+
+        # Entities by id (dict order mirrors list order in the dataset)
+        self.teachers: Dict[Any, Dict[str, Any]] = OrderedDict()
+        self.subjects: Dict[Any, Dict[str, Any]] = OrderedDict()
+        self.rooms: Dict[Any, Dict[str, Any]] = OrderedDict()
+        self.students: Dict[Any, Dict[str, Any]] = OrderedDict()
+
+        # Inverted indexes
+        self.teacher_refs: Dict[Any, set] = {}
+        self.ref_teacher_count: Dict[Any, int] = defaultdict(int)
+        self.subjects_by_name: Dict[Any, set] = defaultdict(set)
+        self.enrolled_counts: Dict[Any, int] = defaultdict(int)
+        self.room_capacities: List[Any] = []
+        self.group_totals: List[Any] = []
+        self.group_ids_by_total: List[Any] = []
+
+        # Running totals
+        self.lab_subject_count = 0
+        self.lab_room_count = 0
+        self.total_required_hours = 0
+        self.total_available_hours = 0
+        self.min_available_hours = 0
+        self.research_conflicts: set = set()
+
+        # Current findings: key -> (severity, message)
+        self.findings: Dict[tuple, Tuple[str, str]] = {}
+        self.version = 0
+
+        for collection in PATCHABLE_COLLECTIONS:
+            for item in university_data.get(collection, []):
+                if "id" not in item:
+                    raise PatchError(f"Every item in {collection} needs an id for session validation")
+                if item["id"] in self._entities(collection):
+                    raise PatchError(f"Duplicate id {item['id']} in {collection}")
+                self._insert(collection, copy.deepcopy(item))
+
+        for subject_id in self.subjects:
+            self._evaluate(("subject", subject_id))
+        for group_id in self.students:
+            self._evaluate(("group", group_id))
+        for key in (LAB_KEY, WORKLOAD_KEY, TIME_SLOT_KEY, RESEARCH_KEY):
+            self._evaluate(key)
+
+    # Public API
+
+    def apply(self, operations: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Apply patch operations in order and return the findings that changed"""
+        touched: Dict[tuple, Optional[Tuple[str, str]]] = {}
+
+        for index, operation in enumerate(operations):
+            try:
+                keys = self._apply_operation(operation)
+            except PatchError as e:
+                # Earlier operations stay applied; report what they changed
+                e.applied = index
+                e.changes = self._diff(touched)
+                if index:
+                    self.version += 1
+                raise
+            for key in keys:
+                if key not in touched:
+                    touched[key] = self.findings.get(key)
+                self._evaluate(key)
+
+        self.version += 1
+        return self._diff(touched)
+
+    def _diff(self, touched: Dict[tuple, Optional[Tuple[str, str]]]) -> Dict[str, List[str]]:
+        changes = {"addedErrors": [], "resolvedErrors": [], "addedWarnings": [], "resolvedWarnings": []}
+        for key, before in touched.items():
+            after = self.findings.get(key)
+            if before == after:
+                continue
+            if before:
+                changes["resolvedErrors" if before[0] == "error" else "resolvedWarnings"].append(before[1])
+            if after:
+                changes["addedErrors" if after[0] == "error" else "addedWarnings"].append(after[1])
+        return changes
+
+    def summary(self) -> Dict[str, Any]:
+        """Constant-time view of the current state"""
+        error_count = sum(1 for severity, _ in self.findings.values() if severity == "error")
+        warning_count = len(self.findings) - error_count
+        return {
+            "valid": error_count == 0,
+            "errorCount": error_count,
+            "warningCount": warning_count,
+            "statistics": self.statistics(),
+            "feasibilityScore": round(max(0, 100 - error_count * 20 - warning_count * 5), 1)
+        }
+
+    def statistics(self) -> Dict[str, Any]:
+        return {
+            "teachers": len(self.teachers),
+            "subjects": len(self.subjects),
+            "rooms": len(self.rooms),
+            "students": len(self.students),
+            "labSubjects": self.lab_subject_count,
+            "labRooms": self.lab_room_count,
+            "totalRequiredHours": self.total_required_hours,
+            "totalAvailableHours": self.total_available_hours,
+            "utilizationRate": round((self.total_required_hours / max(self.total_available_hours, 1)) * 100, 1),
+            "timeSlotCapacity": self.time_slot_capacity
+        }
+
+    def full_result(self) -> Dict[str, Any]:
+        """Same shape and ordering as validate_enhanced_university_data"""
+        errors, warnings = [], []
+
+        def collect(key):
+            finding = self.findings.get(key)
+            if finding:
+                (errors if finding[0] == "error" else warnings).append(finding[1])
+
+        for subject_id in self.subjects:
+            collect(("subject", subject_id))
+        collect(LAB_KEY)
+        for group_id in self.students:
+            collect(("group", group_id))
+        for key in (WORKLOAD_KEY, TIME_SLOT_KEY, RESEARCH_KEY):
+            collect(key)
+
+        unqualified_subjects = [
+            subject.get("name", "") for subject_id, subject in self.subjects.items()
+            if self.findings.get(("subject", subject_id), ("", ""))[0] == "error"
+        ]
+        capacity_issues = [
+            group.get("batch", "Unknown") for group_id, group in self.students.items()
+            if self.findings.get(("group", group_id), ("", ""))[0] == "error"
+        ]
+
+        recommendations = []
+        if unqualified_subjects:
+            recommendations.append(f"Consider hiring qualified teachers for: {', '.join(unqualified_subjects)}")
+        if capacity_issues:
+            recommendations.append(f"Consider larger rooms or split sections for: {', '.join(capacity_issues)}")
+        if self.lab_room_count < self.lab_subject_count:
+            recommendations.append("Consider adding more laboratory rooms or scheduling lab sessions carefully")
+
+        return {
+            "valid": len(errors) == 0,
+            "errors": errors,
+            "warnings": warnings,
+            "recommendations": recommendations,
+            "statistics": self.statistics(),
+            "feasibilityScore": round(max(0, 100 - len(errors) * 20 - len(warnings) * 5), 1)
+        }
+
+    def to_university_data(self) -> Dict[str, Any]:
+        return {
+            "basicInfo": self.basic_info,
+            "teachers": list(self.teachers.values()),
+            "subjects": list(self.subjects.values()),
+            "rooms": list(self.rooms.values()),
+            "students": list(self.students.values())
+        }
+
+    # Patch handling
+
+    def _entities(self, collection: str) -> Dict[Any, Dict[str, Any]]:
+        return getattr(self, collection)
+
+    def _apply_operation(self, operation: Dict[str, Any]) -> set:
+        op = operation.get("op")
+        collection = operation.get("collection")
+        if collection not in PATCHABLE_COLLECTIONS:
+            raise PatchError(f"Unknown collection '{collection}', expected one of {', '.join(PATCHABLE_COLLECTIONS)}")
+        entities = self._entities(collection)
+
+        if op == "add":
+            item = operation.get("item") or {}
+            if "id" not in item:
+                raise PatchError("Add operations need an item with an id")
+            if item["id"] in entities:
+                raise PatchError(f"{collection} item {item['id']} already exists")
+            return self._insert(collection, copy.deepcopy(item))
+
+        if op == "update":
+            item = operation.get("item") or {}
+            item_id = operation.get("id", item.get("id"))
+            if item_id not in entities:
+                raise PatchError(f"{collection} item {item_id} not found")
+            updated = {**entities[item_id], **copy.deepcopy(item), "id": item_id}
+            touched = self._delete(collection, item_id)
+            touched |= self._insert(collection, updated)
+            return touched
+
+        if op == "remove":
+            item_id = operation.get("id")
+            if item_id not in entities:
+                raise PatchError(f"{collection} item {item_id} not found")
+            touched = self._delete(collection, item_id)
+            del entities[item_id]
+            return touched
+
+        raise PatchError(f"Unknown op '{op}', expected add, update or remove")
+
+    def _insert(self, collection: str, item: Dict[str, Any]) -> set:
+        """Add an entity to the indexes; returns the finding keys to re-evaluate"""
+        # Assigning an existing key keeps its position, so updates do not reorder findings
+        self._entities(collection)[item["id"]] = item
+        return getattr(self, f"_index_{collection}")(item, +1)
+
+    def _delete(self, collection: str, item_id: Any) -> set:
+        """Remove an entity from the indexes (the caller drops it from the collection)"""
+        item = self._entities(collection)[item_id]
+        return getattr(self, f"_index_{collection}")(item, -1)
+
+    def _index_teachers(self, teacher: Dict[str, Any], sign: int) -> set:
+        touched = {WORKLOAD_KEY, RESEARCH_KEY}
+        refs = set(teacher.get("subjectsCanTeach", []))
+        for ref in refs:
+            self.ref_teacher_count[ref] += sign
+            for subject_id in self.subjects_by_name.get(ref, ()):
+                touched.add(("subject", subject_id))
+        if sign > 0:
+            self.teacher_refs[teacher["id"]] = refs
+        else:
+            self.teacher_refs.pop(teacher["id"], None)
+
+        self.total_available_hours += sign * teacher.get("maxHoursPerWeek", 20)
+        self.min_available_hours += sign * teacher.get("minHoursPerWeek", 0)
+
+        research_days = teacher.get("researchDays", [])
+        preferred_days = teacher.get("preferredDays", [])
+        if sign > 0 and research_days and preferred_days and set(research_days) & set(preferred_days):
+            self.research_conflicts.add(teacher["id"])
+        elif sign < 0:
+            self.research_conflicts.discard(teacher["id"])
+        return touched
+
+    def _index_subjects(self, subject: Dict[str, Any], sign: int) -> set:
+        subject_id = subject["id"]
+        touched = {("subject", subject_id), LAB_KEY, WORKLOAD_KEY, TIME_SLOT_KEY}
+        name = subject.get("name", "")
+        if sign > 0:
+            self.subjects_by_name[name].add(subject_id)
+        else:
+            self.subjects_by_name[name].discard(subject_id)
+        if subject.get("type") == "Lab":
+            self.lab_subject_count += sign
+        self.total_required_hours += sign * subject.get("hoursPerWeek", 3) * self.enrolled_counts.get(subject_id, 0)
+        return touched
+
+    def _index_rooms(self, room: Dict[str, Any], sign: int) -> set:
+        touched = {LAB_KEY} if room.get("type") == "Laboratory" else set()
+        if room.get("type") == "Laboratory":
+            self.lab_room_count += sign
+
+        capacity = room.get("capacity", 0)
+        if sign > 0:
+            # Groups that may gain their first, second or third suitable room
+            lower = self._third_largest_capacity()
+            insort(self.room_capacities, capacity)
+        else:
+            self.room_capacities.pop(bisect_left(self.room_capacities, capacity))
+            lower = self._third_largest_capacity()
+
+        start = 0 if lower is None else bisect_right(self.group_totals, lower)
+        end = bisect_right(self.group_totals, capacity)
+        for group_id in self.group_ids_by_total[start:end]:
+            touched.add(("group", group_id))
+        return touched
+
+    def _index_students(self, group: Dict[str, Any], sign: int) -> set:
+        group_id = group["id"]
+        touched = {("group", group_id), WORKLOAD_KEY, TIME_SLOT_KEY}
+        total = group.get("totalStudents", 0)
+        if sign > 0:
+            position = bisect_right(self.group_totals, total)
+            self.group_totals.insert(position, total)
+            self.group_ids_by_total.insert(position, group_id)
+        else:
+            position = bisect_left(self.group_totals, total)
+            while self.group_ids_by_total[position] != group_id:
+                position += 1
+            del self.group_totals[position]
+            del self.group_ids_by_total[position]
+
+        for subject_id in set(group.get("subjects", [])):
+            self.enrolled_counts[subject_id] += sign
+            subject = self.subjects.get(subject_id)
+            if subject is not None:
+                self.total_required_hours += sign * subject.get("hoursPerWeek", 3)
+        return touched
+
+    def _third_largest_capacity(self):
+        """Groups larger than this have fewer than three suitable rooms (None: fewer than three rooms)"""
+        return self.room_capacities[-3] if len(self.room_capacities) >= 3 else None
+
+    def _count_rooms_with_capacity(self, student_count: Any) -> int:
+        return len(self.room_capacities) - bisect_left(self.room_capacities, student_count)
+
+    # Finding evaluation (mirrors validate_enhanced_university_data)
+
+    def _evaluate(self, key: tuple):
+        finding = self._compute_finding(key)
+        if finding:
+            self.findings[key] = finding
+        else:
+            self.findings.pop(key, None)
+
+    def _compute_finding(self, key: tuple) -> Optional[Tuple[str, str]]:
+        kind = key[0]
+        if kind == "subject":
+            subject = self.subjects.get(key[1])
+            if subject is None:
+                return None
+            subject_name = subject.get("name", "")
+            qualified_count = self.ref_teacher_count.get(subject_name, 0)
+            if not qualified_count:
+                return ("error", f"No qualified teacher found for subject: {subject_name}")
+            if qualified_count == 1:
+                return ("warning", f"Only one qualified teacher for subject: {subject_name}")
+            return None
+
+        if kind == "group":
+            group = self.students.get(key[1])
+            if group is None:
+                return None
+            total_students = group.get("totalStudents", 0)
+            batch = group.get("batch", "Unknown")
+            suitable_room_count = self._count_rooms_with_capacity(total_students)
+            if not suitable_room_count:
+                return ("error", f"No room large enough for {batch} ({total_students} students)")
+            if suitable_room_count < 3:
+                return ("warning", f"Limited room options for {batch} ({total_students} students)")
+            return None
+
+        if key == LAB_KEY:
+            if self.lab_subject_count and not self.lab_room_count:
+                return ("error", "Lab subjects found but no laboratory rooms available")
+            if self.lab_subject_count and self.lab_room_count < self.lab_subject_count // 2:
+                return ("warning", "Limited laboratory rooms relative to lab subjects")
+            return None
+
+        if key == WORKLOAD_KEY:
+            if self.total_required_hours > self.total_available_hours:
+                return ("error", f"Insufficient teacher capacity: need {self.total_required_hours}h, available {self.total_available_hours}h")
+            if self.total_required_hours < self.min_available_hours:
+                return ("warning", f"Teachers may be under-utilized: need {self.total_required_hours}h, minimum {self.min_available_hours}h")
+            return None
+
+        if key == TIME_SLOT_KEY:
+            if self.total_required_hours > self.time_slot_capacity * 0.8:
+                return ("warning", "High time slot utilization - may lead to scheduling conflicts")
+            return None
+
+        if key == RESEARCH_KEY:
+            if not self.research_conflicts:
+                return None
+            names = [teacher.get("name", "Unknown") for teacher_id, teacher in self.teachers.items()
+                     if teacher_id in self.research_conflicts]
+            return ("warning", f"Teachers with research day conflicts: {', '.join(names)}")
+
+        return None
+
+
+validation_sessions = SessionStore(
+    "validation",
+    max_sessions=int(os.environ.get("TIMETABLE_VALIDATION_SESSIONS", "100")),
+    idle_timeout=float(os.environ.get("TIMETABLE_VALIDATION_SESSION_TTL", "1800"))
+)